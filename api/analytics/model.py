@@ -0,0 +1,161 @@
+from utils.db.connection import db
+from datetime import datetime, date, timedelta
+import pytz
+import threading
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from exits.model import daily_exits_statement
+from products.model import Product
+from sync.model import ChangeLog, get_latest_sequence
+
+DEFAULT_PERIODS = 12
+DEFAULT_PERIOD_DAYS = 30
+# Cumulative consumption value share closing the A and B classes
+ABC_LIMITS = (0.80, 0.95)
+# Coefficient of variation of periodic demand closing the X and Y classes
+XYZ_LIMITS = (0.5, 1.0)
+# Beyond this many change log rows a full reload is cheaper than patching
+MAX_INCREMENTAL_CHANGES = 5000
+
+class _DemandState:
+    """Per-product periodic demand for one (periods, period_days, end_date) window and
+    the change log sequence it reflects"""
+
+    def __init__(self, key: Tuple, seq: int):
+        self.key = key
+        self.seq = seq
+        self.products: Dict[str, Dict] = {}
+        self.demand: Dict[str, object] = {}
+        self.report: Optional[Dict] = None
+
+_states: Dict[Tuple, _DemandState] = {}
+_lock = threading.Lock()
+
+def _load(state: _DemandState, product_ids: Optional[List[str]] = None) -> None:
+    """(Re)load product attributes and periodic demand, for all active products or only
+    for product_ids"""
+    import numpy as np
+
+    periods, period_days, end_date = state.key
+    start_date = end_date - timedelta(days=periods * period_days - 1)
+
+    query = select(Product.id, Product.name, Product.warehouse_id, Product.unit_cost).where(Product.active == True)
+    if product_ids is not None:
+        query = query.where(Product.id.in_(product_ids))
+        for product_id in product_ids:
+            state.products.pop(product_id, None)
+            state.demand.pop(product_id, None)
+
+    for product in db.session.execute(query):
+        state.products[product.id] = {
+            "name": product.name,
+            "warehouse_id": product.warehouse_id,
+            "unit_cost": float(product.unit_cost) if product.unit_cost else 0.0
+        }
+        state.demand[product.id] = np.zeros(periods)
+
+    for product_id, exit_date, quantity in db.session.execute(daily_exits_statement(start_date, end_date, product_ids)):
+        if product_id in state.demand:
+            state.demand[product_id][(exit_date - start_date).days // period_days] += float(quantity)
+
+def _classify(state: _DemandState) -> Dict:
+    import numpy as np
+
+    product_ids = list(state.products)
+    if not product_ids:
+        return {"summary": {}, "items": []}
+
+    demand = np.vstack([state.demand[product_id] for product_id in product_ids])
+    unit_cost = np.array([state.products[product_id]["unit_cost"] for product_id in product_ids])
+
+    quantity = demand.sum(axis=1)
+    value = quantity * unit_cost
+    order = np.argsort(-value, kind="stable")
+    total_value = value.sum()
+    share = value / total_value if total_value > 0 else np.zeros_like(value)
+    cumulative = np.empty_like(share)
+    cumulative[order] = np.cumsum(share[order])
+    # A product belongs to the class its cumulative share starts in, so the top item is always A
+    starts_at = cumulative - share
+    abc = np.where(value <= 0, "C", np.where(starts_at < ABC_LIMITS[0], "A", np.where(starts_at < ABC_LIMITS[1], "B", "C")))
+
+    mean = demand.mean(axis=1)
+    std = demand.std(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = np.where(mean > 0, std / mean, np.inf)
+    xyz = np.where(cv <= XYZ_LIMITS[0], "X", np.where(cv <= XYZ_LIMITS[1], "Y", "Z"))
+
+    items = []
+    summary: Dict[str, int] = {}
+    for position in order:
+        product_id = product_ids[position]
+        product_class = f"{abc[position]}{xyz[position]}"
+        summary[product_class] = summary.get(product_class, 0) + 1
+        items.append({
+            "product_id": product_id,
+            "name": state.products[product_id]["name"],
+            "warehouse_id": state.products[product_id]["warehouse_id"],
+            "consumption_quantity": round(float(quantity[position]), 2),
+            "consumption_value": round(float(value[position]), 2),
+            "value_share": round(float(share[position]), 4),
+            "cumulative_share": round(float(cumulative[position]), 4),
+            "abc": str(abc[position]),
+            "cv": round(float(cv[position]), 4) if np.isfinite(cv[position]) else None,
+            "xyz": str(xyz[position]),
+            "class": product_class
+        })
+    return {"summary": summary, "items": items}
+
+def get_abc_xyz_report(periods: int = DEFAULT_PERIODS, period_days: int = DEFAULT_PERIOD_DAYS) -> Dict:
+    """ABC (consumption value = exits x unit_cost) and XYZ (coefficient of variation of
+    the demand per period) class of every active product.
+
+    Periodic demand is loaded once per window with a grouped query and kept in memory.
+    Later calls read the change log since the cached sequence and reload only the
+    products whose exits or attributes changed before re-running the vectorized
+    classification; unchanged data is served from the cached report.
+    """
+    if periods < 2 or periods > 104:
+        raise ValueError("periods must be between 2 and 104")
+    if period_days < 1 or period_days > 366:
+        raise ValueError("period_days must be between 1 and 366")
+
+    end_date = datetime.now(pytz.timezone('America/Sao_Paulo')).date()
+    key = (periods, period_days, end_date)
+
+    with _lock:
+        latest = get_latest_sequence()
+        state = _states.get(key)
+
+        if state is not None and state.seq < latest:
+            changed = db.session.execute(
+                select(ChangeLog.entity, ChangeLog.product_id)
+                .where(ChangeLog.seq > state.seq, ChangeLog.seq <= latest, ChangeLog.entity.in_(("products", "exits")))
+                .limit(MAX_INCREMENTAL_CHANGES + 1)
+            ).all()
+            if len(changed) > MAX_INCREMENTAL_CHANGES:
+                state = None
+            else:
+                product_ids = list({product_id for _, product_id in changed if product_id is not None})
+                if product_ids:
+                    _load(state, product_ids)
+                    state.report = None
+                state.seq = latest
+
+        if state is None:
+            # A new day starts a new window; older windows are dropped
+            _states.clear()
+            state = _DemandState(key, latest)
+            _load(state)
+            _states[key] = state
+
+        if state.report is None:
+            state.report = _classify(state)
+
+        return {
+            "periods": periods,
+            "period_days": period_days,
+            "end_date": end_date.isoformat(),
+            "seq": state.seq,
+            **state.report
+        }
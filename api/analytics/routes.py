@@ -0,0 +1,29 @@
+from flask import request, jsonify, Blueprint, current_app
+from analytics.model import get_abc_xyz_report, DEFAULT_PERIODS, DEFAULT_PERIOD_DAYS
+import traceback
+
+blueprint = Blueprint('analytics', __name__)
+
+@blueprint.route("/abc-xyz", methods=["GET"])
+def abc_xyz():
+    current_app.logger.info("ABC/XYZ report requested")
+
+    try:
+        periods = int(request.args.get("periods", DEFAULT_PERIODS))
+        period_days = int(request.args.get("period_days", DEFAULT_PERIOD_DAYS))
+    except ValueError:
+        return jsonify({"error": "periods and period_days must be integers"}), 400
+
+    try:
+        report = get_abc_xyz_report(periods, period_days)
+        return jsonify({
+            "data": report,
+            "message": "ABC/XYZ report computed successfully."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error computing ABC/XYZ report: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error computing ABC/XYZ report: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to compute ABC/XYZ report due to an internal server error."}), 500
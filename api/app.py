@@ -1,10 +1,14 @@
 from flask import Flask, jsonify, current_app
 from sqlalchemy import text
-from utils.db.config import database_uri
+from utils.db.config import database_uri, engine_options
 from utils.db.connection import init_db, db
 from blueprints import register_blueprints
 from flask_cors import CORS
-from utils.db.create_tables import create_tables, insert_default_data
+from utils.db.schema import verify_schema_version
+from datetime import datetime
+import click
+import json
+import secrets
 import os
 
 application = Flask(__name__)
@@ -16,22 +20,102 @@ CORS(application, resources={
             "http://localhost:3000",    # Alternative frontend
         ],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
+        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "If-Match"],
+        "expose_headers": ["ETag"],
         "supports_credentials": True
     }
 })
 
 application.config["SQLALCHEMY_DATABASE_URI"] = database_uri()
+application.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options()
 application.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+application.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
+
+if not application.config["SECRET_KEY"]:
+    application.logger.warning("SECRET_KEY is not set, using a random key; tokens will not survive restarts or work across workers")
+    application.config["SECRET_KEY"] = secrets.token_hex(32)
 
 init_db(application)
 
-with application.app_context():
-    create_tables()
-    insert_default_data()
+# Migrations run from the CLI only (`flask --app app db upgrade`); serving processes
+# skip importing alembic entirely.
+if os.getenv("FLASK_RUN_FROM_CLI"):
+    from flask_migrate import Migrate
+    Migrate(application, db, directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
 
 register_blueprints(application)
 
+@application.before_request
+def ensure_schema_version():
+    error = verify_schema_version()
+    if error:
+        current_app.logger.error(error)
+        return jsonify({"error": "Database schema is out of date", "detail": error}), 503
+
+@application.cli.command("seed")
+def seed():
+    """Insert default data into an already migrated database"""
+    from utils.db.create_tables import insert_default_data
+    insert_default_data()
+
+@application.cli.command("archive-movements")
+@click.option("--before", help="Archive movements dated before this day (YYYY-MM-DD, first day of a month)")
+@click.option("--keep-months", default=12, show_default=True, help="Months kept in the hot tables when --before is omitted")
+def archive_movements_command(before, keep_months):
+    """Move entries/exits of closed periods to the archive tables"""
+    from archive.model import archive_movements, default_archive_boundary
+    boundary = datetime.strptime(before, '%Y-%m-%d').date() if before else default_archive_boundary(keep_months)
+    run = archive_movements(boundary)
+    click.echo(f"Archived {run.entries_moved} entries and {run.exits_moved} exits through {run.archived_through.isoformat()}")
+
+@application.cli.command("outbox-relay")
+@click.option("--sink", default=lambda: os.getenv("OUTBOX_SINK", "file:outbox_events.jsonl"), help="file:<path> or an http(s) URL")
+@click.option("--batch-size", default=500, show_default=True)
+@click.option("--interval", default=1.0, show_default=True, help="Seconds between polls when the outbox is drained")
+@click.option("--lease", default=lambda: float(os.getenv("OUTBOX_LEASE_SECONDS", "60")), help="Seconds a claimed batch stays reserved for this relay")
+@click.option("--once", is_flag=True, help="Deliver everything pending and exit")
+def outbox_relay(sink, batch_size, interval, lease, once):
+    """Deliver outbox events (entries/exits) to downstream systems"""
+    from outbox.relay import OutboxRelay
+    from outbox.sinks import build_sink
+    relay = OutboxRelay(application, build_sink(sink), batch_size, lease)
+    if once:
+        while relay.run_once():
+            pass
+        click.echo(json.dumps(relay.metrics()))
+        return
+    relay.run(poll_interval=interval)
+
+@application.cli.command("forecast-reorder")
+@click.option("--window-days", default=90, show_default=True)
+@click.option("--lead-time-days", default=7, show_default=True)
+@click.option("--review-days", default=14, show_default=True)
+@click.option("--service-level", default=0.95, show_default=True)
+@click.option("--apply", is_flag=True, help="Store the reorder points as min_quantity")
+def forecast_reorder(window_days, lead_time_days, review_days, service_level, apply):
+    """Forecast consumption and reorder points for every active product"""
+    from forecasting.model import compute_forecast, apply_reorder_points
+    forecast = compute_forecast(window_days, lead_time_days, review_days, service_level)
+    to_order = [item for item in forecast if item["suggested_order_quantity"] > 0]
+    click.echo(f"{len(forecast)} products forecast, {len(to_order)} below their reorder point")
+    if apply:
+        updated, conflicts = apply_reorder_points(forecast)
+        click.echo(f"Updated min_quantity of {updated} products")
+        if conflicts:
+            click.echo(f"Skipped {len(conflicts)} products changed since the forecast was computed: {', '.join(conflict['name'] for conflict in conflicts)}")
+
+@application.cli.command("rebuild-balances")
+def rebuild_balances():
+    """Recompute the per-warehouse stock balances from the entry/exit ledgers"""
+    from balances.model import rebuild_stock_balances
+    click.echo(f"Rebuilt {rebuild_stock_balances()} stock balances")
+
+@application.cli.command("convert-ids")
+def convert_ids():
+    """Convert existing VARCHAR(36) ids to BINARY(16); run once before setting ID_STORAGE=binary"""
+    from utils.db.convert_ids import convert_ids_to_binary
+    convert_ids_to_binary()
+
 @application.route('/health', methods=['GET'])
 def health():
     try:
@@ -0,0 +1,125 @@
+from utils.db.connection import db
+from utils.db.types import UUIDType
+from datetime import datetime, date, timedelta
+import pytz
+from typing import Dict, Optional
+from flask import current_app
+from sqlalchemy import ForeignKey, select, insert, delete, func
+
+class MovementArchive(db.Model):
+    """One row per archival run; the newest archived_through is the closed-period cutoff"""
+    __tablename__ = "movement_archives"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    archived_through = db.Column(db.Date, nullable=False, index=True)
+    entries_moved = db.Column(db.Integer, nullable=False, default=0)
+    exits_moved = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(pytz.timezone('America/Sao_Paulo')))
+
+    def serialize(self):
+        return {
+            "id": self.id,
+            "archived_through": self.archived_through.isoformat() if self.archived_through else None,
+            "entries_moved": self.entries_moved,
+            "exits_moved": self.exits_moved,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+class ArchivedBalance(db.Model):
+    """Per-product totals of the movements moved to the archive tables"""
+    __tablename__ = "archived_balances"
+
+    product_id = db.Column(UUIDType, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    entries_quantity = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    exits_quantity = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(pytz.timezone('America/Sao_Paulo')))
+
+def get_archive_cutoff() -> Optional[date]:
+    """Last day of the newest closed period, or None when nothing was archived"""
+    return db.session.execute(select(func.max(MovementArchive.archived_through))).scalar()
+
+def is_closed_period(movement_date: date) -> bool:
+    cutoff = get_archive_cutoff()
+    return cutoff is not None and movement_date <= cutoff
+
+def default_archive_boundary(keep_months: int) -> date:
+    """First day of the month keep_months before the current one"""
+    today = datetime.now(pytz.timezone('America/Sao_Paulo')).date()
+    month_index = today.year * 12 + (today.month - 1) - keep_months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def _archive_ledger(model, archive_model, date_column: str, before: date, totals: Dict[str, list], slot: int) -> int:
+    source_date = getattr(model, date_column)
+    columns = [column.name for column in archive_model.__table__.columns]
+
+    # Lock the rows being moved and sum them from that locked read: a plain SELECT would
+    # read the transaction's snapshot, while the copy and delete below see (and move)
+    # whatever was committed since, leaving archived_balances off by those rows.
+    locked = db.session.execute(
+        select(model.product_id, model.quantity)
+        .where(source_date < before)
+        .with_for_update()
+    )
+    for product_id, quantity in locked:
+        totals.setdefault(product_id, [0, 0])[slot] += quantity
+
+    db.session.execute(
+        insert(archive_model.__table__).from_select(
+            columns,
+            select(*[model.__table__.c[name] for name in columns]).where(source_date < before)
+        )
+    )
+    return db.session.execute(delete(model.__table__).where(source_date < before)).rowcount
+
+def archive_movements(before: date) -> MovementArchive:
+    """Move every entry and exit dated before `before` into the archive tables.
+
+    Runs in one transaction: rows are copied to entries_archive/exits_archive, their
+    per-product sums are added to archived_balances (so current stock stays correct)
+    and then deleted from the hot tables.
+    """
+    from entries.model import Entry, EntryArchive
+    from exits.model import Exit, ExitArchive
+
+    today = datetime.now(pytz.timezone('America/Sao_Paulo')).date()
+    if before > today.replace(day=1):
+        raise ValueError("Only closed periods (before the current month) can be archived")
+
+    cutoff = get_archive_cutoff()
+    if cutoff is not None and before <= cutoff + timedelta(days=1):
+        raise ValueError(f"Movements up to {cutoff.isoformat()} are already archived")
+
+    current_app.logger.info(f"Archiving movements before {before.isoformat()}")
+    try:
+        totals: Dict[str, list] = {}
+        entries_moved = _archive_ledger(Entry, EntryArchive, "entry_date", before, totals, 0)
+        exits_moved = _archive_ledger(Exit, ExitArchive, "exit_date", before, totals, 1)
+
+        now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+        existing = {
+            balance.product_id: balance
+            for balance in ArchivedBalance.query.filter(ArchivedBalance.product_id.in_(list(totals))).all()
+        } if totals else {}
+        for product_id, (entries_quantity, exits_quantity) in totals.items():
+            balance = existing.get(product_id)
+            if balance is None:
+                balance = ArchivedBalance(product_id=product_id, entries_quantity=0, exits_quantity=0)
+                db.session.add(balance)
+            balance.entries_quantity = (balance.entries_quantity or 0) + entries_quantity
+            balance.exits_quantity = (balance.exits_quantity or 0) + exits_quantity
+            balance.updated_at = now
+
+        run = MovementArchive(
+            archived_through=before - timedelta(days=1),
+            entries_moved=entries_moved,
+            exits_moved=exits_moved
+        )
+        db.session.add(run)
+        db.session.commit()
+
+        current_app.logger.info(f"Archived {entries_moved} entries and {exits_moved} exits")
+        return run
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error archiving movements: {str(e)}")
+        raise
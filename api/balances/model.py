@@ -0,0 +1,201 @@
+from utils.db.connection import db
+from utils.db.types import UUIDType
+from datetime import datetime
+from decimal import Decimal
+import pytz
+from typing import Dict, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import ForeignKey, Index, event, select, update, insert, delete, func, union_all, literal
+from sqlalchemy.orm import Session
+
+# Sign each ledger applies to the balance of its (product, warehouse)
+MOVEMENT_SIGNS = {"entries": 1, "exits": -1}
+STORED_LOOKUP_CHUNK = 500
+
+class StockBalance(db.Model):
+    """Current quantity of a product in one warehouse.
+
+    Kept in step with every entry and exit written through the ORM by the before_flush
+    hook below, in the same transaction as the movement, so reading a balance is one
+    primary-key lookup instead of summing the ledgers. Archiving movements does not
+    change it; bulk loads that bypass the ORM call rebuild_stock_balances.
+    """
+    __tablename__ = "stock_balances"
+
+    product_id = db.Column(UUIDType, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    warehouse_id = db.Column(UUIDType, ForeignKey('warehouses.id'), primary_key=True)
+    quantity = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(pytz.timezone('America/Sao_Paulo')))
+
+    __table_args__ = (
+        Index('ix_stock_balances_warehouse_id', 'warehouse_id'),
+    )
+
+    def __repr__(self):
+        return f"<StockBalance {self.product_id} @ {self.warehouse_id}: {self.quantity}>"
+
+    def serialize(self):
+        return {
+            "product_id": self.product_id,
+            "warehouse_id": self.warehouse_id,
+            "quantity": float(self.quantity) if self.quantity is not None else 0,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+def _upsert_statement(connection, table):
+    """INSERT that adds to the existing quantity when the (product, warehouse) row exists"""
+    if connection.dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        statement = mysql_insert(table)
+        return statement.on_duplicate_key_update(
+            quantity=table.c.quantity + statement.inserted.quantity,
+            updated_at=statement.inserted.updated_at
+        )
+    if connection.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        statement = sqlite_insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.product_id, table.c.warehouse_id],
+            set_={"quantity": table.c.quantity + statement.excluded.quantity, "updated_at": statement.excluded.updated_at}
+        )
+    return None
+
+def apply_balance_deltas(session: Session, deltas: Dict[Tuple[str, str], Decimal]) -> None:
+    """Add each delta to its (product_id, warehouse_id) balance in the current transaction.
+
+    Rows are written in key order so concurrent transactions lock them in the same order.
+    """
+    rows = [
+        {"product_id": product_id, "warehouse_id": warehouse_id, "quantity": quantity,
+         "updated_at": datetime.now(pytz.timezone('America/Sao_Paulo'))}
+        for (product_id, warehouse_id), quantity in sorted(deltas.items()) if quantity
+    ]
+    if not rows:
+        return
+
+    connection = session.connection()
+    table = StockBalance.__table__
+    statement = _upsert_statement(connection, table)
+    if statement is not None:
+        connection.execute(statement, rows)
+        return
+
+    for row in rows:
+        updated = connection.execute(
+            update(table)
+            .where(table.c.product_id == row["product_id"], table.c.warehouse_id == row["warehouse_id"])
+            .values(quantity=table.c.quantity + row["quantity"], updated_at=row["updated_at"])
+        ).rowcount
+        if not updated:
+            connection.execute(insert(table).values(**row))
+
+def _home_warehouse(session: Session, product_id: str) -> Optional[str]:
+    from products.model import Product
+    with session.no_autoflush:
+        product = session.get(Product, product_id)
+    return product.warehouse_id if product else None
+
+def _stored_movements(session: Session, objects) -> Dict[str, tuple]:
+    """(product_id, warehouse_id, quantity) of movements as the database still holds them"""
+    stored = {}
+    by_table: Dict[type, List[str]] = {}
+    for obj in objects:
+        by_table.setdefault(type(obj), []).append(obj.id)
+    for model, ids in by_table.items():
+        for offset in range(0, len(ids), STORED_LOOKUP_CHUNK):
+            stored.update({
+                row.id: (row.product_id, row.warehouse_id, row.quantity)
+                for row in session.connection().execute(
+                    select(model.id, model.product_id, model.warehouse_id, model.quantity)
+                    .where(model.id.in_(ids[offset:offset + STORED_LOOKUP_CHUNK]))
+                )
+            })
+    return stored
+
+@event.listens_for(Session, "before_flush")
+def track_balances(session, flush_context, instances):
+    """Fold pending entry/exit inserts, updates and deletes into the stock balances"""
+    deltas: Dict[Tuple[str, str], Decimal] = {}
+
+    def add(product_id, warehouse_id, quantity, sign):
+        if product_id is None or warehouse_id is None or quantity is None:
+            return
+        key = (product_id, warehouse_id)
+        deltas[key] = deltas.get(key, Decimal(0)) + sign * Decimal(str(quantity))
+
+    for obj in session.new:
+        sign = MOVEMENT_SIGNS.get(getattr(obj, "__tablename__", None))
+        if sign:
+            if obj.warehouse_id is None:
+                obj.warehouse_id = _home_warehouse(session, obj.product_id)
+            add(obj.product_id, obj.warehouse_id, obj.quantity, sign)
+
+    changed = [
+        obj for obj in session.dirty
+        if getattr(obj, "__tablename__", None) in MOVEMENT_SIGNS and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in session.deleted if getattr(obj, "__tablename__", None) in MOVEMENT_SIGNS]
+    if changed or deleted:
+        # The previous values are read back rather than taken from attribute history,
+        # which is empty for attributes that were expired when they were assigned
+        stored = _stored_movements(session, changed + deleted)
+        for obj in changed + deleted:
+            sign = MOVEMENT_SIGNS[obj.__tablename__]
+            if obj.id in stored:
+                add(*stored[obj.id], -sign)
+        for obj in changed:
+            add(obj.product_id, obj.warehouse_id, obj.quantity, MOVEMENT_SIGNS[obj.__tablename__])
+
+    apply_balance_deltas(session, deltas)
+
+def get_balance(product_id: str, warehouse_id: str, for_update: bool = False) -> float:
+    """Quantity of product_id in warehouse_id; for_update locks the row until commit"""
+    statement = select(StockBalance.quantity).where(
+        StockBalance.product_id == product_id, StockBalance.warehouse_id == warehouse_id
+    )
+    if for_update:
+        statement = statement.with_for_update()
+    quantity = db.session.execute(statement).scalar()
+    return float(quantity or 0)
+
+def get_product_balances(product_id: str) -> List[StockBalance]:
+    return StockBalance.query.filter(StockBalance.product_id == product_id, StockBalance.quantity != 0).all()
+
+def get_warehouse_balances(warehouse_id: str) -> List[StockBalance]:
+    return StockBalance.query.filter(StockBalance.warehouse_id == warehouse_id, StockBalance.quantity != 0).all()
+
+def warehouse_has_movements(warehouse_id: str) -> bool:
+    return db.session.query(select(StockBalance.product_id).where(StockBalance.warehouse_id == warehouse_id).exists()).scalar()
+
+def rebuild_stock_balances() -> int:
+    """Recompute every balance from the hot and archived ledgers in one set-based pass;
+    movements without a warehouse count in their product's warehouse"""
+    from products.model import Product
+    from entries.model import Entry, EntryArchive
+    from exits.model import Exit, ExitArchive
+
+    movements = union_all(*[
+        select(model.product_id.label("product_id"), model.warehouse_id.label("warehouse_id"),
+               (model.quantity * literal(MOVEMENT_SIGNS[model.__tablename__.replace("_archive", "")])).label("quantity"))
+        for model in (Entry, EntryArchive, Exit, ExitArchive)
+    ]).subquery("movements")
+    warehouse_id = func.coalesce(movements.c.warehouse_id, Product.warehouse_id)
+    grouped = (
+        select(movements.c.product_id, warehouse_id, func.sum(movements.c.quantity),
+               literal(datetime.now(pytz.timezone('America/Sao_Paulo')).replace(tzinfo=None)))
+        .join(Product, Product.id == movements.c.product_id)
+        .group_by(movements.c.product_id, warehouse_id)
+    )
+
+    current_app.logger.info("Rebuilding stock balances")
+    try:
+        db.session.execute(delete(StockBalance))
+        db.session.execute(insert(StockBalance).from_select(["product_id", "warehouse_id", "quantity", "updated_at"], grouped))
+        db.session.commit()
+        count = db.session.execute(select(func.count()).select_from(StockBalance)).scalar()
+        current_app.logger.info(f"Rebuilt {count} stock balances")
+        return count
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error rebuilding stock balances: {str(e)}")
+        raise
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+import os
+import traceback
+
+MAX_BATCH_REQUESTS = 20
+# Blueprints a batch may not call: itself and the never-ending event stream
+EXCLUDED_BLUEPRINTS = ("batch", "events")
+# Request headers every sub-request inherits from the batch
+FORWARDED_HEADERS = ("Authorization", "Accept-Language")
+
+def batch_workers() -> int:
+    return max(1, int(os.getenv("BATCH_MAX_WORKERS", "4")))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=batch_workers(), thread_name_prefix="batch")
+    return _executor
+
+def parse_requests(app: Flask, items) -> List[Dict]:
+    """Validate the sub-requests up front; only reads (GET, or POST to a /read/ route)
+    are accepted, so a batch can never write half of its work"""
+    if not isinstance(items, list) or not items:
+        raise ValueError("requests must be a non-empty list")
+    if len(items) > MAX_BATCH_REQUESTS:
+        raise ValueError(f"At most {MAX_BATCH_REQUESTS} requests per batch")
+
+    adapter = app.url_map.bind("localhost")
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str) or not item["path"].startswith("/"):
+            raise ValueError(f"Request {index + 1}: path is required and must start with '/'")
+        method = str(item.get("method", "GET")).upper()
+        url = urlsplit(item["path"])
+
+        try:
+            rule, _ = adapter.match(url.path, method=method, return_rule=True)
+        except HTTPException:
+            # Unknown paths are reported in the request's own result
+            rule = None
+        if rule is not None:
+            if rule.endpoint.split(".")[0] in EXCLUDED_BLUEPRINTS:
+                raise ValueError(f"Request {index + 1}: {url.path} cannot be called from a batch")
+            if method != "GET" and not (method == "POST" and "/read/" in rule.rule):
+                raise ValueError(f"Request {index + 1}: only read requests are allowed in a batch")
+
+        parsed.append({
+            "id": item.get("id", str(index)),
+            "method": method,
+            "path": url.path,
+            "query_string": url.query,
+            "body": item.get("body")
+        })
+    return parsed
+
+def execute(app: Flask, item: Dict, headers: Dict[str, str]) -> Dict:
+    """Run one sub-request through the normal request pipeline (before_request hooks,
+    routing, the view and its error handling) without another HTTP round trip"""
+    with app.test_request_context(item["path"], method=item["method"], query_string=item["query_string"],
+                                  headers=headers, json=item["body"]):
+        try:
+            response = app.preprocess_request()
+            if response is None:
+                response = app.dispatch_request()
+            response = app.make_response(response)
+        except HTTPException as e:
+            return {"id": item["id"], "status": e.code, "body": {"error": e.description}}
+        except Exception as e:
+            app.logger.error(f"Error running batch request {item['method']} {item['path']}: {str(e)}")
+            app.logger.error(traceback.format_exc())
+            return {"id": item["id"], "status": 500, "body": {"error": "Internal server error."}}
+        return {"id": item["id"], "status": response.status_code, "body": response.get_json(silent=True)}
+
+def execute_batch(app: Flask, items: List[Dict], headers: Dict[str, str]) -> List[Dict]:
+    """Results in request order.
+
+    With one worker the sub-requests run one after the other inside the batch's own
+    app context, so they share its database session and connection. With more, they
+    run on a small thread pool; each thread pushes its own context and therefore uses
+    its own session (a Session is not thread-safe), trading one pooled connection per
+    worker for overlapping the queries.
+    """
+    if batch_workers() == 1 or len(items) == 1:
+        return [execute(app, item, headers) for item in items]
+
+    def run(item):
+        with app.app_context():
+            return execute(app, item, headers)
+
+    return list(_get_executor().map(run, items))
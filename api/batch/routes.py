@@ -0,0 +1,32 @@
+from flask import request, jsonify, Blueprint, current_app
+from batch.dispatch import parse_requests, execute_batch, FORWARDED_HEADERS
+import traceback
+
+blueprint = Blueprint('batch', __name__)
+
+@blueprint.route("", methods=["POST"])
+def run_batch():
+    """Several read requests in one round trip: {"requests": [{"id", "method", "path",
+    "body"}]} -> {"data": [{"id", "status", "body"}]} in the same order"""
+    current_app.logger.info(f"Batch requested")
+    data = request.get_json(silent=True)
+
+    if not data or "requests" not in data:
+        return jsonify({"error": "Request body must be JSON with a 'requests' list"}), 400
+
+    try:
+        app = current_app._get_current_object()
+        items = parse_requests(app, data["requests"])
+        headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+        results = execute_batch(app, items, headers)
+        return jsonify({
+            "data": results,
+            "message": f"{len(results)} requests executed."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error running batch: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error running batch: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to run batch due to an internal server error."}), 500
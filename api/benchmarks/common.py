@@ -0,0 +1,49 @@
+from typing import Dict, List, Optional, Tuple
+import urllib.request
+import urllib.error
+import json
+import time
+import os
+
+def base_url() -> str:
+    return os.getenv("BENCH_BASE_URL", "http://localhost:5001").rstrip("/")
+
+def http_request(method: str, path: str, body: Optional[Dict] = None, timeout: float = 30.0) -> Tuple[int, float]:
+    """Send one request and return (status, elapsed seconds); network errors report status 0"""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(f"{base_url()}{path}", data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, time.perf_counter() - start
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+def latency_summary(samples: List[float]) -> Dict:
+    """Latency percentiles in milliseconds"""
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0
+    }
+
+def write_report(report: Dict, path: Optional[str]) -> None:
+    output = json.dumps(report, indent=2)
+    if path:
+        with open(path, "w") as f:
+            f.write(output)
+    print(output)
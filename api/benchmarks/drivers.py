@@ -0,0 +1,70 @@
+"""Result-set decoding speed of each MySQL driver on the movement tables.
+
+    python -m benchmarks.drivers --rows 200000 --repeat 5
+
+For every driver in utils.db.config.DRIVERS that is importable, opens an engine against
+the configured database (DB_* variables) and times fetching up to --rows rows from
+entries and exits, reporting the best and median wall time and rows per second.
+"""
+from statistics import median
+import argparse
+import importlib
+import time
+from sqlalchemy import create_engine, text
+from utils.db.config import DRIVERS, database_uri, engine_options
+from benchmarks.common import write_report
+
+DRIVER_MODULES = {"mysqlconnector": "mysql.connector", "mysqlclient": "MySQLdb", "pymysql": "pymysql"}
+
+QUERIES = {
+    "entries": "SELECT id, product_id, entry_date, quantity, observation, created_at, updated_at FROM entries LIMIT :rows",
+    "exits": "SELECT id, product_id, exit_date, quantity, observation, created_at, updated_at FROM exits LIMIT :rows",
+}
+
+def bench_driver(driver: str, rows: int, repeat: int):
+    options = engine_options(driver)
+    options.pop("pool_size", None)
+    options.pop("max_overflow", None)
+    engine = create_engine(database_uri(driver), **options)
+    report = {}
+
+    try:
+        with engine.connect() as connection:
+            for table, sql in QUERIES.items():
+                timings, fetched = [], 0
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    fetched = len(connection.execute(text(sql), {"rows": rows}).fetchall())
+                    timings.append(time.perf_counter() - started)
+                report[table] = {
+                    "rows": fetched,
+                    "best_ms": round(min(timings) * 1000, 2),
+                    "median_ms": round(median(timings) * 1000, 2),
+                    "rows_per_s": round(fetched / min(timings)) if fetched else 0
+                }
+    finally:
+        engine.dispose()
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--drivers", nargs="*", default=list(DRIVERS))
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = {}
+    for driver in args.drivers:
+        try:
+            importlib.import_module(DRIVER_MODULES[driver])
+        except ImportError:
+            results[driver] = {"skipped": "driver not installed"}
+            continue
+        results[driver] = bench_driver(driver, args.rows, args.repeat)
+
+    write_report({"rows": args.rows, "repeat": args.repeat, "drivers": results}, args.output)
+
+if __name__ == "__main__":
+    main()
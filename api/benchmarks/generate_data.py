@@ -0,0 +1,160 @@
+"""Bulk-load synthetic warehouses, categories, products and movements for benchmarks.
+
+    python -m benchmarks.generate_data --warehouses 20 --categories 40 --products 20000 \\
+        --entries 2000000 --exits 2000000 --days 730
+
+Rows follow the shape of saep_db.sql (tool categories, products with cost and minimum
+quantity, dated entries/exits with observations) and are inserted with multi-row
+INSERTs in batches through the configured database (DB_* variables, ID_STORAGE).
+Product demand is skewed (a few products get most movements, like a real catalog);
+entries are dated before exits and carry larger quantities, so balances stay positive.
+Products get generated SKUs and barcodes for the lookup endpoint.
+
+Generated rows bypass the change log and the outbox: run it on a benchmark database,
+not on one that feeds handhelds or downstream systems. Stock balances are rebuilt
+from the ledgers once the movements are loaded.
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import random
+import time
+import numpy as np
+import pytz
+from sqlalchemy import insert
+from app import application
+from utils.db.connection import db
+from utils.db.types import new_id
+from categories.model import Category, CategoryClosure
+from warehouses.model import Warehouse
+from products.model import Product
+from entries.model import Entry
+from exits.model import Exit
+from balances.model import rebuild_stock_balances
+from benchmarks.common import write_report
+
+CATEGORY_NAMES = [
+    "Ferramentas Manuais", "Ferramentas Elétricas", "Ferramentas de Medição", "Ferramentas de Corte",
+    "Ferramentas de Fixação", "Equipamentos de Segurança", "Ferramentas Pneumáticas", "Acessórios e Consumíveis",
+]
+PRODUCT_NAMES = [
+    "Martelo Unha", "Martelo Borracha", "Alicate Universal", "Alicate de Corte", "Chave de Fenda", "Chave Philips",
+    "Furadeira de Impacto", "Parafusadeira", "Trena", "Paquímetro", "Nível de Bolha", "Serra Circular", "Estilete",
+    "Parafuso Sextavado", "Bucha Nylon", "Luva de Proteção", "Óculos de Segurança", "Broca Aço Rápido", "Disco de Corte", "Lixa",
+]
+ENTRY_OBSERVATIONS = ["Compra fornecedor nacional", "Reposição de estoque", "Compra em lote - promoção", "Pedido mensal", None]
+EXIT_OBSERVATIONS = ["Uso administrativo", "Distribuição para equipes", "Setup de workstations", "Manutenção", None]
+
+def insert_batches(model, rows, batch: int) -> None:
+    for offset in range(0, len(rows), batch):
+        db.session.execute(insert(model), rows[offset:offset + batch])
+        db.session.commit()
+
+def generate_movements(model, date_field: str, count: int, product_ids, product_warehouses, weights, start: date, days: int,
+                       quantities, observations, batch: int, rng) -> float:
+    """Insert `count` movements spread over [start, start + days) and return the elapsed time"""
+    now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+    started = time.perf_counter()
+    for offset in range(0, count, batch):
+        size = min(batch, count - offset)
+        products = rng.choice(len(product_ids), size=size, p=weights)
+        offsets = rng.integers(0, days, size=size)
+        amounts = rng.integers(quantities[0], quantities[1], size=size)
+        db.session.execute(insert(model), [{
+            "id": new_id(),
+            "product_id": product_ids[products[i]],
+            "warehouse_id": product_warehouses[products[i]],
+            date_field: start + timedelta(days=int(offsets[i])),
+            "quantity": int(amounts[i]),
+            "observation": observations[i % len(observations)],
+            "created_at": now,
+            "updated_at": now
+        } for i in range(size)])
+        db.session.commit()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--warehouses", type=int, default=10)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--exits", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=730, help="History length ending today")
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+    label = new_id()[-6:]
+    now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+    today = now.date()
+    history_start = today - timedelta(days=args.days)
+    timings = {}
+
+    with application.app_context():
+        started = time.perf_counter()
+        warehouses = [{
+            "id": new_id(), "name": f"Armazém {label}-{i + 1}", "description": f"Armazém gerado {i + 1}",
+            "active": True, "created_at": now, "updated_at": now
+        } for i in range(args.warehouses)]
+        categories = [{
+            "id": new_id(), "name": f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {label}-{i + 1}",
+            "description": None, "active": True, "created_at": now, "updated_at": now
+        } for i in range(args.categories)]
+        insert_batches(Warehouse, warehouses, args.batch)
+        insert_batches(Category, categories, args.batch)
+        insert_batches(CategoryClosure, [{"ancestor_id": c["id"], "descendant_id": c["id"], "depth": 0} for c in categories], args.batch)
+
+        products = [{
+            "id": new_id(),
+            "name": f"{PRODUCT_NAMES[i % len(PRODUCT_NAMES)]} {label}-{i + 1}",
+            "sku": f"GEN-{label}-{i + 1:07d}",
+            "barcode": f"789{label.encode().hex()}{i + 1:07d}",
+            "category_id": categories[i % len(categories)]["id"] if categories else None,
+            "warehouse_id": warehouses[i % len(warehouses)]["id"],
+            "min_quantity": random.choice([5, 10, 20, 30, 50]),
+            "unit_cost": round(random.uniform(1, 500), 2),
+            "observation": None,
+            "active": True,
+            "created_at": now,
+            "updated_at": now
+        } for i in range(args.products)]
+        insert_batches(Product, products, args.batch)
+        timings["catalog_s"] = round(time.perf_counter() - started, 2)
+
+        product_ids = [product["id"] for product in products]
+        product_warehouses = [product["warehouse_id"] for product in products]
+        # Zipf-like popularity: product k gets weight 1 / k
+        weights = 1.0 / np.arange(1, len(product_ids) + 1)
+        weights /= weights.sum()
+
+        # Entries fill the first half of the history with larger quantities, exits the
+        # second half with smaller ones, so no product goes negative
+        half = max(1, args.days // 2)
+        timings["entries_s"] = round(generate_movements(
+            Entry, "entry_date", args.entries, product_ids, product_warehouses, weights, history_start, half,
+            (20, 200), ENTRY_OBSERVATIONS, args.batch, rng), 2)
+        timings["exits_s"] = round(generate_movements(
+            Exit, "exit_date", args.exits, product_ids, product_warehouses, weights, history_start + timedelta(days=half), args.days - half + 1,
+            (1, 10), EXIT_OBSERVATIONS, args.batch, rng), 2)
+
+        started = time.perf_counter()
+        rebuild_stock_balances()
+        timings["balances_s"] = round(time.perf_counter() - started, 2)
+
+    write_report({
+        "label": label,
+        "warehouses": args.warehouses,
+        "categories": args.categories,
+        "products": args.products,
+        "entries": args.entries,
+        "exits": args.exits,
+        "days": args.days,
+        "timings": timings,
+        "movements_per_s": round((args.entries + args.exits) / max(timings["entries_s"] + timings["exits_s"], 1e-9))
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
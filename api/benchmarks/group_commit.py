@@ -0,0 +1,80 @@
+"""Commits per second vs. added latency of group commit for single movement creates.
+
+    python -m benchmarks.group_commit --threads 32 --duration 10 --max-wait-ms 0 2 5 10
+
+Creates a scratch warehouse and product in the configured database (DB_* variables) and
+has --threads threads call create_entry back to back, the way concurrent scanner posts
+reach a worker: first committing inline (one commit per entry, the default), then
+through a GroupCommitter for each --max-wait-ms. Reports entries and commits per second,
+the mean batch size and the create_entry latency percentiles of every configuration.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import argparse
+import threading
+import time
+from app import application
+from utils.db.connection import db
+from utils.db.types import new_id
+from utils.db.group_commit import GroupCommitter
+from warehouses.model import create_warehouse, hard_delete_warehouse
+from products.model import create_product, hard_delete_product
+from entries.model import create_entry
+from benchmarks.common import latency_summary, write_report
+
+def run_creates(product_id: str, stop: threading.Event, latencies: list) -> None:
+    entry = {"product_id": product_id, "quantity": 1, "entry_date": date.today().isoformat(), "observation": "bench-group-commit"}
+    while not stop.is_set():
+        with application.app_context():
+            started = time.perf_counter()
+            create_entry(entry)
+            latencies.append(time.perf_counter() - started)
+
+def measure(product_id: str, committer, threads: int, duration: float) -> dict:
+    application.extensions["group_commit"] = committer
+    latencies = []
+    stop = threading.Event()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(run_creates, product_id, stop, latencies) for _ in range(threads)]
+        time.sleep(duration)
+        stop.set()
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - started
+
+    commits = committer.commits if committer else len(latencies)
+    return {
+        "entries_per_s": round(len(latencies) / elapsed, 1),
+        "commits_per_s": round(commits / elapsed, 1),
+        "mean_batch": round(len(latencies) / commits, 2) if commits else 0.0,
+        "latency": latency_summary(latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--max-wait-ms", type=float, nargs="+", default=[0, 2, 5, 10])
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    with application.app_context():
+        warehouse_id = create_warehouse({"name": f"bench-group-commit-{new_id()[:8]}"}).id
+        product_id = create_product({"name": "bench-group-commit", "warehouse_id": warehouse_id, "min_quantity": 0, "unit_cost": 0}).id
+
+    results = {"inline": measure(product_id, None, args.threads, args.duration)}
+    for max_wait_ms in args.max_wait_ms:
+        committer = GroupCommitter(application, max_wait=max_wait_ms / 1000, max_batch=args.max_batch, timeout=30)
+        results[f"group_{max_wait_ms:g}ms"] = measure(product_id, committer, args.threads, args.duration)
+    application.extensions.pop("group_commit", None)
+
+    with application.app_context():
+        hard_delete_product(product_id)
+        hard_delete_warehouse(warehouse_id)
+
+    write_report({"threads": args.threads, "duration_s": args.duration, "max_batch": args.max_batch, "results": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Hard delete of a product with a large movement history: ORM cascade vs set-based.
+
+    python -m benchmarks.hard_delete --movements 200000 --batch 10000
+
+Creates a scratch warehouse and two products in the configured database (DB_* variables),
+bulk loads --movements entries/exits for each, then deletes one the way the ORM cascade
+did (load every movement into the session and delete it row by row) and the other with
+hard_delete_product (one DELETE per ledger table). Reports wall time and the peak
+Python memory of each path.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+import pytz
+from sqlalchemy import insert
+from app import application
+from utils.db.connection import db
+from utils.db.types import new_id
+from warehouses.model import create_warehouse, hard_delete_warehouse
+from products.model import Product, create_product, hard_delete_product
+from entries.model import Entry
+from exits.model import Exit
+from benchmarks.common import write_report
+
+def load_movements(product_id: str, warehouse_id: str, movements: int, batch: int) -> None:
+    start_date = date(2020, 1, 1)
+    now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+    for offset in range(0, movements, batch):
+        rows = []
+        for i in range(min(batch, movements - offset)):
+            day = start_date + timedelta(days=(offset + i) % 2000)
+            rows.append({"id": new_id(), "product_id": product_id, "date": day, "quantity": random.randint(1, 10)})
+        db.session.execute(insert(Entry), [
+            {"id": r["id"], "product_id": product_id, "warehouse_id": warehouse_id, "entry_date": r["date"], "quantity": r["quantity"] * 2,
+             "created_at": now, "updated_at": now} for r in rows[::2]
+        ])
+        db.session.execute(insert(Exit), [
+            {"id": r["id"], "product_id": product_id, "warehouse_id": warehouse_id, "exit_date": r["date"], "quantity": r["quantity"],
+             "created_at": now, "updated_at": now} for r in rows[1::2]
+        ])
+        db.session.commit()
+
+def orm_cascade_delete(product_id: str) -> None:
+    """The previous behaviour: every movement becomes an ORM object before it is deleted"""
+    product = db.session.get(Product, product_id)
+    for movement in product.entries.all() + product.exits.all():
+        db.session.delete(movement)
+    db.session.delete(product)
+    db.session.commit()
+
+def measure(func, product_id: str) -> dict:
+    db.session.expunge_all()
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(product_id)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": round(elapsed, 3), "peak_python_mb": round(peak / 1024 / 1024, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movements", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    with application.app_context():
+        warehouse_id = create_warehouse({"name": f"bench-hard-delete-{new_id()[:8]}"}).id
+        products = {}
+        for path in ("orm_cascade", "set_based"):
+            product = create_product({"name": f"bench-{path}", "warehouse_id": warehouse_id, "min_quantity": 0, "unit_cost": 0})
+            load_movements(product.id, warehouse_id, args.movements, args.batch)
+            products[path] = product.id
+
+        results = {
+            "orm_cascade": measure(orm_cascade_delete, products["orm_cascade"]),
+            "set_based": measure(hard_delete_product, products["set_based"]),
+        }
+        hard_delete_warehouse(warehouse_id)
+
+    write_report({"movements_per_product": args.movements, "results": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Insert throughput and index size: VARCHAR(36) UUIDv4 vs BINARY(16) UUIDv7 keys.
+
+    python -m benchmarks.id_storage --rows 2000000 --batch 5000
+
+Creates two scratch tables shaped like `entries` (primary key, product_id secondary
+index, date, quantity) in the configured database, loads the same number of rows into
+each in batches, and reports rows/s plus InnoDB data and index size taken from
+information_schema after ANALYZE TABLE. Tables are dropped afterwards unless --keep.
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from sqlalchemy import create_engine, text
+from utils.db.config import database_uri, engine_options
+from utils.db.types import uuid7
+from benchmarks.common import write_report
+
+LAYOUTS = {
+    "varchar36_uuid4": {
+        "ddl": "id VARCHAR(36) NOT NULL PRIMARY KEY, product_id VARCHAR(36) NOT NULL",
+        "make_id": lambda: str(uuid.uuid4()),
+    },
+    "binary16_uuid7": {
+        "ddl": "id BINARY(16) NOT NULL PRIMARY KEY, product_id BINARY(16) NOT NULL",
+        "make_id": lambda: uuid7().bytes,
+    },
+}
+
+def load_table(connection, name, layout, rows, batch, product_ids):
+    table = f"bench_ids_{name}"
+    connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    connection.execute(text(
+        f"CREATE TABLE {table} ({layout['ddl']}, entry_date DATE NOT NULL, quantity DECIMAL(10, 2) NOT NULL, "
+        f"KEY ix_{table}_product (product_id)) ENGINE=InnoDB"
+    ))
+    connection.commit()
+
+    insert = text(f"INSERT INTO {table} (id, product_id, entry_date, quantity) VALUES (:id, :product_id, :entry_date, :quantity)")
+    start_date = date(2020, 1, 1)
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        connection.execute(insert, [{
+            "id": layout["make_id"](),
+            "product_id": random.choice(product_ids),
+            "entry_date": start_date + timedelta(days=(offset + i) % 2000),
+            "quantity": random.randint(1, 100)
+        } for i in range(min(batch, rows - offset))])
+        connection.commit()
+    elapsed = time.perf_counter() - started
+
+    connection.execute(text(f"ANALYZE TABLE {table}"))
+    sizes = connection.execute(text(
+        "SELECT DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+    ), {"table": table}).one()
+
+    return table, {
+        "rows": rows,
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed),
+        "data_mb": round(sizes[0] / 1024 / 1024, 2),
+        "index_mb": round(sizes[1] / 1024 / 1024, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    engine = create_engine(database_uri(), **engine_options())
+    results = {}
+    with engine.connect() as connection:
+        for name, layout in LAYOUTS.items():
+            product_ids = [layout["make_id"]() for _ in range(args.products)]
+            table, results[name] = load_table(connection, name, layout, args.rows, args.batch, product_ids)
+            if not args.keep:
+                connection.execute(text(f"DROP TABLE {table}"))
+                connection.commit()
+    engine.dispose()
+
+    write_report({"rows": args.rows, "batch": args.batch, "layouts": results}, args.output)
+
+if __name__ == "__main__":
+    main()
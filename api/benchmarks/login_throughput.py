@@ -0,0 +1,82 @@
+"""Login throughput vs. latency of other endpoints under a login storm.
+
+Runs against a live API (BENCH_BASE_URL, default http://localhost:5001):
+
+    python -m benchmarks.login_throughput --email admin@ferramentas.com --password password123 \\
+        --login-threads 64 --duration 30 --probe-path /products/read/all
+
+Login threads hammer /users/login while a single probe thread requests the probe path
+at a fixed rate. The report shows how many logins per second were served, how many were
+shed with 429/503, and the p50/p95/p99 of the probe endpoint during the storm.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+import argparse
+import threading
+import time
+from benchmarks.common import http_request, latency_summary, write_report
+
+def run_logins(email, password, stop, results, lock):
+    while not stop.is_set():
+        status, elapsed = http_request("POST", "/users/login", {"email": email, "password": password})
+        with lock:
+            results["statuses"][status] += 1
+            if status == 200:
+                results["latencies"].append(elapsed)
+
+def run_probe(path, interval, stop, samples):
+    while not stop.is_set():
+        started = time.perf_counter()
+        status, elapsed = http_request("GET", path)
+        if status == 200:
+            samples.append(elapsed)
+        time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--login-threads", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--probe-path", default="/health")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    baseline = []
+    stop = threading.Event()
+    probe = threading.Thread(target=run_probe, args=(args.probe_path, args.probe_interval, stop, baseline))
+    probe.start()
+    time.sleep(min(5.0, args.duration / 4))
+    stop.set()
+    probe.join()
+
+    results = {"statuses": Counter(), "latencies": []}
+    lock = threading.Lock()
+    under_load = []
+    stop = threading.Event()
+    probe = threading.Thread(target=run_probe, args=(args.probe_path, args.probe_interval, stop, under_load))
+
+    started = time.perf_counter()
+    probe.start()
+    with ThreadPoolExecutor(max_workers=args.login_threads) as pool:
+        for _ in range(args.login_threads):
+            pool.submit(run_logins, args.email, args.password, stop, results, lock)
+        time.sleep(args.duration)
+        stop.set()
+    probe.join()
+    elapsed = time.perf_counter() - started
+
+    write_report({
+        "login_threads": args.login_threads,
+        "duration_s": round(elapsed, 2),
+        "logins_per_s": round(results["statuses"][200] / elapsed, 2),
+        "login_statuses": {str(k): v for k, v in results["statuses"].items()},
+        "login_latency": latency_summary(results["latencies"]),
+        "probe_path": args.probe_path,
+        "probe_idle": latency_summary(baseline),
+        "probe_under_load": latency_summary(under_load)
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Scan rate of /products/lookup/<code> against a live API (BENCH_BASE_URL).
+
+    python -m benchmarks.lookup --threads 16 --duration 20
+
+Collects the SKUs/barcodes of the products returned by /products/read/all, then
+threads scan random codes back to back for --duration seconds. Reports scans per
+second, the status counts and the latency percentiles.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from urllib.parse import quote
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+from benchmarks.common import base_url, http_request, latency_summary, write_report
+
+def product_codes():
+    with urllib.request.urlopen(f"{base_url()}/products/read/all", timeout=60) as response:
+        products = json.loads(response.read())["data"]
+    return [code for product in products for code in (product.get("sku"), product.get("barcode")) if code]
+
+def run_scans(codes, stop, results, lock):
+    while not stop.is_set():
+        status, elapsed = http_request("GET", f"/products/lookup/{quote(random.choice(codes), safe='')}")
+        with lock:
+            results["statuses"][status] += 1
+            if status == 200:
+                results["latencies"].append(elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    codes = product_codes()
+    if not codes:
+        raise SystemExit("No product has a sku or barcode; set some before running the benchmark")
+
+    results = {"statuses": Counter(), "latencies": []}
+    lock = threading.Lock()
+    stop = threading.Event()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        for _ in range(args.threads):
+            pool.submit(run_scans, codes, stop, results, lock)
+        time.sleep(args.duration)
+        stop.set()
+    elapsed = time.perf_counter() - started
+
+    write_report({
+        "codes": len(codes),
+        "threads": args.threads,
+        "duration_s": round(elapsed, 2),
+        "scans_per_s": round(results["statuses"][200] / elapsed, 2),
+        "statuses": {str(k): v for k, v in results["statuses"].items()},
+        "latency": latency_summary(results["latencies"])
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Local HTTP stand-in for a downstream system (ERP/BI) receiving outbox batches.
+
+    python -m benchmarks.outbox_receiver --port 8099 --fail-rate 0.1
+    OUTBOX_SINK=http://localhost:8099/events flask --app app outbox-relay
+
+Accepts POSTed JSON arrays, answers 503 for a --fail-rate share of batches to exercise
+redelivery, and on Ctrl+C reports received/unique/duplicate events and events per
+second, which shows the relay's at-least-once behaviour.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import threading
+import time
+from benchmarks.common import write_report
+
+class Receiver:
+    def __init__(self, fail_rate: float):
+        self.fail_rate = fail_rate
+        self.lock = threading.Lock()
+        self.received = 0
+        self.batches = 0
+        self.rejected_batches = 0
+        self.seen = set()
+        self.first = None
+        self.last = None
+
+    def handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                events = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with receiver.lock:
+                    if random.random() < receiver.fail_rate:
+                        receiver.rejected_batches += 1
+                        status = 503
+                    else:
+                        receiver.first = receiver.first or time.perf_counter()
+                        receiver.last = time.perf_counter()
+                        receiver.received += len(events)
+                        receiver.batches += 1
+                        receiver.seen.update(outbox_event["id"] for outbox_event in events)
+                        status = 204
+                self.send_response(status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def report(self):
+        # Rate between the first and the last accepted batch
+        elapsed = (self.last - self.first) if self.batches > 1 else 0
+        return {
+            "received": self.received,
+            "batches": self.batches,
+            "unique": len(self.seen),
+            "duplicates": self.received - len(self.seen),
+            "rejected_batches": self.rejected_batches,
+            "events_per_s": round(self.received / elapsed, 2) if elapsed else None
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    receiver = Receiver(args.fail_rate)
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), receiver.handler())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        write_report(receiver.report(), args.output)
+
+if __name__ == "__main__":
+    main()
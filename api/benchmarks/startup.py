@@ -0,0 +1,72 @@
+"""Cold start cost of the API: import time and time to first request.
+
+    python -m benchmarks.startup --port 5055
+
+Step 1 runs `python -X importtime -c "import app"` and reports the total import time
+and the slowest modules imported directly by app.py. Step 2 starts the app with `flask run` (no reloader)
+and polls /health until it answers, reporting the wall time from spawn to first 200.
+Needs the usual DB_* variables pointing at a migrated database.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+import urllib.error
+from benchmarks.common import write_report
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure_imports(top: int):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            cwd=API_DIR, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(cumulative_us), int(self_us), name.strip(), depth))
+
+    top_level = [item for item in imports if item[3] == 1]
+    return {
+        "exit_code": result.returncode,
+        "total_ms": round(sum(item[1] for item in imports) / 1000, 2),
+        "slowest": [{"module": name, "cumulative_ms": round(cumulative / 1000, 2)}
+                    for cumulative, _, name, _ in sorted(top_level, reverse=True)[:top]]
+    }
+
+def measure_first_request(port: int, timeout: float):
+    env = dict(os.environ, FLASK_DEBUG="0")
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "flask", "--app", "app", "run", "--no-reload", "--port", str(port)],
+                               cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return {"time_to_first_request_ms": round((time.perf_counter() - started) * 1000, 2)}
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.02)
+        return {"time_to_first_request_ms": None, "error": "timed out"}
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    write_report({
+        "imports": measure_imports(args.top),
+        "startup": measure_first_request(args.port, args.timeout)
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Repeatable benchmark suite for the API hot paths, with a JSON baseline to compare against.
+
+    python -m benchmarks.generate_data --products 20000 --entries 2000000 --exits 2000000
+    python -m benchmarks.suite --repeat 20 --output baseline.json
+    python -m benchmarks.suite --repeat 20 --compare baseline.json --tolerance 0.25
+
+Runs in-process against the configured database (DB_* variables) through the Flask test
+client, so no server is needed. Every case (one or more per blueprint, plus the model
+functions behind them) is called once to warm up and then --repeat times, recording
+latency percentiles, SQL statements per call and the peak Python memory of one call.
+With --compare, cases whose p50 or query count grew by more than --tolerance against
+the baseline are listed and the exit status is 1. --cases filters by substring; the
+full-ledger listings (/entries/read/all, /exits/read/all) only run with --include-full.
+"""
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from urllib.parse import quote
+from sqlalchemy import event, select, func
+from app import application
+from utils.db.connection import db
+from products.model import Product, get_low_stock_products, get_current_stocks, get_product_current_stock
+from entries.model import Entry
+from warehouses.model import Warehouse
+from categories.model import Category
+from benchmarks.common import latency_summary, write_report
+
+FULL_LISTINGS = ("GET /entries/read/all", "GET /exits/read/all")
+
+def sample_ids() -> Dict:
+    """Ids the cases run against: the busiest product (and a prefix of its name), an
+    arbitrary warehouse and category, and the first 50 products for the multi-get"""
+    busiest = db.session.execute(
+        select(Entry.product_id).group_by(Entry.product_id).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    product = db.session.get(Product, busiest) if busiest else Product.query.first()
+    if product is None:
+        raise SystemExit("The database has no products; run benchmarks.generate_data first")
+    return {
+        "product_id": product.id,
+        "code": product.sku or product.barcode,
+        "search": product.name[:5],
+        "many": list(db.session.execute(select(Product.id).limit(50)).scalars()),
+        "warehouse_id": product.warehouse_id,
+        "category_id": product.category_id or (Category.query.first().id if Category.query.first() else None)
+    }
+
+def build_cases(client, ids: Dict) -> Dict[str, Callable]:
+    today = date.today()
+    month_ago = (today - timedelta(days=30)).isoformat()
+
+    def get(path):
+        return lambda: client.get(path)
+
+    def post(path, body):
+        return lambda: client.post(path, json=body)
+
+    cases = {
+        "GET /products/read/all": get("/products/read/all"),
+        "GET /products/read/low-stock": get("/products/read/low-stock"),
+        "GET /products/read/<id>": get(f"/products/read/{ids['product_id']}"),
+        "GET /products/read/warehouse/<id>": get(f"/products/read/warehouse/{ids['warehouse_id']}"),
+        "GET /products/search": get(f"/products/search?q={quote(ids['search'])}"),
+        "POST /products/read/many (50)": post("/products/read/many", {"ids": ids["many"]}),
+        "GET /products/<id>/timeline": get(f"/products/{ids['product_id']}/timeline?limit=50"),
+        "GET /warehouses/read/all": get("/warehouses/read/all"),
+        "GET /warehouses/summary": get("/warehouses/summary"),
+        "GET /categories/read/all": get("/categories/read/all"),
+        "GET /roles/read/all": get("/roles/read/all"),
+        "GET /gender/read/all": get("/gender/read/all"),
+        "GET /entries/read/product/<id>": get(f"/entries/read/product/{ids['product_id']}"),
+        "GET /exits/read/product/<id>": get(f"/exits/read/product/{ids['product_id']}"),
+        "POST /entries/read/date-range (30 days)": post("/entries/read/date-range", {"start_date": month_ago, "end_date": today.isoformat()}),
+        "POST /exits/read/date-range (30 days)": post("/exits/read/date-range", {"start_date": month_ago, "end_date": today.isoformat()}),
+        "GET /entries/read/all": get("/entries/read/all"),
+        "GET /exits/read/all": get("/exits/read/all"),
+        "GET /sync/changes": get("/sync/changes?since=0&limit=500"),
+        "GET /forecasting/reorder": get("/forecasting/reorder"),
+        "GET /analytics/abc-xyz": get("/analytics/abc-xyz"),
+        "GET /outbox/stats": get("/outbox/stats"),
+        "POST /batch (dashboard)": post("/batch", {"requests": [
+            {"id": "products", "path": "/products/read/all"},
+            {"id": "warehouses", "path": "/warehouses/read/all"},
+            {"id": "low_stock", "path": "/products/read/low-stock"}
+        ]}),
+        "model get_low_stock_products": get_low_stock_products,
+        "model get_current_stocks (all)": get_current_stocks,
+        "model get_product_current_stock": lambda: get_product_current_stock(ids["product_id"]),
+    }
+    if ids["code"]:
+        cases["GET /products/lookup/<code>"] = get(f"/products/lookup/{ids['code']}")
+    if ids["category_id"]:
+        cases["GET /products/read/category/<id>"] = get(f"/products/read/category/{ids['category_id']}")
+    return cases
+
+def run_case(func: Callable, repeat: int, counter: List[int]) -> Dict:
+    """Warm up once, measure queries and peak memory on a second call, then time `repeat` calls"""
+    warmup = func()
+    db.session.remove()
+    status = getattr(warmup, "status_code", None)
+
+    counter[0] = 0
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    queries = counter[0]
+    db.session.remove()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+        db.session.remove()
+
+    result = {**latency_summary(samples), "queries": queries, "peak_python_mb": round(peak / 1024 / 1024, 2)}
+    if status is not None:
+        result["status"] = status
+    return result
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if previous["p50_ms"] > 0 and current["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {previous['p50_ms']} -> {current['p50_ms']} ms")
+        if current["queries"] > previous["queries"] * (1 + tolerance):
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--cases", nargs="*", help="Only run cases whose name contains one of these strings")
+    parser.add_argument("--include-full", action="store_true", help="Also run the full-ledger listings")
+    parser.add_argument("--compare", help="Baseline JSON written by a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    client = application.test_client()
+    results = {}
+    with application.app_context():
+        counter = [0]
+
+        def count_statement(*_):
+            counter[0] += 1
+
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        ids = sample_ids()
+        dataset = {
+            "products": db.session.execute(select(func.count(Product.id))).scalar(),
+            "warehouses": db.session.execute(select(func.count(Warehouse.id))).scalar(),
+            "entries": db.session.execute(select(func.count(Entry.id))).scalar(),
+        }
+        db.session.remove()
+
+        for name, func_ in build_cases(client, ids).items():
+            if name in FULL_LISTINGS and not args.include_full:
+                continue
+            if args.cases and not any(pattern in name for pattern in args.cases):
+                continue
+            results[name] = run_case(func_, args.repeat, counter)
+            print(f"{name}: p50 {results[name]['p50_ms']} ms, {results[name]['queries']} queries", file=sys.stderr)
+
+    report = {"dataset": dataset, "repeat": args.repeat, "results": results}
+    write_report(report, args.output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,25 @@
-from categories.routes import blueprint as categories_blueprint
-from warehouses.routes import blueprint as warehouses_blueprint
-from products.routes import blueprint as products_blueprint
-from entries.routes import blueprint as entries_blueprint
-from exits.routes import blueprint as exits_blueprint
-from users.routes import blueprint as users_blueprint
-from gender.routes import blueprint as gender_blueprint
-from roles.routes import blueprint as roles_blueprint
+import importlib
+
+# (routes module, url prefix), imported and registered in this order by register_blueprints
+BLUEPRINTS = [
+    ("categories.routes", "/categories"),
+    ("warehouses.routes", "/warehouses"),
+    ("products.routes", "/products"),
+    ("entries.routes", "/entries"),
+    ("exits.routes", "/exits"),
+    ("transfers.routes", "/transfers"),
+    ("users.routes", "/users"),
+    ("gender.routes", "/gender"),
+    ("roles.routes", "/roles"),
+    ("sync.routes", "/sync"),
+    ("events.routes", "/events"),
+    ("outbox.routes", "/outbox"),
+    ("forecasting.routes", "/forecasting"),
+    ("analytics.routes", "/analytics"),
+    ("batch.routes", "/batch"),
+]
 
 def register_blueprints(app):
-    app.register_blueprint(categories_blueprint, url_prefix='/categories')
-    app.register_blueprint(warehouses_blueprint, url_prefix='/warehouses')
-    app.register_blueprint(products_blueprint, url_prefix='/products')
-    app.register_blueprint(entries_blueprint, url_prefix='/entries')
-    app.register_blueprint(exits_blueprint, url_prefix='/exits')
-    app.register_blueprint(users_blueprint, url_prefix='/users')
-    app.register_blueprint(gender_blueprint, url_prefix='/gender')
-    app.register_blueprint(roles_blueprint, url_prefix='/roles')
\ No newline at end of file
+    for module_name, url_prefix in BLUEPRINTS:
+        module = importlib.import_module(module_name)
+        app.register_blueprint(module.blueprint, url_prefix=url_prefix)
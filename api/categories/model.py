@@ -1,22 +1,41 @@
 from utils.db.connection import db
+from utils.db.types import UUIDType, new_id
 from datetime import datetime
 import pytz
-import uuid
 from typing import Dict, Optional, List
 from flask import current_app
+from sqlalchemy import ForeignKey, Index, select, insert, delete, func, case, and_
+
+class CategoryClosure(db.Model):
+    """Every (ancestor, descendant) pair of the category tree, each category being its
+    own ancestor at depth 0, so a whole subtree is one indexed lookup on ancestor_id
+    whatever the depth of the tree. Maintained by create_category/update_category."""
+    __tablename__ = "category_closure"
+
+    ancestor_id = db.Column(UUIDType, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    descendant_id = db.Column(UUIDType, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    depth = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        Index('ix_category_closure_descendant_id', 'descendant_id'),
+    )
 
 class Category(db.Model):
     __tablename__ = "categories"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDType, primary_key=True, default=new_id)
     name = db.Column(db.String(100), nullable=False, unique=True)
     description = db.Column(db.Text, nullable=True)
+    parent_id = db.Column(UUIDType, ForeignKey('categories.id'), nullable=True, index=True)
     active = db.Column(db.Boolean, nullable=False, default=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')))
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')), onupdate=datetime.now(pytz.timezone('America/Sao_Paulo')))
+    version = db.Column(db.Integer, nullable=False, default=1, server_default=db.text('1'))
 
     products = db.relationship('Product', back_populates='category_rel', lazy='dynamic')
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<Category {self.id}, Name: {self.name}>"
 
@@ -25,20 +44,61 @@ class Category(db.Model):
             "id": self.id,
             "name": self.name,
             "description": self.description,
+            "parent_id": self.parent_id,
             "active": self.active,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "version": self.version
         }
 
+def _validate_parent(parent_id: Optional[str]) -> None:
+    if parent_id and not get_category(parent_id):
+        raise ValueError(f"Invalid parent category ID: {parent_id}")
+
+def _ancestors(category_id: str) -> List[tuple]:
+    """(ancestor_id, depth) of a category, itself included at depth 0, read with a shared
+    lock so a writer sees the latest committed tree rather than its snapshot"""
+    return db.session.execute(
+        select(CategoryClosure.ancestor_id, CategoryClosure.depth)
+        .where(CategoryClosure.descendant_id == category_id)
+        .with_for_update(read=True)
+    ).all()
+
+def _lock_categories(category_ids: List[str]) -> None:
+    """Lock category rows in id order, so concurrent moves over them queue instead of
+    deadlocking"""
+    db.session.execute(
+        select(Category.id).where(Category.id.in_(sorted(set(category_ids)))).order_by(Category.id).with_for_update()
+    ).all()
+
+def _link(subtree: List[tuple], parent_id: Optional[str]) -> None:
+    """Add the pairs joining every ancestor of parent_id to every node of a subtree,
+    given as (descendant_id, depth below the subtree root)"""
+    if not parent_id:
+        return
+    rows = [
+        {"ancestor_id": ancestor_id, "descendant_id": descendant_id, "depth": ancestor_depth + depth + 1}
+        for ancestor_id, ancestor_depth in _ancestors(parent_id)
+        for descendant_id, depth in subtree
+    ]
+    if rows:
+        db.session.execute(insert(CategoryClosure), rows)
+
 def create_category(category_data: Dict) -> Optional[Category]:
     current_app.logger.info("Starting category creation")
+    _validate_parent(category_data.get("parent_id"))
     try:
         new_category = Category(
+            id=new_id(),
             name=category_data["name"],
             description=category_data.get("description"),
+            parent_id=category_data.get("parent_id") or None,
             active=category_data.get("active", True)
         )
         db.session.add(new_category)
+        db.session.flush()
+        db.session.execute(insert(CategoryClosure), [{"ancestor_id": new_category.id, "descendant_id": new_category.id, "depth": 0}])
+        _link([(new_category.id, 0)], new_category.parent_id)
         db.session.commit()
 
         current_app.logger.info(f"Category created successfully: {new_category.name}")
@@ -57,22 +117,112 @@ def get_category_by_name(name: str) -> Optional[Category]:
 def get_all_categories() -> List[Category]:
     return Category.query.filter_by(active=True).all()
 
+def move_category(category: Category, parent_id: Optional[str]) -> None:
+    """Re-parent a category and its whole subtree in the caller's transaction: the pairs
+    linking the subtree to its old ancestors are dropped and the ones linking it to the
+    new parent's ancestors are added"""
+    parent_id = parent_id or None
+    if parent_id == category.parent_id:
+        return
+    _validate_parent(parent_id)
+
+    # Two moves can only close a cycle between them when each category is an ancestor of
+    # the other's new parent; locking the category and the new parent's ancestor path
+    # makes such moves queue, and the second one then reads the first one's closure rows
+    parent_path = db.session.execute(
+        select(CategoryClosure.ancestor_id).where(CategoryClosure.descendant_id == parent_id)
+    ).scalars().all() if parent_id else []
+    _lock_categories([category.id] + parent_path)
+    subtree = db.session.execute(
+        select(CategoryClosure.descendant_id, CategoryClosure.depth)
+        .where(CategoryClosure.ancestor_id == category.id)
+        .with_for_update(read=True)
+    ).all()
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+    if parent_id in subtree_ids:
+        raise ValueError("A category cannot be moved under itself or one of its subcategories")
+
+    old_ancestor_ids = [ancestor_id for ancestor_id, depth in _ancestors(category.id) if depth > 0]
+    if old_ancestor_ids:
+        db.session.execute(
+            delete(CategoryClosure).where(
+                CategoryClosure.ancestor_id.in_(old_ancestor_ids),
+                CategoryClosure.descendant_id.in_(subtree_ids)
+            ),
+            execution_options={"synchronize_session": False}
+        )
+    _link(subtree, parent_id)
+    category.parent_id = parent_id
+
 def update_category(category_id: str, category_data: Dict) -> Optional[Category]:
     category = get_category(category_id)
     if category:
-        if "name" in category_data:
-            category.name = category_data["name"]
-        if "description" in category_data:
-            category.description = category_data["description"]
-        if "active" in category_data:
-            category.active = category_data["active"]
+        try:
+            if "name" in category_data:
+                category.name = category_data["name"]
+            if "description" in category_data:
+                category.description = category_data["description"]
+            if "active" in category_data:
+                category.active = category_data["active"]
+            if "parent_id" in category_data:
+                move_category(category, category_data["parent_id"])
 
-        category.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
-        db.session.commit()
-        current_app.logger.info(f"Category updated: {category.name}")
-        return category
+            category.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
+            db.session.commit()
+            current_app.logger.info(f"Category updated: {category.name}")
+            return category
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error updating category {category_id}: {str(e)}")
+            raise
     return None
 
+def get_subtree_ids(category_id: str) -> List[str]:
+    return list(db.session.execute(
+        select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+    ).scalars())
+
+def get_category_rollup(category_id: Optional[str] = None) -> List[Dict]:
+    """Product count, units, stock value and low/out-of-stock counts of each category's
+    whole subtree (or only category_id's), from one grouped join over the closure table"""
+    from products.model import Product, current_stock_subquery
+
+    product_ids = None
+    if category_id is not None:
+        product_ids = (
+            select(Product.id)
+            .join(CategoryClosure, CategoryClosure.descendant_id == Product.category_id)
+            .where(CategoryClosure.ancestor_id == category_id)
+        )
+    stocks = current_stock_subquery(product_ids)
+    on_hand = case((stocks.c.stock > 0, stocks.c.stock), else_=0)
+    statement = (
+        select(
+            CategoryClosure.ancestor_id,
+            func.count(Product.id),
+            func.coalesce(func.sum(on_hand), 0),
+            func.coalesce(func.sum(on_hand * Product.unit_cost), 0),
+            func.coalesce(func.sum(case((and_(stocks.c.stock > 0, stocks.c.stock <= Product.min_quantity), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((stocks.c.stock <= 0, 1), else_=0)), 0)
+        )
+        .select_from(CategoryClosure)
+        .join(Category, and_(Category.id == CategoryClosure.ancestor_id, Category.active.is_(True)))
+        .outerjoin(Product, and_(Product.category_id == CategoryClosure.descendant_id, Product.active.is_(True)))
+        .outerjoin(stocks, stocks.c.product_id == Product.id)
+        .group_by(CategoryClosure.ancestor_id)
+    )
+    if category_id is not None:
+        statement = statement.where(CategoryClosure.ancestor_id == category_id)
+
+    return [{
+        "category_id": ancestor_id,
+        "product_count": int(product_count),
+        "total_units": float(total_units),
+        "stock_value": round(float(stock_value), 2),
+        "low_stock_count": int(low_stock),
+        "out_of_stock_count": int(out_of_stock)
+    } for ancestor_id, product_count, total_units, stock_value, low_stock, out_of_stock in db.session.execute(statement)]
+
 def delete_category(category_id: str) -> Optional[Category]:
     category = get_category(category_id)
     if category:
@@ -86,6 +236,13 @@ def delete_category(category_id: str) -> Optional[Category]:
 def hard_delete_category(category_id: str) -> Optional[Category]:
     category = get_category(category_id)
     if category:
+        if db.session.query(select(Category.id).where(Category.parent_id == category.id).exists()).scalar():
+            raise ValueError(f"Cannot delete category '{category.name}' because it has subcategories")
+
+        db.session.execute(
+            delete(CategoryClosure).where(CategoryClosure.descendant_id == category.id),
+            execution_options={"synchronize_session": False}
+        )
         db.session.delete(category)
         db.session.commit()
         current_app.logger.info(f"Category hard deleted: {category.name}")
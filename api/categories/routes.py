@@ -1,5 +1,7 @@
 from flask import request, jsonify, Blueprint, current_app
-from categories.model import Category, create_category, get_category, update_category, delete_category, get_all_categories
+from categories.model import Category, create_category, get_category, update_category, delete_category, get_all_categories, get_category_rollup
+from utils.db.versioning import etag_headers, if_match_failed
+from sqlalchemy.orm.exc import StaleDataError
 import traceback
 
 blueprint = Blueprint('categories', __name__)
@@ -43,7 +45,7 @@ def read(category_id):
         return jsonify({
             "data": category.serialize(),
             "message": "Category retrieved successfully."
-        }), 200
+        }), 200, etag_headers(category.version)
     except Exception as e:
         current_app.logger.error(f"Error retrieving category {category_id}: {str(e)}")
         return jsonify({"error": "Failed to retrieve category due to an internal server error."}), 500
@@ -64,6 +66,39 @@ def read_all():
         current_app.logger.error(f"Error retrieving all categories: {str(e)}")
         return jsonify({"error": "Failed to retrieve categories due to an internal server error."}), 500
 
+@blueprint.route("/summary", methods=["GET"])
+def summary():
+    current_app.logger.info("Category summary requested")
+
+    try:
+        return jsonify({
+            "data": get_category_rollup(),
+            "message": "Category summary retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving category summary: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to retrieve category summary due to an internal server error."}), 500
+
+@blueprint.route("/<string:category_id>/summary", methods=["GET"])
+def category_summary(category_id):
+    current_app.logger.info(f"Category summary requested: {category_id}")
+
+    try:
+        category = get_category(category_id)
+        if category is None:
+            return jsonify({"error": "Category not found"}), 404
+
+        rollup = get_category_rollup(category.id)
+        return jsonify({
+            "data": rollup[0] if rollup else None,
+            "message": "Category summary retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving summary of category {category_id}: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to retrieve category summary due to an internal server error."}), 500
+
 @blueprint.route("/update/<string:category_id>", methods=["PUT"])
 def update(category_id):
     current_app.logger.info(f"Category update requested: {category_id}")
@@ -73,17 +108,27 @@ def update(category_id):
         return jsonify({"error": "Request body must be JSON"}), 400
 
     try:
-        category = update_category(category_id, data)
-        if category is None:
+        current = get_category(category_id)
+        if current is None:
             return jsonify({"error": "Category not found"}), 404
+        if if_match_failed(current.version):
+            current_app.logger.warning(f"Stale If-Match updating category {category_id}")
+            return jsonify({
+                "error": "Category was changed since it was read; reload it and try again.",
+                "version": current.version
+            }), 412, etag_headers(current.version)
 
+        category = update_category(category_id, data)
         return jsonify({
             "data": category.serialize(),
             "message": "Category updated successfully."
-        }), 200
+        }), 200, etag_headers(category.version)
     except ValueError as ve:
         current_app.logger.error(f"Validation error updating category {category_id}: {str(ve)}")
         return jsonify({"error": str(ve)}), 400
+    except StaleDataError:
+        current_app.logger.warning(f"Concurrent update conflict on category {category_id}")
+        return jsonify({"error": "Category was changed by another request; reload it and try again."}), 409
     except Exception as e:
         current_app.logger.error(f"Error updating category {category_id}: {str(e)}")
         current_app.logger.error(traceback.format_exc())
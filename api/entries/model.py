@@ -1,17 +1,22 @@
 from utils.db.connection import db
+from utils.db.types import UUIDType, new_id, unique_ids
 from datetime import datetime, date
 import pytz
-import uuid
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from flask import current_app
-from sqlalchemy import ForeignKey, CheckConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import ForeignKey, CheckConstraint, Index
+from sqlalchemy.orm import relationship, joinedload
+from archive.model import get_archive_cutoff, is_closed_period
+from outbox.model import add_movement_event
+from utils.db.group_commit import get_group_committer
 
 class Entry(db.Model):
     __tablename__ = "entries"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    product_id = db.Column(db.String(36), ForeignKey('products.id'), nullable=False)
+    id = db.Column(UUIDType, primary_key=True, default=new_id)
+    product_id = db.Column(UUIDType, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    # Defaults to the product's warehouse (see balances.model.track_balances)
+    warehouse_id = db.Column(UUIDType, ForeignKey('warehouses.id'), nullable=False)
     entry_date = db.Column(db.Date, nullable=False)
     quantity = db.Column(db.Numeric(10, 2), nullable=False)
     observation = db.Column(db.Text, nullable=True)
@@ -22,6 +27,9 @@ class Entry(db.Model):
 
     __table_args__ = (
         CheckConstraint('quantity > 0', name='ck_entry_quantity_positive'),
+        Index('ix_entries_entry_date', 'entry_date'),
+        Index('ix_entries_product_id_entry_date', 'product_id', 'entry_date'),
+        Index('ix_entries_warehouse_id_entry_date', 'warehouse_id', 'entry_date'),
     )
 
     def __repr__(self):
@@ -31,6 +39,7 @@ class Entry(db.Model):
         return {
             "id": self.id,
             "product_id": self.product_id,
+            "warehouse_id": self.warehouse_id,
             "entry_date": self.entry_date.isoformat() if self.entry_date else None,
             "quantity": float(self.quantity) if self.quantity else 0,
             "observation": self.observation,
@@ -39,6 +48,33 @@ class Entry(db.Model):
             "product_name": self.product_rel.name if self.product_rel else None
         }
 
+class EntryArchive(db.Model):
+    """Entries of closed periods moved out of the hot table by archive_movements"""
+    __tablename__ = "entries_archive"
+
+    id = db.Column(UUIDType, primary_key=True)
+    product_id = db.Column(UUIDType, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    warehouse_id = db.Column(UUIDType, ForeignKey('warehouses.id'), nullable=False)
+    entry_date = db.Column(db.Date, nullable=False)
+    quantity = db.Column(db.Numeric(10, 2), nullable=False)
+    observation = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    product_rel = relationship('Product', viewonly=True)
+
+    __table_args__ = (
+        Index('ix_entries_archive_entry_date', 'entry_date'),
+        Index('ix_entries_archive_product_id_entry_date', 'product_id', 'entry_date'),
+        Index('ix_entries_archive_warehouse_id_entry_date', 'warehouse_id', 'entry_date'),
+    )
+
+    def __repr__(self):
+        return f"<EntryArchive {self.id}, Product: {self.product_id}, Quantity: {self.quantity}>"
+
+    def serialize(self):
+        return {**Entry.serialize(self), "archived": True}
+
 def validate_entry_data(entry_data: Dict) -> Optional[str]:
     if 'product_id' not in entry_data or not entry_data['product_id']:
         return "Product ID is required"
@@ -54,6 +90,11 @@ def validate_entry_data(entry_data: Dict) -> Optional[str]:
     if not product:
         return f"Invalid product ID: {entry_data['product_id']}"
 
+    if entry_data.get('warehouse_id'):
+        from warehouses.model import get_warehouse
+        if not get_warehouse(entry_data['warehouse_id']):
+            return f"Invalid warehouse ID: {entry_data['warehouse_id']}"
+
     try:
         quantity = float(entry_data['quantity'])
         if quantity <= 0:
@@ -71,57 +112,115 @@ def validate_entry_data(entry_data: Dict) -> Optional[str]:
     except (ValueError, TypeError):
         return "Entry date must be a valid date (YYYY-MM-DD format)"
 
-    return None
+    if is_closed_period(entry_date):
+        return f"Entry date {entry_date.isoformat()} falls in an archived (closed) period"
 
-def create_entry(entry_data: Dict) -> Optional[Entry]:
-    current_app.logger.info("Starting entry creation")
+    return None
 
+def stage_entry(entry_data: Dict) -> Entry:
+    """Validate entry_data and add the entry and its outbox event to the session, uncommitted"""
     validation_error = validate_entry_data(entry_data)
     if validation_error:
         raise ValueError(validation_error)
 
-    try:
-        new_entry = Entry(
-            product_id=entry_data["product_id"],
-            entry_date=entry_data["entry_date"],
-            quantity=entry_data["quantity"],
-            observation=entry_data.get("observation")
-        )
-        db.session.add(new_entry)
-        db.session.commit()
+    from products.model import get_product
+    new_entry = Entry(
+        id=new_id(),
+        product_id=entry_data["product_id"],
+        warehouse_id=entry_data.get("warehouse_id") or get_product(entry_data["product_id"]).warehouse_id,
+        entry_date=entry_data["entry_date"],
+        quantity=entry_data["quantity"],
+        observation=entry_data.get("observation")
+    )
+    db.session.add(new_entry)
+    add_movement_event("entry.created", new_entry)
+    return new_entry
 
-        current_app.logger.info(f"Entry created successfully: Product {new_entry.product_id}, Quantity {new_entry.quantity}")
-        return new_entry
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Error creating entry: {str(e)}")
-        raise
+def _group_stage_entry(entry_data: Dict) -> Entry:
+    """stage_entry for the group committer: flushed so a failure is this write's own, and
+    read back with its product so the request thread can serialize it"""
+    new_entry = stage_entry(entry_data)
+    db.session.flush()
+    db.session.refresh(new_entry)
+    new_entry.product_rel
+    return new_entry
+
+def create_entry(entry_data: Dict) -> Optional[Entry]:
+    current_app.logger.info("Starting entry creation")
+
+    committer = get_group_committer()
+    if committer is not None:
+        new_entry = committer.submit(_group_stage_entry, entry_data)
+    else:
+        new_entry = stage_entry(entry_data)
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error creating entry: {str(e)}")
+            raise
+
+    current_app.logger.info(f"Entry created successfully: Product {new_entry.product_id}, Quantity {new_entry.quantity}")
+    return new_entry
+
+def _query_ledgers(*criteria, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Entry]:
+    """Run the same filter against the hot and archive tables, skipping whichever the
+    date range cannot touch, and merge the results newest first"""
+    cutoff = get_archive_cutoff()
+    results = []
+
+    for model in (Entry, EntryArchive):
+        if model is EntryArchive and (cutoff is None or (start_date is not None and start_date > cutoff)):
+            continue
+        if model is Entry and cutoff is not None and end_date is not None and end_date <= cutoff:
+            continue
+
+        query = model.query.filter(*[criterion(model) for criterion in criteria])
+        if start_date is not None:
+            query = query.filter(model.entry_date >= start_date)
+        if end_date is not None:
+            query = query.filter(model.entry_date <= end_date)
+        results.extend(query.order_by(model.entry_date.desc()).all())
+
+    results.sort(key=lambda entry: entry.entry_date, reverse=True)
+    return results
 
 def get_entry(entry_id: str) -> Optional[Entry]:
-    return Entry.query.get(entry_id)
+    return db.session.get(Entry, entry_id) or db.session.get(EntryArchive, entry_id)
+
+def get_entries_by_ids(entry_ids: List[str]) -> Tuple[List[Entry], List[str]]:
+    """Entries with the given ids in request order, looked up in the hot table and then in
+    the archive for the rest (one IN query each, product joined in), and the ids that
+    matched nothing"""
+    entry_ids = unique_ids(entry_ids)
+    found = {}
+    for model in (Entry, EntryArchive):
+        remaining = [entry_id for entry_id in entry_ids if entry_id not in found]
+        if not remaining:
+            break
+        found.update({entry.id: entry for entry in model.query.options(joinedload(model.product_rel)).filter(model.id.in_(remaining))})
+    return [found[entry_id] for entry_id in entry_ids if entry_id in found], [entry_id for entry_id in entry_ids if entry_id not in found]
 
 def get_all_entries() -> List[Entry]:
-    return Entry.query.order_by(Entry.entry_date.desc()).all()
+    return _query_ledgers()
 
 def get_entries_by_product(product_id: str) -> List[Entry]:
-    return Entry.query.filter_by(product_id=product_id).order_by(Entry.entry_date.desc()).all()
+    return _query_ledgers(lambda model: model.product_id == product_id)
 
 def get_entries_by_date_range(start_date: date, end_date: date) -> List[Entry]:
-    return Entry.query.filter(
-        Entry.entry_date >= start_date,
-        Entry.entry_date <= end_date
-    ).order_by(Entry.entry_date.desc()).all()
+    return _query_ledgers(start_date=start_date, end_date=end_date)
 
 def get_entries_by_warehouse(warehouse_id: str) -> List[Entry]:
-    return Entry.query.join(Product).filter(
-        Product.warehouse_id == warehouse_id
-    ).order_by(Entry.entry_date.desc()).all()
+    return _query_ledgers(lambda model: model.warehouse_id == warehouse_id)
 
 def update_entry(entry_id: str, entry_data: Dict) -> Optional[Entry]:
     entry = get_entry(entry_id)
     if not entry:
         return None
 
+    if isinstance(entry, EntryArchive):
+        raise ValueError("Entry belongs to an archived (closed) period and cannot be changed")
+
     validation_error = validate_entry_data(entry_data)
     if validation_error:
         raise ValueError(validation_error)
@@ -129,6 +228,8 @@ def update_entry(entry_id: str, entry_data: Dict) -> Optional[Entry]:
     try:
         if "product_id" in entry_data:
             entry.product_id = entry_data["product_id"]
+        if entry_data.get("warehouse_id"):
+            entry.warehouse_id = entry_data["warehouse_id"]
         if "entry_date" in entry_data:
             entry.entry_date = entry_data["entry_date"]
         if "quantity" in entry_data:
@@ -137,6 +238,7 @@ def update_entry(entry_id: str, entry_data: Dict) -> Optional[Entry]:
             entry.observation = entry_data["observation"]
 
         entry.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
+        add_movement_event("entry.updated", entry)
         db.session.commit()
         current_app.logger.info(f"Entry updated: {entry.id}")
         return entry
@@ -148,6 +250,10 @@ def update_entry(entry_id: str, entry_data: Dict) -> Optional[Entry]:
 def delete_entry(entry_id: str) -> Optional[Entry]:
     entry = get_entry(entry_id)
     if entry:
+        if isinstance(entry, EntryArchive):
+            raise ValueError("Entry belongs to an archived (closed) period and cannot be deleted")
+
+        add_movement_event("entry.deleted", entry)
         db.session.delete(entry)
         db.session.commit()
         current_app.logger.info(f"Entry deleted: {entry.id}")
@@ -1,5 +1,6 @@
 from flask import request, jsonify, Blueprint, current_app
-from entries.model import Entry, create_entry, get_entry, update_entry, delete_entry, get_all_entries, get_entries_by_product, get_entries_by_date_range, get_entries_by_warehouse
+from entries.model import Entry, create_entry, get_entry, update_entry, delete_entry, get_all_entries, get_entries_by_product, get_entries_by_date_range, get_entries_by_warehouse, get_entries_by_ids
+from utils.db.group_commit import GroupCommitTimeout
 from datetime import date, datetime
 import traceback
 
@@ -27,11 +28,39 @@ def create():
     except ValueError as ve:
         current_app.logger.error(f"Validation error creating entry: {str(ve)}")
         return jsonify({"error": str(ve)}), 400
+    except GroupCommitTimeout:
+        current_app.logger.warning("Group commit queue timed out, rejecting entry creation")
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503, {"Retry-After": "1"}
     except Exception as e:
         current_app.logger.error(f"Error creating entry: {str(e)}")
         current_app.logger.error(traceback.format_exc())
         return jsonify({"error": "Failed to create entry due to an internal server error."}), 500
 
+@blueprint.route("/read/many", methods=["POST"])
+def read_many():
+    current_app.logger.info(f"Entries multi-get requested")
+    data = request.get_json()
+
+    if not data or "ids" not in data:
+        return jsonify({"error": "Request body must be JSON with an 'ids' list"}), 400
+
+    try:
+        entries, missing = get_entries_by_ids(data["ids"])
+        entries_data = [entry.serialize() for entry in entries]
+
+        return jsonify({
+            "data": entries_data,
+            "missing": missing,
+            "message": "Entries retrieved successfully."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error retrieving entries by ids: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving entries by ids: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to retrieve entries due to an internal server error."}), 500
+
 @blueprint.route("/read/<string:entry_id>", methods=["GET"])
 def read(entry_id):
     current_app.logger.info(f"Entry read requested: {entry_id}")
@@ -159,6 +188,9 @@ def delete(entry_id):
         return jsonify({
             "message": "Entry deleted successfully."
         }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error deleting entry {entry_id}: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         current_app.logger.error(f"Error deleting entry {entry_id}: {str(e)}")
         current_app.logger.error(traceback.format_exc())
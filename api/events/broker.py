@@ -0,0 +1,150 @@
+from typing import Dict, List, Optional, Set
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from utils.db.connection import db
+import threading
+import queue
+import os
+
+def events_poll_interval() -> float:
+    return float(os.getenv("EVENTS_POLL_INTERVAL", "1.0"))
+
+class StockEventBroker:
+    """Fans stock events out to the SSE clients of one worker.
+
+    A single thread per worker tails change_log (the cross-worker channel: every
+    worker's commits land there) and turns each batch into one compact event per
+    affected product with its new balance and stock status. Commits made by this worker
+    wake the thread immediately; changes from other workers arrive within the poll
+    interval. The thread only queries the database while clients are connected.
+    """
+
+    def __init__(self, app, poll_interval: float, queue_size: int = 100, batch_size: int = 500):
+        self.app = app
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.last_seq: Optional[int] = None
+        self._subscribers: Set[queue.Queue] = set()
+        self._statuses: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self) -> queue.Queue:
+        subscription = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stock-event-broker", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription: queue.Queue) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if not self._subscribers:
+                # Nobody listening: skip the backlog instead of replaying it later
+                self.last_seq = None
+                continue
+            try:
+                for stock_event in self.poll():
+                    self._publish(stock_event)
+            except Exception as e:
+                self.app.logger.error(f"Stock event broker poll failed: {str(e)}")
+
+    def poll(self) -> List[Dict]:
+        """Read the change log past last_seq and build the events for it"""
+        from sync.model import ChangeLog, get_latest_sequence
+        from products.model import Product, get_product_current_stock, get_stock_status
+
+        with self.app.app_context():
+            try:
+                if self.last_seq is None:
+                    self.last_seq = get_latest_sequence()
+                    return []
+
+                rows = db.session.execute(
+                    select(ChangeLog.seq, ChangeLog.entity, ChangeLog.product_id)
+                    .where(ChangeLog.seq > self.last_seq)
+                    .order_by(ChangeLog.seq)
+                    .limit(self.batch_size)
+                ).all()
+                if not rows:
+                    return []
+
+                products: Dict[str, int] = {}
+                entities: Dict[str, int] = {}
+                for row in rows:
+                    if row.product_id is not None:
+                        products[row.product_id] = row.seq
+                    else:
+                        entities[row.entity] = row.seq
+
+                events = [{"type": "changed", "entity": entity, "seq": seq} for entity, seq in entities.items()]
+                for product_id, seq in products.items():
+                    product = db.session.get(Product, product_id)
+                    if product is None:
+                        self._statuses.pop(product_id, None)
+                        events.append({"type": "product_deleted", "product_id": product_id, "seq": seq})
+                        continue
+
+                    balance = get_product_current_stock(product_id)
+                    status = get_stock_status(balance, float(product.min_quantity) if product.min_quantity else 0)
+                    previous = self._statuses.get(product_id)
+                    self._statuses[product_id] = status
+                    events.append({
+                        "type": "stock",
+                        "product_id": product_id,
+                        "balance": balance,
+                        "status": status,
+                        "status_changed": previous is not None and previous != status,
+                        "seq": seq
+                    })
+
+                self.last_seq = rows[-1].seq
+                events.sort(key=lambda item: item["seq"])
+                return events
+            finally:
+                db.session.remove()
+
+    def _publish(self, stock_event: Dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(stock_event)
+            except queue.Full:
+                # A client that cannot keep up gets a single resync instead of a backlog
+                with subscription.mutex:
+                    subscription.queue.clear()
+                subscription.put_nowait({"type": "resync", "seq": stock_event["seq"]})
+
+_broker: Optional[StockEventBroker] = None
+_broker_lock = threading.Lock()
+
+def get_stock_broker() -> StockEventBroker:
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = StockEventBroker(current_app._get_current_object(), events_poll_interval())
+        return _broker
+
+@event.listens_for(Session, "after_commit")
+def wake_broker(session):
+    if session.info.pop("sync_changes", False) and _broker is not None:
+        _broker.wake()
+
+@event.listens_for(Session, "after_rollback")
+def discard_changes_flag(session):
+    session.info.pop("sync_changes", None)
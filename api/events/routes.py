@@ -0,0 +1,43 @@
+from flask import request, Response, Blueprint, current_app
+from events.broker import get_stock_broker
+import json
+import queue
+
+blueprint = Blueprint('events', __name__)
+
+HEARTBEAT_SECONDS = 15
+
+def format_event(stock_event) -> str:
+    return f"id: {stock_event['seq']}\nevent: {stock_event['type']}\ndata: {json.dumps(stock_event)}\n\n"
+
+@blueprint.route("/stock", methods=["GET"])
+def stock():
+    """Server-Sent Events stream of stock changes (event types: stock, product_deleted,
+    changed, resync)"""
+    current_app.logger.info("Stock event stream opened")
+    broker = get_stock_broker()
+    subscription = broker.subscribe()
+
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_event_id = None
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            # Events missed while disconnected are not replayed: ask the client to refetch
+            if last_event_id is not None and broker.last_seq is not None and last_event_id < broker.last_seq:
+                yield format_event({"type": "resync", "seq": broker.last_seq})
+            while True:
+                try:
+                    yield format_event(subscription.get(timeout=HEARTBEAT_SECONDS))
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
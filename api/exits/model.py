@@ -1,17 +1,22 @@
 from utils.db.connection import db
+from utils.db.types import UUIDType, new_id, unique_ids
 from datetime import datetime, date
 import pytz
-import uuid
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from flask import current_app
-from sqlalchemy import ForeignKey, CheckConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import ForeignKey, CheckConstraint, Index, select, func, union_all
+from sqlalchemy.orm import relationship, joinedload
+from archive.model import get_archive_cutoff, is_closed_period
+from outbox.model import add_movement_event
+from utils.db.group_commit import get_group_committer
 
 class Exit(db.Model):
     __tablename__ = "exits"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    product_id = db.Column(db.String(36), ForeignKey('products.id'), nullable=False)
+    id = db.Column(UUIDType, primary_key=True, default=new_id)
+    product_id = db.Column(UUIDType, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    # Defaults to the product's warehouse (see balances.model.track_balances)
+    warehouse_id = db.Column(UUIDType, ForeignKey('warehouses.id'), nullable=False)
     exit_date = db.Column(db.Date, nullable=False)
     quantity = db.Column(db.Numeric(10, 2), nullable=False)
     observation = db.Column(db.Text, nullable=True)
@@ -22,6 +27,9 @@ class Exit(db.Model):
 
     __table_args__ = (
         CheckConstraint('quantity > 0', name='ck_exit_quantity_positive'),
+        Index('ix_exits_exit_date', 'exit_date'),
+        Index('ix_exits_product_id_exit_date', 'product_id', 'exit_date'),
+        Index('ix_exits_warehouse_id_exit_date', 'warehouse_id', 'exit_date'),
     )
 
     def __repr__(self):
@@ -31,6 +39,7 @@ class Exit(db.Model):
         return {
             "id": self.id,
             "product_id": self.product_id,
+            "warehouse_id": self.warehouse_id,
             "exit_date": self.exit_date.isoformat() if self.exit_date else None,
             "quantity": float(self.quantity) if self.quantity else 0,
             "observation": self.observation,
@@ -39,7 +48,35 @@ class Exit(db.Model):
             "product_name": self.product_rel.name if self.product_rel else None
         }
 
-def validate_exit_data(exit_data: Dict) -> Optional[str]:
+class ExitArchive(db.Model):
+    """Exits of closed periods moved out of the hot table by archive_movements"""
+    __tablename__ = "exits_archive"
+
+    id = db.Column(UUIDType, primary_key=True)
+    product_id = db.Column(UUIDType, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    warehouse_id = db.Column(UUIDType, ForeignKey('warehouses.id'), nullable=False)
+    exit_date = db.Column(db.Date, nullable=False)
+    quantity = db.Column(db.Numeric(10, 2), nullable=False)
+    observation = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    product_rel = relationship('Product', viewonly=True)
+
+    __table_args__ = (
+        Index('ix_exits_archive_exit_date', 'exit_date'),
+        Index('ix_exits_archive_product_id_exit_date', 'product_id', 'exit_date'),
+        Index('ix_exits_archive_warehouse_id_exit_date', 'warehouse_id', 'exit_date'),
+    )
+
+    def __repr__(self):
+        return f"<ExitArchive {self.id}, Product: {self.product_id}, Quantity: {self.quantity}>"
+
+    def serialize(self):
+        return {**Exit.serialize(self), "archived": True}
+
+def validate_exit_data(exit_data: Dict, exit_record: Optional[Exit] = None) -> Optional[str]:
+    """Validate a new exit, or the new values of exit_record when it is being changed"""
     if 'product_id' not in exit_data or not exit_data['product_id']:
         return "Product ID is required"
 
@@ -54,13 +91,15 @@ def validate_exit_data(exit_data: Dict) -> Optional[str]:
     if not product:
         return f"Invalid product ID: {exit_data['product_id']}"
 
-    current_stock = product.get_current_stock() if product else 0
+    if exit_data.get('warehouse_id'):
+        from warehouses.model import get_warehouse
+        if not get_warehouse(exit_data['warehouse_id']):
+            return f"Invalid warehouse ID: {exit_data['warehouse_id']}"
+
     try:
         quantity = float(exit_data['quantity'])
         if quantity <= 0:
             return "Quantity must be greater than 0"
-        if quantity > current_stock:
-            return f"Insufficient stock. Current: {current_stock}, Requested: {quantity}"
     except (ValueError, TypeError):
         return "Quantity must be a valid number"
 
@@ -74,64 +113,167 @@ def validate_exit_data(exit_data: Dict) -> Optional[str]:
     except (ValueError, TypeError):
         return "Exit date must be a valid date (YYYY-MM-DD format)"
 
-    return None
+    if is_closed_period(exit_date):
+        return f"Exit date {exit_date.isoformat()} falls in an archived (closed) period"
 
-def create_exit(exit_data: Dict) -> Optional[Exit]:
-    current_app.logger.info("Starting exit creation")
+    # Stock is checked last, in the warehouse the exit leaves from, with the balance row
+    # locked until commit: a concurrent exit or transfer over the same balance waits for
+    # this one instead of spending the same units
+    warehouse_id = exit_data.get('warehouse_id') or (exit_record.warehouse_id if exit_record else None) or product.warehouse_id
+    same_balance = exit_record is not None and (exit_record.product_id, exit_record.warehouse_id) == (product.id, warehouse_id)
+    if same_balance and quantity <= float(exit_record.quantity):
+        return None
 
+    from balances.model import get_balance
+    current_stock = get_balance(product.id, warehouse_id, for_update=True)
+    if same_balance:
+        # The exit being changed already took its old quantity out of this balance
+        current_stock += float(exit_record.quantity)
+    if quantity > current_stock:
+        return f"Insufficient stock. Current: {current_stock}, Requested: {quantity}"
+
+    return None
+
+def stage_exit(exit_data: Dict) -> Exit:
+    """Validate exit_data and add the exit and its outbox event to the session, uncommitted"""
     validation_error = validate_exit_data(exit_data)
     if validation_error:
         raise ValueError(validation_error)
 
-    try:
-        new_exit = Exit(
-            product_id=exit_data["product_id"],
-            exit_date=exit_data["exit_date"],
-            quantity=exit_data["quantity"],
-            observation=exit_data.get("observation")
-        )
-        db.session.add(new_exit)
-        db.session.commit()
+    from products.model import get_product
+    new_exit = Exit(
+        id=new_id(),
+        product_id=exit_data["product_id"],
+        warehouse_id=exit_data.get("warehouse_id") or get_product(exit_data["product_id"]).warehouse_id,
+        exit_date=exit_data["exit_date"],
+        quantity=exit_data["quantity"],
+        observation=exit_data.get("observation")
+    )
+    db.session.add(new_exit)
+    add_movement_event("exit.created", new_exit)
+    return new_exit
 
-        current_app.logger.info(f"Exit created successfully: Product {new_exit.product_id}, Quantity {new_exit.quantity}")
-        return new_exit
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Error creating exit: {str(e)}")
-        raise
+def _group_stage_exit(exit_data: Dict) -> Exit:
+    """stage_exit for the group committer: flushed so a failure is this write's own, and
+    read back with its product so the request thread can serialize it"""
+    new_exit = stage_exit(exit_data)
+    db.session.flush()
+    db.session.refresh(new_exit)
+    new_exit.product_rel
+    return new_exit
+
+def create_exit(exit_data: Dict) -> Optional[Exit]:
+    current_app.logger.info("Starting exit creation")
+
+    committer = get_group_committer()
+    if committer is not None:
+        new_exit = committer.submit(_group_stage_exit, exit_data)
+    else:
+        new_exit = stage_exit(exit_data)
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error creating exit: {str(e)}")
+            raise
+
+    current_app.logger.info(f"Exit created successfully: Product {new_exit.product_id}, Quantity {new_exit.quantity}")
+    return new_exit
+
+def _query_ledgers(*criteria, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[Exit]:
+    """Run the same filter against the hot and archive tables, skipping whichever the
+    date range cannot touch, and merge the results newest first"""
+    cutoff = get_archive_cutoff()
+    results = []
+
+    for model in (Exit, ExitArchive):
+        if model is ExitArchive and (cutoff is None or (start_date is not None and start_date > cutoff)):
+            continue
+        if model is Exit and cutoff is not None and end_date is not None and end_date <= cutoff:
+            continue
+
+        query = model.query.filter(*[criterion(model) for criterion in criteria])
+        if start_date is not None:
+            query = query.filter(model.exit_date >= start_date)
+        if end_date is not None:
+            query = query.filter(model.exit_date <= end_date)
+        results.extend(query.order_by(model.exit_date.desc()).all())
+
+    results.sort(key=lambda exit_record: exit_record.exit_date, reverse=True)
+    return results
+
+def daily_exits_statement(start_date: date, end_date: date, product_ids: Optional[List[str]] = None):
+    """Exit quantity per product and day over [start_date, end_date], reading the archive
+    only when the range reaches into a closed period.
+
+    Exits written by transfers only move goods between warehouses, so they are left out
+    of this consumption statement.
+    """
+    from transfers.model import Transfer
+
+    cutoff = get_archive_cutoff()
+    ledgers = [Exit] if cutoff is None or start_date > cutoff else [Exit, ExitArchive]
+    selects = []
+    for model in ledgers:
+        query = (
+            select(model.product_id.label("product_id"), model.exit_date.label("exit_date"), model.quantity.label("quantity"))
+            .where(model.exit_date >= start_date, model.exit_date <= end_date)
+            .where(~select(Transfer.id).where(Transfer.exit_id == model.id).exists())
+        )
+        if product_ids is not None:
+            query = query.where(model.product_id.in_(product_ids))
+        selects.append(query)
+    movements = union_all(*selects).subquery("movements")
+    return (
+        select(movements.c.product_id, movements.c.exit_date, func.sum(movements.c.quantity))
+        .group_by(movements.c.product_id, movements.c.exit_date)
+    )
 
 def get_exit(exit_id: str) -> Optional[Exit]:
-    return Exit.query.get(exit_id)
+    return db.session.get(Exit, exit_id) or db.session.get(ExitArchive, exit_id)
+
+def get_exits_by_ids(exit_ids: List[str]) -> Tuple[List[Exit], List[str]]:
+    """Exits with the given ids in request order, looked up in the hot table and then in
+    the archive for the rest (one IN query each, product joined in), and the ids that
+    matched nothing"""
+    exit_ids = unique_ids(exit_ids)
+    found = {}
+    for model in (Exit, ExitArchive):
+        remaining = [exit_id for exit_id in exit_ids if exit_id not in found]
+        if not remaining:
+            break
+        found.update({exit.id: exit for exit in model.query.options(joinedload(model.product_rel)).filter(model.id.in_(remaining))})
+    return [found[exit_id] for exit_id in exit_ids if exit_id in found], [exit_id for exit_id in exit_ids if exit_id not in found]
 
 def get_all_exits() -> List[Exit]:
-    return Exit.query.order_by(Exit.exit_date.desc()).all()
+    return _query_ledgers()
 
 def get_exits_by_product(product_id: str) -> List[Exit]:
-    return Exit.query.filter_by(product_id=product_id).order_by(Exit.exit_date.desc()).all()
+    return _query_ledgers(lambda model: model.product_id == product_id)
 
 def get_exits_by_date_range(start_date: date, end_date: date) -> List[Exit]:
-    return Exit.query.filter(
-        Exit.exit_date >= start_date,
-        Exit.exit_date <= end_date
-    ).order_by(Exit.exit_date.desc()).all()
+    return _query_ledgers(start_date=start_date, end_date=end_date)
 
 def get_exits_by_warehouse(warehouse_id: str) -> List[Exit]:
-    return Exit.query.join(Product).filter(
-        Product.warehouse_id == warehouse_id
-    ).order_by(Exit.exit_date.desc()).all()
+    return _query_ledgers(lambda model: model.warehouse_id == warehouse_id)
 
 def update_exit(exit_id: str, exit_data: Dict) -> Optional[Exit]:
     exit_record = get_exit(exit_id)
     if not exit_record:
         return None
 
-    validation_error = validate_exit_data(exit_data)
+    if isinstance(exit_record, ExitArchive):
+        raise ValueError("Exit belongs to an archived (closed) period and cannot be changed")
+
+    validation_error = validate_exit_data(exit_data, exit_record)
     if validation_error:
         raise ValueError(validation_error)
 
     try:
         if "product_id" in exit_data:
             exit_record.product_id = exit_data["product_id"]
+        if exit_data.get("warehouse_id"):
+            exit_record.warehouse_id = exit_data["warehouse_id"]
         if "exit_date" in exit_data:
             exit_record.exit_date = exit_data["exit_date"]
         if "quantity" in exit_data:
@@ -140,6 +282,7 @@ def update_exit(exit_id: str, exit_data: Dict) -> Optional[Exit]:
             exit_record.observation = exit_data["observation"]
 
         exit_record.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
+        add_movement_event("exit.updated", exit_record)
         db.session.commit()
         current_app.logger.info(f"Exit updated: {exit_record.id}")
         return exit_record
@@ -151,6 +294,10 @@ def update_exit(exit_id: str, exit_data: Dict) -> Optional[Exit]:
 def delete_exit(exit_id: str) -> Optional[Exit]:
     exit_record = get_exit(exit_id)
     if exit_record:
+        if isinstance(exit_record, ExitArchive):
+            raise ValueError("Exit belongs to an archived (closed) period and cannot be deleted")
+
+        add_movement_event("exit.deleted", exit_record)
         db.session.delete(exit_record)
         db.session.commit()
         current_app.logger.info(f"Exit deleted: {exit_record.id}")
@@ -1,5 +1,6 @@
 from flask import request, jsonify, Blueprint, current_app
-from exits.model import Exit, create_exit, get_exit, update_exit, delete_exit, get_all_exits, get_exits_by_product, get_exits_by_date_range, get_exits_by_warehouse
+from exits.model import Exit, create_exit, get_exit, update_exit, delete_exit, get_all_exits, get_exits_by_product, get_exits_by_date_range, get_exits_by_warehouse, get_exits_by_ids
+from utils.db.group_commit import GroupCommitTimeout
 from datetime import date, datetime
 import traceback
 
@@ -27,11 +28,39 @@ def create():
     except ValueError as ve:
         current_app.logger.error(f"Validation error creating exit: {str(ve)}")
         return jsonify({"error": str(ve)}), 400
+    except GroupCommitTimeout:
+        current_app.logger.warning("Group commit queue timed out, rejecting exit creation")
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503, {"Retry-After": "1"}
     except Exception as e:
         current_app.logger.error(f"Error creating exit: {str(e)}")
         current_app.logger.error(traceback.format_exc())
         return jsonify({"error": "Failed to create exit due to an internal server error."}), 500
 
+@blueprint.route("/read/many", methods=["POST"])
+def read_many():
+    current_app.logger.info(f"Exits multi-get requested")
+    data = request.get_json()
+
+    if not data or "ids" not in data:
+        return jsonify({"error": "Request body must be JSON with an 'ids' list"}), 400
+
+    try:
+        exits, missing = get_exits_by_ids(data["ids"])
+        exits_data = [exit.serialize() for exit in exits]
+
+        return jsonify({
+            "data": exits_data,
+            "missing": missing,
+            "message": "Exits retrieved successfully."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error retrieving exits by ids: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving exits by ids: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to retrieve exits due to an internal server error."}), 500
+
 @blueprint.route("/read/<string:exit_id>", methods=["GET"])
 def read(exit_id):
     current_app.logger.info(f"Exit read requested: {exit_id}")
@@ -159,6 +188,9 @@ def delete(exit_id):
         return jsonify({
             "message": "Exit deleted successfully."
         }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error deleting exit {exit_id}: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         current_app.logger.error(f"Error deleting exit {exit_id}: {str(e)}")
         current_app.logger.error(traceback.format_exc())
@@ -0,0 +1,133 @@
+from utils.db.connection import db
+from datetime import datetime, date, timedelta
+from statistics import NormalDist
+import pytz
+from typing import Dict, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.orm.exc import StaleDataError
+from exits.model import daily_exits_statement
+from products.model import Product, get_current_stocks
+from sync.model import record_changes
+
+DEFAULT_WINDOW_DAYS = 90
+DEFAULT_LEAD_TIME_DAYS = 7
+DEFAULT_REVIEW_DAYS = 14
+DEFAULT_SERVICE_LEVEL = 0.95
+
+def compute_forecast(window_days: int = DEFAULT_WINDOW_DAYS, lead_time_days: int = DEFAULT_LEAD_TIME_DAYS,
+                     review_days: int = DEFAULT_REVIEW_DAYS, service_level: float = DEFAULT_SERVICE_LEVEL,
+                     as_of: Optional[date] = None) -> List[Dict]:
+    """Consumption forecast and reorder suggestion for every active product.
+
+    Exit history of the whole catalog is read with one grouped query and laid out as a
+    products x days matrix, so averages, variability, days of cover and reorder points
+    are computed for all products at once:
+
+        safety stock  = z(service_level) * std_daily * sqrt(lead_time_days)
+        reorder point = avg_daily * lead_time_days + safety stock
+        order qty     = reorder point + avg_daily * review_days - current stock (if > 0)
+    """
+    import numpy as np
+
+    if window_days < 7 or window_days > 730:
+        raise ValueError("window_days must be between 7 and 730")
+    if lead_time_days < 0 or review_days < 0:
+        raise ValueError("lead_time_days and review_days must be greater than or equal to 0")
+    if not 0.5 <= service_level < 1:
+        raise ValueError("service_level must be between 0.5 and 1")
+
+    end_date = as_of or datetime.now(pytz.timezone('America/Sao_Paulo')).date()
+    start_date = end_date - timedelta(days=window_days - 1)
+
+    products = db.session.execute(
+        select(Product.id, Product.name, Product.warehouse_id, Product.min_quantity, Product.version).where(Product.active == True)
+    ).all()
+    if not products:
+        return []
+    index = {product.id: position for position, product in enumerate(products)}
+
+    demand = np.zeros((len(products), window_days))
+    rows = [row for row in db.session.execute(daily_exits_statement(start_date, end_date)) if row[0] in index]
+    if rows:
+        product_positions = np.fromiter((index[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+        day_positions = np.fromiter(((row[1] - start_date).days for row in rows), dtype=np.int64, count=len(rows))
+        quantities = np.fromiter((float(row[2]) for row in rows), dtype=np.float64, count=len(rows))
+        np.add.at(demand, (product_positions, day_positions), quantities)
+
+    stocks = get_current_stocks()
+    current_stock = np.array([stocks.get(product.id, 0.0) for product in products])
+
+    avg_daily = demand.mean(axis=1)
+    std_daily = demand.std(axis=1, ddof=1)
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * std_daily * np.sqrt(lead_time_days)
+    reorder_point = avg_daily * lead_time_days + safety_stock
+    order_quantity = np.maximum(reorder_point + avg_daily * review_days - current_stock, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_of_cover = np.where(avg_daily > 0, np.maximum(current_stock, 0) / avg_daily, np.inf)
+
+    forecast = []
+    for position in np.argsort(days_of_cover, kind="stable"):
+        product = products[position]
+        forecast.append({
+            "product_id": product.id,
+            "name": product.name,
+            "warehouse_id": product.warehouse_id,
+            "current_stock": float(current_stock[position]),
+            "min_quantity": float(product.min_quantity) if product.min_quantity else 0,
+            "avg_daily_consumption": round(float(avg_daily[position]), 4),
+            "std_daily_consumption": round(float(std_daily[position]), 4),
+            "days_of_cover": round(float(days_of_cover[position]), 1) if np.isfinite(days_of_cover[position]) else None,
+            "reorder_point": round(float(reorder_point[position]), 2),
+            "suggested_order_quantity": round(float(np.ceil(order_quantity[position])), 2),
+            "version": product.version
+        })
+    return forecast
+
+def apply_reorder_points(forecast: List[Dict]) -> Tuple[int, List[Dict]]:
+    """Store each forecast reorder point as the product's min_quantity; products
+    without consumption in the window are left untouched.
+
+    Every product is updated from the version compute_forecast read, so one changed
+    since then (a min_quantity edited meanwhile) is not overwritten: it is skipped and
+    returned among the conflicts, and the others are written. Returns how many changed
+    and the conflicting {"product_id", "name"}.
+    """
+    pending = {
+        item["product_id"]: item
+        for item in forecast
+        if item["avg_daily_consumption"] > 0 and item["reorder_point"] != item["min_quantity"]
+    }
+    conflicts: List[Dict] = []
+
+    while pending:
+        try:
+            now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+            db.session.execute(update(Product), [
+                {"id": product_id, "version": item["version"], "min_quantity": item["reorder_point"], "updated_at": now}
+                for product_id, item in pending.items()
+            ])
+            # Bulk updates bypass the flush hook, so the sync log is stamped here
+            record_changes(db.session, [("products", product_id, "upsert", product_id) for product_id in pending])
+            db.session.commit()
+            break
+        except StaleDataError:
+            # The bulk UPDATE does not say which rows missed; drop those whose version
+            # moved on and write the rest again
+            db.session.rollback()
+            current = dict(db.session.execute(select(Product.id, Product.version).where(Product.id.in_(list(pending)))).all())
+            stale = [product_id for product_id, item in pending.items() if current.get(product_id) != item["version"]]
+            if not stale:
+                raise
+            for product_id in stale:
+                conflicts.append({"product_id": product_id, "name": pending.pop(product_id)["name"]})
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error applying reorder points: {str(e)}")
+            raise
+
+    if conflicts:
+        current_app.logger.warning(f"Skipped {len(conflicts)} products changed since the forecast was computed")
+    current_app.logger.info(f"Updated min_quantity of {len(pending)} products from the forecast")
+    return len(pending), conflicts
@@ -0,0 +1,31 @@
+from flask import request, jsonify, Blueprint, current_app
+from forecasting.model import compute_forecast, DEFAULT_WINDOW_DAYS, DEFAULT_LEAD_TIME_DAYS, DEFAULT_REVIEW_DAYS, DEFAULT_SERVICE_LEVEL
+import traceback
+
+blueprint = Blueprint('forecasting', __name__)
+
+@blueprint.route("/reorder", methods=["GET"])
+def reorder():
+    current_app.logger.info("Reorder forecast requested")
+
+    try:
+        window_days = int(request.args.get("window_days", DEFAULT_WINDOW_DAYS))
+        lead_time_days = int(request.args.get("lead_time_days", DEFAULT_LEAD_TIME_DAYS))
+        review_days = int(request.args.get("review_days", DEFAULT_REVIEW_DAYS))
+        service_level = float(request.args.get("service_level", DEFAULT_SERVICE_LEVEL))
+    except ValueError:
+        return jsonify({"error": "window_days, lead_time_days and review_days must be integers and service_level a number"}), 400
+
+    try:
+        forecast = compute_forecast(window_days, lead_time_days, review_days, service_level)
+        return jsonify({
+            "data": forecast,
+            "message": "Reorder forecast computed successfully."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error computing forecast: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error computing forecast: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to compute reorder forecast due to an internal server error."}), 500
@@ -0,0 +1,111 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.db.types import UUIDType
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'genders',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False, unique=True),
+        sa.Column('created_at', sa.DateTime, nullable=False)
+    )
+    op.create_table(
+        'roles',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False, unique=True),
+        sa.Column('description', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False)
+    )
+    op.create_table(
+        'categories',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False, unique=True),
+        sa.Column('description', sa.Text, nullable=True),
+        sa.Column('active', sa.Boolean, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+    op.create_table(
+        'warehouses',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False, unique=True),
+        sa.Column('description', sa.Text, nullable=True),
+        sa.Column('active', sa.Boolean, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+    op.create_table(
+        'users',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('email', sa.String(100), nullable=False, unique=True),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('gender_id', UUIDType(), sa.ForeignKey('genders.id'), nullable=True),
+        sa.Column('role_id', UUIDType(), sa.ForeignKey('roles.id'), nullable=False),
+        sa.Column('active', sa.Boolean, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+    op.create_table(
+        'products',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('name', sa.String(200), nullable=False),
+        sa.Column('category_id', UUIDType(), sa.ForeignKey('categories.id'), nullable=True),
+        sa.Column('warehouse_id', UUIDType(), sa.ForeignKey('warehouses.id'), nullable=False),
+        sa.Column('min_quantity', sa.Numeric(10, 2), nullable=False),
+        sa.Column('unit_cost', sa.Numeric(10, 2), nullable=False),
+        sa.Column('observation', sa.Text, nullable=True),
+        sa.Column('active', sa.Boolean, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+        sa.CheckConstraint('min_quantity >= 0', name='ck_min_quantity_positive'),
+        sa.CheckConstraint('unit_cost >= 0', name='ck_unit_cost_positive')
+    )
+    op.create_table(
+        'entries',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('product_id', UUIDType(), sa.ForeignKey('products.id'), nullable=False),
+        sa.Column('entry_date', sa.Date, nullable=False),
+        sa.Column('quantity', sa.Numeric(10, 2), nullable=False),
+        sa.Column('observation', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+        sa.CheckConstraint('quantity > 0', name='ck_entry_quantity_positive')
+    )
+    op.create_table(
+        'exits',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('product_id', UUIDType(), sa.ForeignKey('products.id'), nullable=False),
+        sa.Column('exit_date', sa.Date, nullable=False),
+        sa.Column('quantity', sa.Numeric(10, 2), nullable=False),
+        sa.Column('observation', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+        sa.CheckConstraint('quantity > 0', name='ck_exit_quantity_positive')
+    )
+
+
+def downgrade():
+    op.drop_table('exits')
+    op.drop_table('entries')
+    op.drop_table('products')
+    op.drop_table('users')
+    op.drop_table('warehouses')
+    op.drop_table('categories')
+    op.drop_table('roles')
+    op.drop_table('genders')
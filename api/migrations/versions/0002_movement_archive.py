@@ -0,0 +1,84 @@
+"""movement date indexes and archive tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.db.types import UUIDType
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_entries_entry_date', 'entries', ['entry_date'])
+    op.create_index('ix_entries_product_id_entry_date', 'entries', ['product_id', 'entry_date'])
+    op.create_index('ix_exits_exit_date', 'exits', ['exit_date'])
+    op.create_index('ix_exits_product_id_exit_date', 'exits', ['product_id', 'exit_date'])
+
+    op.create_table(
+        'entries_archive',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('product_id', UUIDType(), sa.ForeignKey('products.id'), nullable=False),
+        sa.Column('entry_date', sa.Date, nullable=False),
+        sa.Column('quantity', sa.Numeric(10, 2), nullable=False),
+        sa.Column('observation', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+    op.create_index('ix_entries_archive_entry_date', 'entries_archive', ['entry_date'])
+    op.create_index('ix_entries_archive_product_id_entry_date', 'entries_archive', ['product_id', 'entry_date'])
+
+    op.create_table(
+        'exits_archive',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('product_id', UUIDType(), sa.ForeignKey('products.id'), nullable=False),
+        sa.Column('exit_date', sa.Date, nullable=False),
+        sa.Column('quantity', sa.Numeric(10, 2), nullable=False),
+        sa.Column('observation', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+    op.create_index('ix_exits_archive_exit_date', 'exits_archive', ['exit_date'])
+    op.create_index('ix_exits_archive_product_id_exit_date', 'exits_archive', ['product_id', 'exit_date'])
+
+    op.create_table(
+        'archived_balances',
+        sa.Column('product_id', UUIDType(), sa.ForeignKey('products.id'), primary_key=True),
+        sa.Column('entries_quantity', sa.Numeric(14, 2), nullable=False),
+        sa.Column('exits_quantity', sa.Numeric(14, 2), nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+
+    op.create_table(
+        'movement_archives',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('archived_through', sa.Date, nullable=False),
+        sa.Column('entries_moved', sa.Integer, nullable=False),
+        sa.Column('exits_moved', sa.Integer, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False)
+    )
+    op.create_index('ix_movement_archives_archived_through', 'movement_archives', ['archived_through'])
+
+
+def downgrade():
+    op.drop_index('ix_movement_archives_archived_through', table_name='movement_archives')
+    op.drop_table('movement_archives')
+    op.drop_table('archived_balances')
+    op.drop_index('ix_exits_archive_product_id_exit_date', table_name='exits_archive')
+    op.drop_index('ix_exits_archive_exit_date', table_name='exits_archive')
+    op.drop_table('exits_archive')
+    op.drop_index('ix_entries_archive_product_id_entry_date', table_name='entries_archive')
+    op.drop_index('ix_entries_archive_entry_date', table_name='entries_archive')
+    op.drop_table('entries_archive')
+    op.drop_index('ix_exits_product_id_exit_date', table_name='exits')
+    op.drop_index('ix_exits_exit_date', table_name='exits')
+    op.drop_index('ix_entries_product_id_entry_date', table_name='entries')
+    op.drop_index('ix_entries_entry_date', table_name='entries')
@@ -0,0 +1,41 @@
+"""cascade product deletes to movements
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+TABLES = ['entries', 'exits', 'entries_archive', 'exits_archive', 'archived_balances']
+
+# Gives reflected unnamed constraints (SQLite) a name batch mode can drop
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _replace_product_fk(table, ondelete):
+    fk_name = f"fk_{table}_product_id_products"
+    existing = [fk for fk in sa.inspect(op.get_bind()).get_foreign_keys(table) if fk['referred_table'] == 'products']
+
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        for fk in existing:
+            batch_op.drop_constraint(fk['name'] or fk_name, type_='foreignkey')
+        batch_op.create_foreign_key(fk_name, 'products', ['product_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    for table in TABLES:
+        _replace_product_fk(table, 'CASCADE')
+
+
+def downgrade():
+    for table in TABLES:
+        _replace_product_fk(table, None)
@@ -0,0 +1,40 @@
+"""sync change log
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.db.types import UUIDType
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    sync_sequence = op.create_table(
+        'sync_sequence',
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column('value', sa.BigInteger, nullable=False)
+    )
+    op.bulk_insert(sync_sequence, [{'id': 1, 'value': 0}])
+
+    op.create_table(
+        'change_log',
+        sa.Column('seq', sa.BigInteger, primary_key=True, autoincrement=False),
+        sa.Column('entity', sa.String(32), nullable=False),
+        sa.Column('entity_id', UUIDType(), nullable=False),
+        sa.Column('operation', sa.String(10), nullable=False),
+        sa.Column('changed_at', sa.DateTime, nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_table('change_log')
+    op.drop_table('sync_sequence')
@@ -0,0 +1,31 @@
+"""product sku and barcode
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('products', sa.Column('sku', sa.String(64), nullable=True))
+    op.add_column('products', sa.Column('barcode', sa.String(64), nullable=True))
+    op.create_index('ix_products_sku', 'products', ['sku'], unique=True)
+    op.create_index('ix_products_barcode', 'products', ['barcode'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_products_barcode', table_name='products')
+    op.drop_index('ix_products_sku', table_name='products')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('barcode')
+        batch_op.drop_column('sku')
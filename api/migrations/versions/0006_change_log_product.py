@@ -0,0 +1,26 @@
+"""change log product id
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 19:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.db.types import UUIDType
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('change_log', sa.Column('product_id', UUIDType(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('change_log') as batch_op:
+        batch_op.drop_column('product_id')
@@ -0,0 +1,39 @@
+"""outbox events
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+from utils.db.types import UUIDType
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+PreciseDateTime = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def upgrade():
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer, "sqlite"), primary_key=True, autoincrement=True),
+        sa.Column('event_type', sa.String(50), nullable=False),
+        sa.Column('aggregate_id', UUIDType(), nullable=False),
+        sa.Column('payload', sa.Text, nullable=False),
+        sa.Column('created_at', PreciseDateTime, nullable=False),
+        sa.Column('published_at', PreciseDateTime, nullable=True),
+        sa.Column('attempts', sa.Integer, nullable=False)
+    )
+    op.create_index('ix_outbox_events_published_at_id', 'outbox_events', ['published_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_outbox_events_published_at_id', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,82 @@
+"""movement warehouses, stock balances and transfers
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 21:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.db.types import UUIDType
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+LEDGERS = [('entries', 'entry_date'), ('exits', 'exit_date'), ('entries_archive', 'entry_date'), ('exits_archive', 'exit_date')]
+
+
+def upgrade():
+    # Existing movements happened in their product's warehouse
+    for table, date_column in LEDGERS:
+        op.add_column(table, sa.Column('warehouse_id', UUIDType(), nullable=True))
+        op.execute(f"UPDATE {table} SET warehouse_id = (SELECT products.warehouse_id FROM products WHERE products.id = {table}.product_id)")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('warehouse_id', existing_type=UUIDType(), nullable=False)
+            batch_op.create_foreign_key(f'fk_{table}_warehouse_id_warehouses', 'warehouses', ['warehouse_id'], ['id'])
+            batch_op.create_index(f'ix_{table}_warehouse_id_{date_column}', ['warehouse_id', date_column])
+
+    op.create_table(
+        'stock_balances',
+        sa.Column('product_id', UUIDType(), sa.ForeignKey('products.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('warehouse_id', UUIDType(), sa.ForeignKey('warehouses.id'), primary_key=True),
+        sa.Column('quantity', sa.Numeric(14, 2), nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+    op.create_index('ix_stock_balances_warehouse_id', 'stock_balances', ['warehouse_id'])
+    op.execute("""
+        INSERT INTO stock_balances (product_id, warehouse_id, quantity, updated_at)
+        SELECT product_id, warehouse_id, SUM(quantity), CURRENT_TIMESTAMP FROM (
+            SELECT product_id, warehouse_id, quantity FROM entries
+            UNION ALL SELECT product_id, warehouse_id, quantity FROM entries_archive
+            UNION ALL SELECT product_id, warehouse_id, -quantity FROM exits
+            UNION ALL SELECT product_id, warehouse_id, -quantity FROM exits_archive
+        ) movements
+        GROUP BY product_id, warehouse_id
+    """)
+
+    op.create_table(
+        'transfers',
+        sa.Column('id', UUIDType(), primary_key=True),
+        sa.Column('product_id', UUIDType(), sa.ForeignKey('products.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('from_warehouse_id', UUIDType(), sa.ForeignKey('warehouses.id'), nullable=False),
+        sa.Column('to_warehouse_id', UUIDType(), sa.ForeignKey('warehouses.id'), nullable=False),
+        sa.Column('quantity', sa.Numeric(10, 2), nullable=False),
+        sa.Column('transfer_date', sa.Date, nullable=False),
+        sa.Column('observation', sa.Text, nullable=True),
+        sa.Column('exit_id', UUIDType(), nullable=False),
+        sa.Column('entry_id', UUIDType(), nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.CheckConstraint('quantity > 0', name='ck_transfer_quantity_positive')
+    )
+    op.create_index('ix_transfers_product_id_transfer_date', 'transfers', ['product_id', 'transfer_date'])
+    op.create_index('ix_transfers_from_warehouse_id', 'transfers', ['from_warehouse_id'])
+    op.create_index('ix_transfers_to_warehouse_id', 'transfers', ['to_warehouse_id'])
+
+
+def downgrade():
+    op.drop_index('ix_transfers_to_warehouse_id', table_name='transfers')
+    op.drop_index('ix_transfers_from_warehouse_id', table_name='transfers')
+    op.drop_index('ix_transfers_product_id_transfer_date', table_name='transfers')
+    op.drop_table('transfers')
+    op.drop_index('ix_stock_balances_warehouse_id', table_name='stock_balances')
+    op.drop_table('stock_balances')
+
+    for table, date_column in LEDGERS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f'ix_{table}_warehouse_id_{date_column}')
+            batch_op.drop_constraint(f'fk_{table}_warehouse_id_warehouses', type_='foreignkey')
+            batch_op.drop_column('warehouse_id')
@@ -0,0 +1,43 @@
+"""category hierarchy with a closure table
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.db.types import UUIDType
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.add_column(sa.Column('parent_id', UUIDType(), nullable=True))
+        batch_op.create_foreign_key('fk_categories_parent_id_categories', 'categories', ['parent_id'], ['id'])
+        batch_op.create_index('ix_categories_parent_id', ['parent_id'])
+
+    op.create_table(
+        'category_closure',
+        sa.Column('ancestor_id', UUIDType(), sa.ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('descendant_id', UUIDType(), sa.ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('depth', sa.Integer, nullable=False)
+    )
+    op.create_index('ix_category_closure_descendant_id', 'category_closure', ['descendant_id'])
+    # Existing categories are all roots
+    op.execute("INSERT INTO category_closure (ancestor_id, descendant_id, depth) SELECT id, id, 0 FROM categories")
+
+
+def downgrade():
+    op.drop_index('ix_category_closure_descendant_id', table_name='category_closure')
+    op.drop_table('category_closure')
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_index('ix_categories_parent_id')
+        batch_op.drop_constraint('fk_categories_parent_id_categories', type_='foreignkey')
+        batch_op.drop_column('parent_id')
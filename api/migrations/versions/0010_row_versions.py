@@ -0,0 +1,32 @@
+"""row versions for optimistic concurrency on products, categories and warehouses
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 23:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+TABLES = ['products', 'categories', 'warehouses']
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer, nullable=True))
+        op.execute(f"UPDATE {table} SET version = 1")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('version', existing_type=sa.Integer, nullable=False, server_default=sa.text('1'))
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('version')
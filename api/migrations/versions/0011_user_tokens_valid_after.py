@@ -0,0 +1,25 @@
+"""user token revocation
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-20 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('tokens_valid_after', sa.Double, nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('tokens_valid_after')
@@ -0,0 +1,30 @@
+"""outbox claim lease
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-20 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+PreciseDateTime = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def upgrade():
+    op.add_column('outbox_events', sa.Column('claimed_by', sa.String(64), nullable=True))
+    op.add_column('outbox_events', sa.Column('claimed_until', PreciseDateTime, nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('outbox_events') as batch_op:
+        batch_op.drop_column('claimed_until')
+        batch_op.drop_column('claimed_by')
@@ -0,0 +1,24 @@
+"""transfers exit_id index
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-21 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_transfers_exit_id', 'transfers', ['exit_id'])
+
+
+def downgrade():
+    op.drop_index('ix_transfers_exit_id', table_name='transfers')
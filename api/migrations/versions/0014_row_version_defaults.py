@@ -0,0 +1,32 @@
+"""server default for row versions
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-21 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+TABLES = ['products', 'categories', 'warehouses']
+
+
+def upgrade():
+    # Rows inserted outside the ORM (saep_db.sql, manual loads) start at version 1;
+    # databases created before 0010 set this default get it here
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('version', existing_type=sa.Integer, existing_nullable=False, server_default=sa.text('1'))
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('version', existing_type=sa.Integer, existing_nullable=False, server_default=None)
@@ -0,0 +1,77 @@
+from utils.db.connection import db
+from utils.db.types import UUIDType
+from datetime import datetime
+import pytz
+import json
+from typing import Dict
+from sqlalchemy import Index, select, func
+from sqlalchemy.dialects import mysql
+
+# Microsecond timestamps so the relay can report sub-second delivery latency on MySQL
+PreciseDateTime = db.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+def local_now() -> datetime:
+    return datetime.now(pytz.timezone('America/Sao_Paulo')).replace(tzinfo=None)
+
+class OutboxEvent(db.Model):
+    """Movement events written in the same transaction as the movement itself and
+    delivered to downstream systems by the outbox relay"""
+    __tablename__ = "outbox_events"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True, autoincrement=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    aggregate_id = db.Column(UUIDType, nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(PreciseDateTime, nullable=False, default=local_now)
+    published_at = db.Column(PreciseDateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Relay currently delivering the event and the end of its lease
+    claimed_by = db.Column(db.String(64), nullable=True)
+    claimed_until = db.Column(PreciseDateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_outbox_events_published_at_id', 'published_at', 'id'),
+    )
+
+    def serialize(self):
+        return {
+            "id": self.id,
+            "type": self.event_type,
+            "aggregate_id": self.aggregate_id,
+            "payload": json.loads(self.payload),
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+def _isoformat(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+def add_outbox_event(event_type: str, aggregate_id: str, payload: Dict) -> OutboxEvent:
+    """Stage an event in the caller's session; it is committed (or rolled back) together
+    with the write that produced it"""
+    outbox_event = OutboxEvent(event_type=event_type, aggregate_id=aggregate_id, payload=json.dumps(payload))
+    db.session.add(outbox_event)
+    return outbox_event
+
+def add_movement_event(event_type: str, movement) -> OutboxEvent:
+    """Stage an entry.* / exit.* event carrying the movement as it is being written"""
+    date_field = "entry_date" if hasattr(movement, "entry_date") else "exit_date"
+    return add_outbox_event(event_type, movement.id, {
+        "id": movement.id,
+        "product_id": movement.product_id,
+        "warehouse_id": movement.warehouse_id,
+        date_field: _isoformat(getattr(movement, date_field)),
+        "quantity": float(movement.quantity) if movement.quantity is not None else None,
+        "observation": movement.observation
+    })
+
+def get_outbox_stats() -> Dict:
+    pending, oldest = db.session.execute(
+        select(func.count(OutboxEvent.id), func.min(OutboxEvent.created_at)).where(OutboxEvent.published_at.is_(None))
+    ).one()
+    return {
+        "pending": pending,
+        "oldest_pending_age_s": round((local_now() - oldest).total_seconds(), 3) if oldest else 0.0,
+        "last_published_id": db.session.execute(
+            select(func.max(OutboxEvent.id)).where(OutboxEvent.published_at.is_not(None))
+        ).scalar()
+    }
@@ -0,0 +1,132 @@
+from typing import Dict, List
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, or_
+from utils.db.connection import db
+from outbox.model import OutboxEvent, local_now
+import socket
+import time
+import uuid
+import os
+
+def _percentile_ms(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return round(ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))] * 1000, 2)
+
+class OutboxRelay:
+    """Delivers unpublished outbox events to a sink in id order, at least once.
+
+    A batch is claimed in a short transaction: its rows are locked with FOR UPDATE SKIP
+    LOCKED (so several relays can run), stamped with this relay and a lease of
+    lease_seconds, and committed before anything is sent, so no row or gap lock is held
+    while the sink is called and movement inserts never wait on it. Delivered events are
+    then marked published in a second transaction. A crash or sink failure leaves the
+    batch unpublished and it is claimed and sent again once released or its lease runs
+    out; consumers deduplicate on the event id.
+    """
+
+    def __init__(self, app, sink, batch_size: int = 500, lease_seconds: float = 60.0):
+        self.app = app
+        self.sink = sink
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.relay_id = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.published = 0
+        self.failures = 0
+        self.batches = 0
+        self.latencies: List[float] = []
+        self.started = time.monotonic()
+
+    def claim(self) -> List[Dict]:
+        """Lease the next batch of unclaimed (or expired) events to this relay"""
+        now = local_now()
+        rows = db.session.execute(
+            select(OutboxEvent)
+            .where(
+                OutboxEvent.published_at.is_(None),
+                or_(OutboxEvent.claimed_until.is_(None), OutboxEvent.claimed_until < now)
+            )
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not rows:
+            db.session.rollback()
+            return []
+
+        events = [row.serialize() for row in rows]
+        db.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_([row.id for row in rows]))
+            .values(claimed_by=self.relay_id, claimed_until=now + timedelta(seconds=self.lease_seconds))
+        )
+        db.session.commit()
+        return events
+
+    def run_once(self) -> int:
+        """Publish one batch and return how many events it held"""
+        with self.app.app_context():
+            try:
+                events = self.claim()
+                if not events:
+                    return 0
+
+                ids = [outbox_event["id"] for outbox_event in events]
+                claimed = (OutboxEvent.id.in_(ids), OutboxEvent.claimed_by == self.relay_id)
+                try:
+                    self.sink.send(events)
+                except Exception:
+                    # Release the lease so the batch is retried without waiting for it
+                    db.session.execute(update(OutboxEvent).where(*claimed).values(attempts=OutboxEvent.attempts + 1, claimed_until=None))
+                    db.session.commit()
+                    self.failures += 1
+                    raise
+
+                published_at = local_now()
+                db.session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(ids), OutboxEvent.published_at.is_(None))
+                    .values(published_at=published_at)
+                )
+                db.session.commit()
+
+                self.batches += 1
+                self.published += len(events)
+                self.latencies.extend(
+                    (published_at - datetime.fromisoformat(outbox_event["created_at"])).total_seconds() for outbox_event in events
+                )
+                self.latencies = self.latencies[-10000:]
+                return len(events)
+            finally:
+                db.session.remove()
+
+    def run(self, poll_interval: float = 1.0, report_interval: float = 60.0, max_backoff: float = 30.0) -> None:
+        backoff = poll_interval
+        last_report = time.monotonic()
+        while True:
+            try:
+                sent = self.run_once()
+                backoff = poll_interval
+            except Exception as e:
+                self.app.logger.error(f"Outbox relay could not deliver to {self.sink!r}: {str(e)}")
+                sent = 0
+                time.sleep(backoff)
+                backoff = min(backoff * 2, max_backoff)
+
+            if time.monotonic() - last_report >= report_interval:
+                self.app.logger.info(f"Outbox relay metrics: {self.metrics()}")
+                last_report = time.monotonic()
+            if sent < self.batch_size:
+                time.sleep(poll_interval)
+
+    def metrics(self) -> Dict:
+        elapsed = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "published": self.published,
+            "batches": self.batches,
+            "failures": self.failures,
+            "events_per_s": round(self.published / elapsed, 2) if elapsed else 0.0,
+            "delivery_p50_ms": _percentile_ms(latencies, 50),
+            "delivery_p99_ms": _percentile_ms(latencies, 99)
+        }
@@ -0,0 +1,15 @@
+from flask import jsonify, Blueprint, current_app
+from outbox.model import get_outbox_stats
+
+blueprint = Blueprint('outbox', __name__)
+
+@blueprint.route("/stats", methods=["GET"])
+def stats():
+    try:
+        return jsonify({
+            "data": get_outbox_stats(),
+            "message": "Outbox stats retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving outbox stats: {str(e)}")
+        return jsonify({"error": "Failed to retrieve outbox stats due to an internal server error."}), 500
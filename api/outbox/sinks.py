@@ -0,0 +1,49 @@
+from typing import Dict, List
+import urllib.request
+import json
+import os
+
+class FileSink:
+    """Appends each batch as JSON lines and fsyncs before acknowledging it"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, events: List[Dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for outbox_event in events:
+                f.write(json.dumps(outbox_event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __repr__(self):
+        return f"FileSink({self.path})"
+
+class HttpSink:
+    """POSTs each batch as a JSON array; any non-2xx answer fails the whole batch"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events: List[Dict]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(events).encode("utf-8"),
+            method="POST",
+            headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"Sink answered {response.status}")
+
+    def __repr__(self):
+        return f"HttpSink({self.url})"
+
+def build_sink(spec: str):
+    """Sink from a spec: `file:<path>` or an http(s) URL"""
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    if spec.startswith("http://") or spec.startswith("https://"):
+        return HttpSink(spec, float(os.getenv("OUTBOX_SINK_TIMEOUT", "10")))
+    raise ValueError(f"Unsupported outbox sink: {spec}")
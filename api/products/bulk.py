@@ -0,0 +1,378 @@
+from utils.db.connection import db
+from utils.db.types import new_id
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+import codecs
+import csv
+import io
+import os
+import pytz
+from typing import Dict, Iterator, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import select, insert, update, or_
+from products.model import Product, normalize_code
+from categories.model import Category
+from warehouses.model import Warehouse
+from sync.model import record_changes
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 500
+MAX_BULK_UPDATES = 5000
+MAX_IMPORT_BYTES = int(os.getenv("PRODUCT_IMPORT_MAX_MB", "20")) * 1024 * 1024
+
+# Accepted header names (lowercase) for each field, in English or Portuguese
+IMPORT_COLUMNS = {
+    "name": ("name", "nome", "produto"),
+    "sku": ("sku",),
+    "barcode": ("barcode", "codigo_barras", "código de barras", "codigo de barras", "ean"),
+    "category": ("category", "categoria"),
+    "category_id": ("category_id",),
+    "warehouse": ("warehouse", "armazem", "armazém"),
+    "warehouse_id": ("warehouse_id",),
+    "min_quantity": ("min_quantity", "quantidade_minima", "quantidade mínima", "estoque_minimo", "estoque mínimo"),
+    "unit_cost": ("unit_cost", "custo_unitario", "custo unitário", "custo", "preco", "preço"),
+    "observation": ("observation", "observacao", "observação"),
+}
+
+class ProductImportError(ValueError):
+    """Raised when rows of an import or bulk update fail validation; nothing is written.
+
+    `errors` holds one {"row", "error"} item per rejected row (at most MAX_REPORTED_ERRORS).
+    """
+
+    def __init__(self, message: str, errors: List[Dict]):
+        super().__init__(message)
+        self.errors = errors
+
+def parse_decimal(value) -> Optional[Decimal]:
+    """Number from a spreadsheet cell; accepts "12.5", "12,5" and "1.234,56". Blank is None."""
+    if value is None:
+        return None
+    text = str(value).strip().replace(" ", "")
+    if not text:
+        return None
+    if "," in text:
+        # The last separator is the decimal one
+        if "." in text and text.rindex(".") > text.rindex(","):
+            text = text.replace(",", "")
+        else:
+            text = text.replace(".", "").replace(",", ".")
+    number = Decimal(text)
+    if not number.is_finite():
+        raise InvalidOperation(text)
+    return number
+
+def _cell(value) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+def _header_map(header: List) -> Dict[str, int]:
+    aliases = {alias: field for field, names in IMPORT_COLUMNS.items() for alias in names}
+    columns = {}
+    for position, title in enumerate(header):
+        field = aliases.get(str(title or "").strip().lower())
+        if field is not None and field not in columns:
+            columns[field] = position
+    if not any(field in columns for field in ("name", "sku", "barcode")):
+        raise ValueError("The file must have a 'name', 'sku' or 'barcode' column")
+    return columns
+
+def _csv_rows(stream) -> Iterator[List]:
+    text = codecs.getreader("utf-8-sig")(stream)
+    first_line = text.readline()
+    # Spreadsheets saved with a Brazilian locale separate columns with ';'
+    delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+    yield from csv.reader(_prepend(first_line, text), delimiter=delimiter)
+
+def _prepend(first_line: str, text) -> Iterator[str]:
+    yield first_line
+    yield from text
+
+def _xlsx_rows(stream) -> Iterator[List]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the openpyxl package; upload a CSV file instead")
+    if not getattr(stream, "seekable", lambda: False)():
+        # The zip directory sits at the end of the file
+        stream = io.BytesIO(stream.read())
+    # read_only streams the sheet row by row instead of loading every cell
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+def read_rows(stream, file_format: str) -> Iterator[Tuple[int, Dict]]:
+    """(line number, {field: value}) for every non-empty data row, parsed incrementally"""
+    if file_format not in ("csv", "xlsx"):
+        raise ValueError("File format must be csv or xlsx")
+    rows = _csv_rows(stream) if file_format == "csv" else _xlsx_rows(stream)
+
+    header = next(rows, None)
+    if not header:
+        raise ValueError("The file is empty")
+    columns = _header_map(header)
+
+    for line, row in enumerate(rows, start=2):
+        values = {field: (row[position] if position < len(row) else None) for field, position in columns.items()}
+        if any(_cell(value) is not None for value in values.values()):
+            yield line, values
+
+def _chunks(rows: Iterator[Tuple[int, Dict]], size: int) -> Iterator[List[Tuple[int, Dict]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _name_index(model) -> Tuple[Dict[str, str], set]:
+    """Lowercase name -> id, and the set of ids, for one lookup table"""
+    rows = db.session.execute(select(model.id, model.name)).all()
+    return {name.strip().lower(): item_id for item_id, name in rows}, {item_id for item_id, _ in rows}
+
+def _resolve(values: Dict, field: str, names: Dict[str, str], ids: set) -> Tuple[Optional[str], Optional[str]]:
+    """(id, error) of the category/warehouse a row names, by id or by name"""
+    item_id = _cell(values.get(f"{field}_id"))
+    if item_id is not None:
+        return (item_id, None) if item_id in ids else (None, f"Invalid {field} ID: {item_id}")
+    name = _cell(values.get(field))
+    if name is None:
+        return None, None
+    if name.lower() not in names:
+        return None, f"Unknown {field}: {name}"
+    return names[name.lower()], None
+
+def _existing_by_code(codes: List[str]) -> Dict[str, Tuple[str, Optional[str], Optional[str], int]]:
+    """Lower-cased code -> (product id, sku, barcode, version) of the products already
+    using any of codes; keyed case-insensitively like the columns' MySQL collation, which
+    also matches the query against other spellings of the same code"""
+    if not codes:
+        return {}
+    owners = {}
+    for product_id, sku, barcode, version in db.session.execute(
+        select(Product.id, Product.sku, Product.barcode, Product.version).where(or_(Product.sku.in_(codes), Product.barcode.in_(codes)))
+    ):
+        for code in (sku, barcode):
+            if code:
+                owners[code.lower()] = (product_id, sku, barcode, version)
+    return owners
+
+def _parse_import_row(values: Dict, categories, warehouses) -> Tuple[Optional[str], Dict]:
+    name = _cell(values.get("name"))
+    if name is not None and len(name) > 200:
+        return "Product name must be at most 200 characters", {}
+
+    row = {"name": name, "sku": normalize_code(values.get("sku")), "barcode": normalize_code(values.get("barcode"))}
+    for field in ("sku", "barcode"):
+        if row[field] is not None and len(row[field]) > 64:
+            return f"{'SKU' if field == 'sku' else 'Barcode'} must be at most 64 characters", {}
+    if row["sku"] is not None and row["sku"] == row["barcode"]:
+        return "SKU and barcode must be different", {}
+
+    for field in ("min_quantity", "unit_cost"):
+        label = "Minimum quantity" if field == "min_quantity" else "Unit cost"
+        try:
+            number = parse_decimal(values.get(field))
+        except InvalidOperation:
+            return f"{label} must be a valid number", {}
+        if number is not None and number < 0:
+            return f"{label} must be greater than or equal to 0", {}
+        row[field] = number
+
+    row["category_id"], error = _resolve(values, "category", *categories)
+    if error:
+        return error, {}
+    row["warehouse_id"], error = _resolve(values, "warehouse", *warehouses)
+    if error:
+        return error, {}
+    row["observation"] = _cell(values.get("observation"))
+    return None, row
+
+def import_products(stream, file_format: str, dry_run: bool = False) -> Dict:
+    """Create or update products from a CSV/XLSX catalog in one transaction.
+
+    Rows are parsed as the file is read and handled IMPORT_BATCH_SIZE at a time:
+    category and warehouse names come from two lookups made once, existing products
+    are found by SKU or barcode with one query per batch, and each batch is written
+    with one multi-row INSERT and one bulk UPDATE. A row whose code belongs to an
+    existing product updates it (blank cells keep the current value); any other row
+    creates a product and needs a name and a warehouse.
+
+    If any row fails, nothing is committed and ProductImportError lists the rejected
+    rows; dry_run validates the whole file and reports without writing.
+    """
+    current_app.logger.info(f"Starting product import ({file_format}{', dry run' if dry_run else ''})")
+    categories = _name_index(Category)
+    warehouses = _name_index(Warehouse)
+    seen_codes: Dict[str, int] = {}
+    changed_ids: Dict[str, None] = {}
+    errors: List[Dict] = []
+    error_count = 0
+    report = {"rows": 0, "created": 0, "updated": 0}
+
+    def reject(line: int, error: str) -> None:
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": line, "error": error})
+
+    try:
+        for chunk in _chunks(read_rows(stream, file_format), IMPORT_BATCH_SIZE):
+            parsed = []
+            for line, values in chunk:
+                report["rows"] += 1
+                error, row = _parse_import_row(values, categories, warehouses)
+                if error is None:
+                    for code in (row["sku"], row["barcode"]):
+                        if code is not None and code.lower() in seen_codes:
+                            error = f"Code '{code}' is repeated (first used on row {seen_codes[code.lower()]})"
+                            break
+                if error:
+                    reject(line, error)
+                    continue
+                for code in (row["sku"], row["barcode"]):
+                    if code is not None:
+                        seen_codes[code.lower()] = line
+                parsed.append((line, row))
+
+            owners = _existing_by_code([code for _, row in parsed for code in (row["sku"], row["barcode"]) if code])
+            # Bulk updates are versioned like ORM ones; a product matched by two rows
+            # (one by SKU, one by barcode) is updated twice, each from the version the other left
+            versions = {owner[0]: owner[3] for owner in owners.values()}
+            now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+            inserts, updates = [], []
+            for line, row in parsed:
+                matches = {owners[code.lower()][0] for code in (row["sku"], row["barcode"]) if code and code.lower() in owners}
+                if len(matches) > 1:
+                    reject(line, "SKU and barcode belong to different products")
+                    continue
+
+                if matches:
+                    product_id = matches.pop()
+                    changes = {field: row[field] for field in ("name", "sku", "barcode", "category_id", "warehouse_id", "min_quantity", "unit_cost", "observation") if row[field] is not None}
+                    updates.append({"id": product_id, "version": versions[product_id], **changes, "active": True, "updated_at": now})
+                    versions[product_id] += 1
+                    continue
+
+                if row["name"] is None:
+                    reject(line, "Product name is required")
+                elif row["warehouse_id"] is None:
+                    reject(line, "Warehouse is required")
+                else:
+                    inserts.append({
+                        **row,
+                        "id": new_id(),
+                        "min_quantity": row["min_quantity"] if row["min_quantity"] is not None else 0,
+                        "unit_cost": row["unit_cost"] if row["unit_cost"] is not None else 0,
+                        "active": True,
+                        "created_at": now,
+                        "updated_at": now
+                    })
+
+            report["created"] += len(inserts)
+            report["updated"] += len(updates)
+            # Once a row failed the transaction is going to be rolled back: keep
+            # validating to report every error, but stop writing
+            if error_count or dry_run:
+                continue
+            if inserts:
+                db.session.execute(insert(Product), inserts)
+            if updates:
+                db.session.execute(update(Product), updates)
+            changed_ids.update(dict.fromkeys(row["id"] for row in inserts + updates))
+
+        if error_count and not dry_run:
+            raise ProductImportError(f"{error_count} rows with errors; no product was imported", errors)
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            # Bulk statements bypass the flush hook, so the sync log is stamped here, once,
+            # right before the commit that takes the sequence lock
+            record_changes(db.session, [("products", product_id, "upsert", product_id) for product_id in changed_ids])
+            db.session.commit()
+        current_app.logger.info(f"Product import finished: {report['created']} created, {report['updated']} updated, {error_count} errors")
+        return {**report, "dry_run": dry_run, "error_count": error_count, "errors": errors}
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error importing products: {str(e)}")
+        raise
+
+def bulk_update_products(updates: List[Dict]) -> int:
+    """Set unit_cost and/or min_quantity of many products, identified by id, sku or
+    barcode, with one lookup query and one bulk UPDATE; all or nothing"""
+    current_app.logger.info(f"Starting bulk update of {len(updates) if isinstance(updates, list) else 0} products")
+    if not isinstance(updates, list) or not updates:
+        raise ValueError("updates must be a non-empty list")
+    if len(updates) > MAX_BULK_UPDATES:
+        raise ValueError(f"At most {MAX_BULK_UPDATES} updates per request")
+
+    ids = [item.get("id") for item in updates if isinstance(item, dict) and item.get("id")]
+    codes = [normalize_code(item.get(field)) for item in updates if isinstance(item, dict) for field in ("sku", "barcode") if normalize_code(item.get(field))]
+    versions = dict(db.session.execute(select(Product.id, Product.version).where(Product.id.in_(ids))).all()) if ids else {}
+    owners = _existing_by_code(codes)
+    versions.update({owner[0]: owner[3] for owner in owners.values()})
+
+    errors: List[Dict] = []
+    changes: Dict[str, Dict] = {}
+    for index, item in enumerate(updates, start=1):
+        if not isinstance(item, dict):
+            errors.append({"row": index, "error": "Each update must be an object"})
+            continue
+
+        product_id = item.get("id")
+        if product_id:
+            if product_id not in versions:
+                errors.append({"row": index, "error": f"Invalid product ID: {product_id}"})
+                continue
+        else:
+            code = normalize_code(item.get("sku")) or normalize_code(item.get("barcode"))
+            if code is None:
+                errors.append({"row": index, "error": "id, sku or barcode is required"})
+                continue
+            if code.lower() not in owners:
+                errors.append({"row": index, "error": f"No product with code '{code}'"})
+                continue
+            product_id = owners[code.lower()][0]
+
+        values = {}
+        for field, label in (("unit_cost", "Unit cost"), ("min_quantity", "Minimum quantity")):
+            if item.get(field) is None:
+                continue
+            try:
+                number = parse_decimal(item[field])
+            except InvalidOperation:
+                errors.append({"row": index, "error": f"{label} must be a valid number"})
+                break
+            if number < 0:
+                errors.append({"row": index, "error": f"{label} must be greater than or equal to 0"})
+                break
+            values[field] = number
+        else:
+            if not values:
+                errors.append({"row": index, "error": "unit_cost or min_quantity is required"})
+                continue
+            changes.setdefault(product_id, {}).update(values)
+
+    if errors:
+        raise ProductImportError(f"{len(errors)} updates with errors; no product was changed", errors[:MAX_REPORTED_ERRORS])
+
+    try:
+        now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+        db.session.execute(update(Product), [{"id": product_id, "version": versions[product_id], **values, "updated_at": now} for product_id, values in changes.items()])
+        # Bulk updates bypass the flush hook, so the sync log is stamped here
+        record_changes(db.session, [("products", product_id, "upsert", product_id) for product_id in changes])
+        db.session.commit()
+        current_app.logger.info(f"Bulk updated {len(changes)} products")
+        return len(changes)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error bulk updating products: {str(e)}")
+        raise
@@ -1,34 +1,81 @@
 from utils.db.connection import db
-from datetime import datetime
+from utils.db.types import UUIDType, new_id, unique_ids
+from datetime import datetime, date
 import pytz
-import uuid
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from flask import current_app
 from sqlalchemy import ForeignKey, CheckConstraint
-from sqlalchemy.orm import relationship
-from sqlalchemy import func, case
+from sqlalchemy.orm import relationship, joinedload
+from sqlalchemy import func, case, select, bindparam, delete, literal, union_all, tuple_, or_
+import base64
+import json
+from entries.model import Entry, EntryArchive
+from exits.model import Exit, ExitArchive
+from archive.model import ArchivedBalance
+from balances.model import StockBalance
+from outbox.model import add_outbox_event
+
+# Hot statements are built once with bind parameters so every call reuses the same
+# compiled SQL from SQLAlchemy's statement cache instead of rebuilding the query.
+# Movements of archived periods only contribute through their per-product totals.
+CURRENT_STOCK_STATEMENT = select(
+    select(func.coalesce(func.sum(Entry.quantity), 0))
+        .where(Entry.product_id == bindparam("product_id"))
+        .scalar_subquery()
+    - select(func.coalesce(func.sum(Exit.quantity), 0))
+        .where(Exit.product_id == bindparam("product_id"))
+        .scalar_subquery()
+    + select(func.coalesce(func.sum(ArchivedBalance.entries_quantity - ArchivedBalance.exits_quantity), 0))
+        .where(ArchivedBalance.product_id == bindparam("product_id"))
+        .scalar_subquery()
+)
 
 def get_product_current_stock(product_id: str) -> float:
     """Calculate current stock for a product by summing entries and subtracting exits"""
     try:
-        from entries.model import Entry
-        from exits.model import Exit
-
-        # Sum all entry quantities
-        total_entries = db.session.query(func.sum(Entry.quantity))\
-            .filter(Entry.product_id == product_id)\
-            .scalar() or 0
-
-        # Sum all exit quantities
-        total_exits = db.session.query(func.sum(Exit.quantity))\
-            .filter(Exit.product_id == product_id)\
-            .scalar() or 0
-
-        return float(total_entries) - float(total_exits)
+        # Entries minus exits in a single round trip
+        current_stock = db.session.execute(CURRENT_STOCK_STATEMENT, {"product_id": product_id}).scalar()
+        return float(current_stock or 0)
     except Exception as e:
         current_app.logger.error(f"Error calculating stock for product {product_id}: {str(e)}")
         return 0.0
 
+def current_stock_subquery(product_ids=None):
+    """Subquery of (product_id, stock) for every product, or only product_ids (a list
+    or a select of ids): each ledger is summed with a single GROUP BY and joined back
+    to the products"""
+    def totals(model):
+        query = select(model.product_id, func.sum(model.quantity).label("quantity")).group_by(model.product_id)
+        if product_ids is not None:
+            query = query.where(model.product_id.in_(product_ids))
+        return query.subquery()
+
+    entries_total = totals(Entry)
+    exits_total = totals(Exit)
+    statement = (
+        select(
+            Product.id.label("product_id"),
+            (func.coalesce(entries_total.c.quantity, 0)
+             - func.coalesce(exits_total.c.quantity, 0)
+             + func.coalesce(ArchivedBalance.entries_quantity - ArchivedBalance.exits_quantity, 0)).label("stock")
+        )
+        .outerjoin(entries_total, entries_total.c.product_id == Product.id)
+        .outerjoin(exits_total, exits_total.c.product_id == Product.id)
+        .outerjoin(ArchivedBalance, ArchivedBalance.product_id == Product.id)
+    )
+    if product_ids is not None:
+        statement = statement.where(Product.id.in_(product_ids))
+    return statement.subquery()
+
+def get_current_stocks(product_ids: Optional[List[str]] = None) -> Dict[str, float]:
+    """Current stock of many products (all of them when product_ids is None) in one
+    round trip instead of one stock statement per product"""
+    if product_ids is not None and not product_ids:
+        return {}
+
+    stocks = current_stock_subquery(product_ids)
+    return {product_id: float(stock or 0) for product_id, stock in db.session.execute(select(stocks.c.product_id, stocks.c.stock))}
+
 def get_stock_status(current_stock: float, min_quantity: float) -> str:
     """Determine stock status based on current stock and minimum quantity"""
     if current_stock <= 0:
@@ -41,37 +88,47 @@ def get_stock_status(current_stock: float, min_quantity: float) -> str:
 class Product(db.Model):
     __tablename__ = "products"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDType, primary_key=True, default=new_id)
     name = db.Column(db.String(200), nullable=False)
-    category_id = db.Column(db.String(36), ForeignKey('categories.id'), nullable=True)
-    warehouse_id = db.Column(db.String(36), ForeignKey('warehouses.id'), nullable=False)
+    sku = db.Column(db.String(64), nullable=True, unique=True, index=True)
+    barcode = db.Column(db.String(64), nullable=True, unique=True, index=True)
+    category_id = db.Column(UUIDType, ForeignKey('categories.id'), nullable=True)
+    warehouse_id = db.Column(UUIDType, ForeignKey('warehouses.id'), nullable=False)
     min_quantity = db.Column(db.Numeric(10, 2), nullable=False)
     unit_cost = db.Column(db.Numeric(10, 2), nullable=False)
     observation = db.Column(db.Text, nullable=True)
     active = db.Column(db.Boolean, nullable=False, default=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')))
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')), onupdate=datetime.now(pytz.timezone('America/Sao_Paulo')))
+    # Bumped by every ORM update, which only applies if the row still has the version it was read with
+    version = db.Column(db.Integer, nullable=False, default=1, server_default=db.text('1'))
 
     category_rel = relationship('Category', back_populates='products')
     warehouse_rel = relationship('Warehouse', back_populates='products')
-    entries = relationship('Entry', back_populates='product_rel', lazy='dynamic', cascade='all, delete-orphan')
-    exits = relationship('Exit', back_populates='product_rel', lazy='dynamic', cascade='all, delete-orphan')
+    # Movements are removed by the database (ON DELETE CASCADE); the ORM never loads them to delete
+    entries = relationship('Entry', back_populates='product_rel', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True)
+    exits = relationship('Exit', back_populates='product_rel', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True)
 
     __table_args__ = (
         CheckConstraint('min_quantity >= 0', name='ck_min_quantity_positive'),
         CheckConstraint('unit_cost >= 0', name='ck_unit_cost_positive'),
     )
+    __mapper_args__ = {"version_id_col": version}
 
     def __repr__(self):
         return f"<Product {self.id}, Name: {self.name}>"
 
-    def serialize(self):
-        current_stock = get_product_current_stock(self.id)
+    def serialize(self, current_stock: Optional[float] = None):
+        """current_stock may be passed in when it was computed for many products at once"""
+        if current_stock is None:
+            current_stock = get_product_current_stock(self.id)
         stock_status = get_stock_status(current_stock, float(self.min_quantity) if self.min_quantity else 0)
 
         return {
             "id": self.id,
             "name": self.name,
+            "sku": self.sku,
+            "barcode": self.barcode,
             "category_id": self.category_id,
             "warehouse_id": self.warehouse_id,
             "min_quantity": float(self.min_quantity) if self.min_quantity else 0,
@@ -80,6 +137,7 @@ class Product(db.Model):
             "active": self.active,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "version": self.version,
             "current_stock": current_stock,
             "stock_status": stock_status,
             "category_name": self.category_rel.name if self.category_rel else None,
@@ -87,10 +145,28 @@ class Product(db.Model):
         }
 
     
-def validate_product_data(product_data: Dict) -> Optional[str]:
+def normalize_code(code) -> Optional[str]:
+    """SKUs and barcodes are stored trimmed; blank values mean no code"""
+    if code is None:
+        return None
+    code = str(code).strip()
+    return code or None
+
+def validate_product_data(product_data: Dict, product_id: Optional[str] = None) -> Optional[str]:
     if 'name' not in product_data or not product_data['name']:
         return "Product name is required"
 
+    # A code must be unique across both columns so a scan always resolves to one product
+    for field in ('sku', 'barcode'):
+        code = normalize_code(product_data.get(field))
+        if code is None:
+            continue
+        if len(code) > 64:
+            return f"{'SKU' if field == 'sku' else 'Barcode'} must be at most 64 characters"
+        owner = Product.query.filter(or_(Product.sku == code, Product.barcode == code)).first()
+        if owner is not None and owner.id != product_id:
+            return f"Code '{code}' is already used by product '{owner.name}'"
+
     if 'warehouse_id' not in product_data or not product_data['warehouse_id']:
         return "Warehouse ID is required"
 
@@ -133,6 +209,8 @@ def create_product(product_data: Dict) -> Optional[Product]:
     try:
         new_product = Product(
             name=product_data["name"],
+            sku=normalize_code(product_data.get("sku")),
+            barcode=normalize_code(product_data.get("barcode")),
             category_id=product_data.get("category_id"),
             warehouse_id=product_data["warehouse_id"],
             min_quantity=product_data.get("min_quantity", 0),
@@ -151,7 +229,30 @@ def create_product(product_data: Dict) -> Optional[Product]:
         raise
 
 def get_product(product_id: str) -> Optional[Product]:
-    return Product.query.get(product_id)
+    return db.session.get(Product, product_id)
+
+def get_product_by_code(code: str) -> Optional[Product]:
+    """Active product whose SKU or barcode is `code`, one read on the unique code indexes"""
+    code = normalize_code(code)
+    if code is None:
+        return None
+
+    return (
+        Product.query
+        .options(joinedload(Product.category_rel), joinedload(Product.warehouse_rel))
+        .filter(or_(Product.sku == code, Product.barcode == code), Product.active.is_(True))
+        .first()
+    )
+
+def get_products_by_ids(product_ids: List[str]) -> Tuple[List[Product], List[str]]:
+    """Products with the given ids in request order (one IN query, category and warehouse
+    joined in), and the ids that matched no product"""
+    product_ids = unique_ids(product_ids)
+    found = {
+        product.id: product
+        for product in Product.query.options(joinedload(Product.category_rel), joinedload(Product.warehouse_rel)).filter(Product.id.in_(product_ids))
+    }
+    return [found[product_id] for product_id in product_ids if product_id in found], [product_id for product_id in product_ids if product_id not in found]
 
 def get_all_products() -> List[Product]:
     return Product.query.filter_by(active=True).all()
@@ -159,8 +260,17 @@ def get_all_products() -> List[Product]:
 def get_products_by_warehouse(warehouse_id: str) -> List[Product]:
     return Product.query.filter_by(warehouse_id=warehouse_id, active=True).all()
 
-def get_products_by_category(category_id: str) -> List[Product]:
-    return Product.query.filter_by(category_id=category_id, active=True).all()
+def get_products_by_category(category_id: str, include_subcategories: bool = False) -> List[Product]:
+    if not include_subcategories:
+        return Product.query.filter_by(category_id=category_id, active=True).all()
+
+    from categories.model import CategoryClosure
+    return (
+        Product.query
+        .join(CategoryClosure, CategoryClosure.descendant_id == Product.category_id)
+        .filter(CategoryClosure.ancestor_id == category_id, Product.active.is_(True))
+        .all()
+    )
 
 def get_low_stock_products() -> List[Product]:
     products = Product.query.filter_by(active=True).all()
@@ -180,13 +290,17 @@ def update_product(product_id: str, product_data: Dict) -> Optional[Product]:
     if not product:
         return None
 
-    validation_error = validate_product_data(product_data)
+    validation_error = validate_product_data(product_data, product.id)
     if validation_error:
         raise ValueError(validation_error)
 
     try:
         if "name" in product_data:
             product.name = product_data["name"]
+        if "sku" in product_data:
+            product.sku = normalize_code(product_data["sku"])
+        if "barcode" in product_data:
+            product.barcode = normalize_code(product_data["barcode"])
         if "category_id" in product_data:
             product.category_id = product_data["category_id"]
         if "warehouse_id" in product_data:
@@ -220,10 +334,107 @@ def delete_product(product_id: str) -> Optional[Product]:
     return None
 
 def hard_delete_product(product_id: str) -> Optional[Product]:
+    """Delete a product and its whole movement history with one DELETE per ledger table.
+
+    Movements are never loaded into the session, so the cost does not grow with the
+    number of ORM objects; the ON DELETE CASCADE foreign keys cover any other path.
+    """
     product = get_product(product_id)
     if product:
-        db.session.delete(product)
-        db.session.commit()
-        current_app.logger.info(f"Product hard deleted: {product.name}")
-        return product
-    return None
\ No newline at end of file
+        try:
+            name = product.name
+            for model in (Entry, Exit, EntryArchive, ExitArchive, ArchivedBalance, StockBalance):
+                db.session.execute(
+                    delete(model).where(model.product_id == product.id),
+                    execution_options={"synchronize_session": False}
+                )
+            # Downstream systems drop the product's movements along with it
+            add_outbox_event("product.deleted", product.id, {"id": product.id, "name": name})
+            db.session.delete(product)
+            db.session.commit()
+            current_app.logger.info(f"Product hard deleted: {name}")
+            return product
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error hard deleting product {product_id}: {str(e)}")
+            raise
+    return None
+
+TIMELINE_MAX_LIMIT = 500
+
+def _timeline_rows(model, date_column, movement_type: str, sign: int, archived: bool, product_id: str, before: Optional[tuple]):
+    movement_date = getattr(model, date_column)
+    query = select(
+        model.id.label("id"),
+        literal(movement_type).label("type"),
+        movement_date.label("movement_date"),
+        model.quantity.label("quantity"),
+        (model.quantity * sign).label("delta"),
+        model.observation.label("observation"),
+        model.created_at.label("created_at"),
+        literal(archived).label("archived")
+    ).where(model.product_id == product_id)
+    if before is not None:
+        query = query.where(tuple_(movement_date, model.created_at, model.id) < before)
+    return query
+
+def encode_timeline_cursor(row) -> str:
+    key = [row.movement_date.isoformat(), row.created_at.isoformat(), row.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+def decode_timeline_cursor(cursor: str) -> tuple:
+    try:
+        movement_date, created_at, movement_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (date.fromisoformat(movement_date), datetime.fromisoformat(created_at), movement_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+def get_product_timeline(product_id: str, limit: int = 50, cursor: Optional[str] = None) -> Dict:
+    """Entries and exits of a product (hot and archived) newest first, with the stock
+    balance after each movement.
+
+    Both ledgers are merged with UNION ALL and the running balance is a window SUM in
+    chronological order. Pages use a keyset cursor on (date, created_at, id): a row's
+    balance only depends on older rows, so the cursor predicate is applied inside the
+    union and later pages scan less history instead of re-reading it.
+    """
+    if limit < 1 or limit > TIMELINE_MAX_LIMIT:
+        raise ValueError(f"Limit must be between 1 and {TIMELINE_MAX_LIMIT}")
+    before = decode_timeline_cursor(cursor) if cursor else None
+
+    ledger = union_all(
+        _timeline_rows(Entry, "entry_date", "entry", 1, False, product_id, before),
+        _timeline_rows(EntryArchive, "entry_date", "entry", 1, True, product_id, before),
+        _timeline_rows(Exit, "exit_date", "exit", -1, False, product_id, before),
+        _timeline_rows(ExitArchive, "exit_date", "exit", -1, True, product_id, before)
+    ).subquery("ledger")
+
+    balanced = select(
+        ledger,
+        func.sum(ledger.c.delta).over(
+            order_by=(ledger.c.movement_date, ledger.c.created_at, ledger.c.id),
+            rows=(None, 0)
+        ).label("balance")
+    ).subquery("balanced")
+
+    rows = db.session.execute(
+        select(balanced)
+        .order_by(balanced.c.movement_date.desc(), balanced.c.created_at.desc(), balanced.c.id.desc())
+        .limit(limit + 1)
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [{
+            "id": row.id,
+            "type": row.type,
+            "movement_date": row.movement_date.isoformat() if row.movement_date else None,
+            "quantity": float(row.quantity) if row.quantity else 0,
+            "balance": float(row.balance) if row.balance else 0,
+            "observation": row.observation,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "archived": bool(row.archived)
+        } for row in rows],
+        "next_cursor": encode_timeline_cursor(rows[-1]) if has_more else None
+    }
\ No newline at end of file
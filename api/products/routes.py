@@ -1,5 +1,11 @@
 from flask import request, jsonify, Blueprint, current_app
-from products.model import Product, create_product, get_product, update_product, delete_product, get_all_products, get_products_by_warehouse, get_products_by_category, get_low_stock_products
+from products.model import Product, create_product, get_product, update_product, delete_product, get_all_products, get_products_by_warehouse, get_products_by_category, get_low_stock_products, get_product_timeline, get_product_by_code, get_products_by_ids, get_current_stocks
+from utils.db.versioning import etag_headers, if_match_failed
+from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.exceptions import RequestEntityTooLarge
+from products.search import search_products, DEFAULT_SEARCH_LIMIT
+from products.bulk import import_products, bulk_update_products, ProductImportError, MAX_IMPORT_BYTES
+from balances.model import get_product_balances
 import traceback
 
 blueprint = Blueprint('products', __name__)
@@ -31,6 +37,103 @@ def create():
         current_app.logger.error(traceback.format_exc())
         return jsonify({"error": "Failed to create product due to an internal server error."}), 500
 
+@blueprint.route("/read/many", methods=["POST"])
+def read_many():
+    current_app.logger.info(f"Products multi-get requested")
+    data = request.get_json()
+
+    if not data or "ids" not in data:
+        return jsonify({"error": "Request body must be JSON with an 'ids' list"}), 400
+
+    try:
+        products, missing = get_products_by_ids(data["ids"])
+        stocks = get_current_stocks([product.id for product in products])
+        products_data = [product.serialize(stocks.get(product.id, 0.0)) for product in products]
+
+        return jsonify({
+            "data": products_data,
+            "missing": missing,
+            "message": "Products retrieved successfully."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error retrieving products by ids: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving products by ids: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to retrieve products due to an internal server error."}), 500
+
+@blueprint.route("/import", methods=["POST"])
+def import_catalog():
+    """CSV or XLSX catalog, uploaded as the multipart field `file` or as the raw body
+    (Content-Type text/csv or the XLSX type); ?dry_run=true only validates"""
+    current_app.logger.info(f"Product import requested")
+    dry_run = request.args.get("dry_run", "false").lower() == "true"
+
+    # Also caps multipart parsing and bodies sent without a Content-Length
+    request.max_content_length = MAX_IMPORT_BYTES
+    if request.content_length and request.content_length > MAX_IMPORT_BYTES:
+        return jsonify({"error": f"The file must be at most {MAX_IMPORT_BYTES // (1024 * 1024)} MB"}), 413
+
+    upload = request.files.get("file")
+    if upload is not None:
+        stream, filename, content_type = upload.stream, upload.filename or "", upload.mimetype or ""
+    else:
+        stream, filename, content_type = request.stream, "", request.mimetype or ""
+    file_format = request.args.get("format") or ("xlsx" if filename.lower().endswith(".xlsx") or "spreadsheetml" in content_type else "csv")
+    if upload is None and not request.content_length:
+        return jsonify({"error": "Upload a CSV or XLSX file"}), 400
+
+    try:
+        report = import_products(stream, file_format, dry_run)
+        return jsonify({
+            "data": report,
+            "message": "Product import validated successfully." if dry_run else "Products imported successfully."
+        }), 200
+    except ProductImportError as ie:
+        current_app.logger.error(f"Validation error importing products: {str(ie)}")
+        return jsonify({"error": str(ie), "errors": ie.errors}), 400
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error importing products: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"The file must be at most {MAX_IMPORT_BYTES // (1024 * 1024)} MB"}), 413
+    except StaleDataError:
+        current_app.logger.warning("Product import conflicted with a concurrent product update")
+        return jsonify({"error": "Some products were changed by another request during the import; nothing was imported, try again."}), 409
+    except Exception as e:
+        current_app.logger.error(f"Error importing products: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to import products due to an internal server error."}), 500
+
+@blueprint.route("/bulk-update", methods=["PUT"])
+def bulk_update():
+    current_app.logger.info(f"Product bulk update requested")
+    data = request.get_json(silent=True)
+
+    if not data or "updates" not in data:
+        return jsonify({"error": "Request body must be JSON with an 'updates' list"}), 400
+
+    try:
+        updated = bulk_update_products(data["updates"])
+        return jsonify({
+            "data": {"updated": updated},
+            "message": f"{updated} products updated successfully."
+        }), 200
+    except ProductImportError as ie:
+        current_app.logger.error(f"Validation error in product bulk update: {str(ie)}")
+        return jsonify({"error": str(ie), "errors": ie.errors}), 400
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error in product bulk update: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except StaleDataError:
+        current_app.logger.warning("Product bulk update conflicted with a concurrent product update")
+        return jsonify({"error": "Some products were changed by another request; no product was changed, try again."}), 409
+    except Exception as e:
+        current_app.logger.error(f"Error in product bulk update: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to update products due to an internal server error."}), 500
+
 @blueprint.route("/read/<string:product_id>", methods=["GET"])
 def read(product_id):
     current_app.logger.info(f"Product read requested: {product_id}")
@@ -43,11 +146,49 @@ def read(product_id):
         return jsonify({
             "data": product.serialize(),
             "message": "Product retrieved successfully."
-        }), 200
+        }), 200, etag_headers(product.version)
     except Exception as e:
         current_app.logger.error(f"Error retrieving product {product_id}: {str(e)}")
         return jsonify({"error": "Failed to retrieve product due to an internal server error."}), 500
 
+@blueprint.route("/lookup/<string:code>", methods=["GET"])
+def lookup(code):
+    try:
+        product = get_product_by_code(code)
+        if product is None:
+            return jsonify({"error": "Product not found"}), 404
+
+        return jsonify({
+            "data": product.serialize(),
+            "message": "Product retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error looking up product by code {code}: {str(e)}")
+        return jsonify({"error": "Failed to retrieve product due to an internal server error."}), 500
+
+@blueprint.route("/search", methods=["GET"])
+def search():
+    query = request.args.get("q", "")
+    current_app.logger.info(f"Product search requested: {query}")
+
+    try:
+        try:
+            limit = int(request.args.get("limit", DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            return jsonify({"error": "Limit must be an integer"}), 400
+
+        return jsonify({
+            "data": search_products(query, limit),
+            "message": "Product search completed successfully."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error searching products: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error searching products: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to search products due to an internal server error."}), 500
+
 @blueprint.route("/read/all", methods=["GET"])
 def read_all():
     current_app.logger.info(f"All products requested")
@@ -101,7 +242,8 @@ def read_by_category(category_id):
     current_app.logger.info(f"Products by category requested: {category_id}")
 
     try:
-        products = get_products_by_category(category_id)
+        include_subcategories = request.args.get("include_subcategories", "false").lower() in ("1", "true", "yes")
+        products = get_products_by_category(category_id, include_subcategories)
         products_data = [product.serialize() for product in products]
 
         return jsonify({
@@ -121,17 +263,27 @@ def update(product_id):
         return jsonify({"error": "Request body must be JSON"}), 400
 
     try:
-        product = update_product(product_id, data)
-        if product is None:
+        current = get_product(product_id)
+        if current is None:
             return jsonify({"error": "Product not found"}), 404
+        if if_match_failed(current.version):
+            current_app.logger.warning(f"Stale If-Match updating product {product_id}")
+            return jsonify({
+                "error": "Product was changed since it was read; reload it and try again.",
+                "version": current.version
+            }), 412, etag_headers(current.version)
 
+        product = update_product(product_id, data)
         return jsonify({
             "data": product.serialize(),
             "message": "Product updated successfully."
-        }), 200
+        }), 200, etag_headers(product.version)
     except ValueError as ve:
         current_app.logger.error(f"Validation error updating product {product_id}: {str(ve)}")
         return jsonify({"error": str(ve)}), 400
+    except StaleDataError:
+        current_app.logger.warning(f"Concurrent update conflict on product {product_id}")
+        return jsonify({"error": "Product was changed by another request; reload it and try again."}), 409
     except Exception as e:
         current_app.logger.error(f"Error updating product {product_id}: {str(e)}")
         current_app.logger.error(traceback.format_exc())
@@ -152,4 +304,48 @@ def delete(product_id):
     except Exception as e:
         current_app.logger.error(f"Error deleting product {product_id}: {str(e)}")
         current_app.logger.error(traceback.format_exc())
-        return jsonify({"error": "Failed to delete product due to an internal server error."}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to delete product due to an internal server error."}), 500
+
+@blueprint.route("/<string:product_id>/timeline", methods=["GET"])
+def timeline(product_id):
+    current_app.logger.info(f"Product timeline requested: {product_id}")
+
+    try:
+        product = get_product(product_id)
+        if product is None:
+            return jsonify({"error": "Product not found"}), 404
+
+        try:
+            limit = int(request.args.get("limit", 50))
+        except ValueError:
+            return jsonify({"error": "Limit must be an integer"}), 400
+
+        timeline_data = get_product_timeline(product.id, limit, request.args.get("cursor"))
+        return jsonify({
+            "data": timeline_data,
+            "message": "Product timeline retrieved successfully."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error retrieving timeline for product {product_id}: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving timeline for product {product_id}: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to retrieve product timeline due to an internal server error."}), 500
+
+@blueprint.route("/<string:product_id>/stock", methods=["GET"])
+def stock_by_warehouse(product_id):
+    current_app.logger.info(f"Product stock by warehouse requested: {product_id}")
+
+    try:
+        product = get_product(product_id)
+        if product is None:
+            return jsonify({"error": "Product not found"}), 404
+
+        return jsonify({
+            "data": [balance.serialize() for balance in get_product_balances(product.id)],
+            "message": "Product stock by warehouse retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving stock by warehouse for product {product_id}: {str(e)}")
+        return jsonify({"error": "Failed to retrieve product stock due to an internal server error."}), 500
\ No newline at end of file
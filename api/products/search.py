@@ -0,0 +1,339 @@
+from utils.db.connection import db
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import select
+from products.model import Product, get_current_stocks, get_stock_status
+from categories.model import Category
+from warehouses.model import Warehouse
+from sync.model import ChangeLog, get_latest_sequence
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+MAX_QUERY_LENGTH = 100
+# Share of the query trigrams a name must contain to be returned at all
+MIN_SIMILARITY = 0.3
+# Category and warehouse names help find a product but rank below its own name
+GROUP_WEIGHT = 0.5
+# Products whose prefix/substring bonus is worked out per query, best similarity first
+MAX_CANDIDATES = 1000
+# Beyond this many change log rows a full rebuild is cheaper than patching
+MAX_INCREMENTAL_CHANGES = 5000
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, accents removed and punctuation turned into spaces, so "Café-Torrado"
+    and "cafe torrado" index the same"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char if char.isalnum() else " " for char in text if not unicodedata.combining(char))
+    return " ".join(text.lower().split())
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of every word, padded like pg_trgm ("  ca", " caf", ...) so a one or two
+    letter prefix still matches the start of a word"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class _Postings:
+    """Trigram -> slots, with a numpy copy of each list built on first use and dropped
+    when the list changes"""
+
+    def __init__(self):
+        self.sets: Dict[str, Set[int]] = {}
+        self.arrays: Dict[str, object] = {}
+
+    def add(self, grams: Iterable[str], slot: int) -> None:
+        for gram in grams:
+            self.sets.setdefault(gram, set()).add(slot)
+            self.arrays.pop(gram, None)
+
+    def discard(self, grams: Iterable[str], slot: int) -> None:
+        for gram in grams:
+            slots = self.sets.get(gram)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del self.sets[gram]
+            self.arrays.pop(gram, None)
+
+    def similarity(self, query_grams: Set[str], size: int):
+        """Share of query_grams found in each slot's text"""
+        import numpy as np
+
+        arrays = []
+        for gram in query_grams:
+            if gram not in self.sets:
+                continue
+            if gram not in self.arrays:
+                self.arrays[gram] = np.fromiter(self.sets[gram], dtype=np.int64, count=len(self.sets[gram]))
+            arrays.append(self.arrays[gram])
+        if not arrays:
+            return np.zeros(size)
+        return np.bincount(np.concatenate(arrays), minlength=size)[:size] / len(query_grams)
+
+class _Names:
+    """Category or warehouse names; each id gets a small integer code products refer to"""
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+        self.codes: Dict[str, int] = {}
+        self.grams: Dict[int, Set[str]] = {}
+        self.postings = _Postings()
+
+    def code(self, item_id: Optional[str]) -> int:
+        if item_id is None:
+            return -1
+        return self.codes.setdefault(item_id, len(self.codes))
+
+    def put(self, item_id: str, name: str) -> None:
+        self.remove(item_id)
+        code = self.code(item_id)
+        self.names[item_id] = name
+        self.grams[code] = trigrams(normalize_text(name))
+        self.postings.add(self.grams[code], code)
+
+    def remove(self, item_id: str) -> None:
+        self.names.pop(item_id, None)
+        code = self.codes.get(item_id)
+        if code is not None:
+            self.postings.discard(self.grams.pop(code, ()), code)
+
+    def similarity(self, query_grams: Set[str]):
+        """Similarity per code, with a trailing 0 that products without one (-1) read"""
+        import numpy as np
+
+        similarity = self.postings.similarity(query_grams, len(self.codes))
+        similarity = np.where(similarity >= MIN_SIMILARITY, similarity, 0)
+        return np.append(similarity, 0)
+
+class _SearchIndex:
+    """Active products with their category and warehouse names, and the change log
+    sequence they reflect.
+
+    Every product holds a slot (an array position); trigram postings list slots, so a
+    query is scored for the whole catalog with one bincount instead of a Python loop.
+    """
+
+    def __init__(self, seq: int):
+        import numpy as np
+
+        self.seq = seq
+        self.products: Dict[str, Dict] = {}
+        self.slots: Dict[str, int] = {}
+        self.slot_ids: List[Optional[str]] = []
+        self.free: List[int] = []
+        self.postings = _Postings()
+        self.codes: Dict[str, str] = {}
+        self.categories = _Names()
+        self.warehouses = _Names()
+        self.category_of = np.full(1024, -1, dtype=np.int64)
+        self.warehouse_of = np.full(1024, -1, dtype=np.int64)
+
+    def _take_slot(self, product_id: str) -> int:
+        import numpy as np
+
+        if self.free:
+            slot = self.free.pop()
+            self.slot_ids[slot] = product_id
+        else:
+            slot = len(self.slot_ids)
+            self.slot_ids.append(product_id)
+            if slot >= len(self.category_of):
+                grow = np.full(len(self.category_of), -1, dtype=np.int64)
+                self.category_of = np.concatenate([self.category_of, grow])
+                self.warehouse_of = np.concatenate([self.warehouse_of, grow])
+        self.slots[product_id] = slot
+        return slot
+
+    def put(self, product) -> None:
+        self.remove(product.id)
+        name = normalize_text(product.name)
+        slot = self._take_slot(product.id)
+        entry = {
+            "id": product.id,
+            "name": product.name,
+            "normalized": name,
+            "words": name.split(),
+            "grams": trigrams(name),
+            "sku": product.sku,
+            "barcode": product.barcode,
+            "category_id": product.category_id,
+            "warehouse_id": product.warehouse_id,
+            "min_quantity": float(product.min_quantity) if product.min_quantity else 0
+        }
+        self.products[product.id] = entry
+        self.postings.add(entry["grams"], slot)
+        for code in (product.sku, product.barcode):
+            if code:
+                self.codes[code.lower()] = product.id
+        self.category_of[slot] = self.categories.code(product.category_id)
+        self.warehouse_of[slot] = self.warehouses.code(product.warehouse_id)
+
+    def remove(self, product_id: str) -> None:
+        entry = self.products.pop(product_id, None)
+        if entry is None:
+            return
+        slot = self.slots.pop(product_id)
+        self.postings.discard(entry["grams"], slot)
+        for code in (entry["sku"], entry["barcode"]):
+            if code and self.codes.get(code.lower()) == product_id:
+                del self.codes[code.lower()]
+        self.category_of[slot] = -1
+        self.warehouse_of[slot] = -1
+        self.slot_ids[slot] = None
+        self.free.append(slot)
+
+    def load_products(self, product_ids: Optional[Iterable[str]] = None) -> None:
+        """(Re)load all active products or only product_ids; products that were
+        deactivated or deleted leave the index"""
+        query = select(
+            Product.id, Product.name, Product.sku, Product.barcode, Product.category_id,
+            Product.warehouse_id, Product.min_quantity
+        ).where(Product.active.is_(True))
+        if product_ids is not None:
+            product_ids = list(product_ids)
+            for product_id in product_ids:
+                self.remove(product_id)
+            if not product_ids:
+                return
+            query = query.where(Product.id.in_(product_ids))
+        for product in db.session.execute(query):
+            self.put(product)
+
+    def load_names(self, names: _Names, model, ids: Optional[Iterable[str]] = None) -> None:
+        query = select(model.id, model.name)
+        if ids is not None:
+            ids = list(ids)
+            for item_id in ids:
+                names.remove(item_id)
+            if not ids:
+                return
+            query = query.where(model.id.in_(ids))
+        for item_id, name in db.session.execute(query):
+            names.put(item_id, name)
+
+    def _bonus(self, entry: Dict, normalized: str, query_words: List[str]) -> float:
+        if entry["normalized"].startswith(normalized):
+            return 1.0
+        if all(any(word.startswith(part) for word in entry["words"]) for part in query_words):
+            return 0.5
+        if normalized in entry["normalized"]:
+            return 0.25
+        return 0.0
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        import numpy as np
+
+        normalized = normalize_text(query)
+        query_grams = trigrams(normalized)
+        if not query_grams:
+            return []
+
+        size = len(self.slot_ids)
+        similarity = self.postings.similarity(query_grams, size)
+        similarity = np.where(similarity >= MIN_SIMILARITY, similarity, 0)
+        group = np.maximum(
+            self.categories.similarity(query_grams)[self.category_of[:size]],
+            self.warehouses.similarity(query_grams)[self.warehouse_of[:size]]
+        ) * GROUP_WEIGHT
+        base = np.maximum(similarity, group)
+
+        candidates = np.flatnonzero(base)
+        if len(candidates) > MAX_CANDIDATES:
+            candidates = candidates[np.argpartition(-base[candidates], MAX_CANDIDATES - 1)[:MAX_CANDIDATES]]
+
+        scores: Dict[str, float] = {}
+        code_match = self.codes.get(query.strip().lower())
+        if code_match is not None:
+            scores[code_match] = 3.0
+
+        query_words = normalized.split()
+        for slot in candidates.tolist():
+            entry = self.products[self.slot_ids[slot]]
+            score = float(base[slot])
+            if similarity[slot]:
+                score = max(score, float(similarity[slot]) + self._bonus(entry, normalized, query_words))
+            scores[entry["id"]] = max(scores.get(entry["id"], 0), score)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], len(self.products[item[0]]["normalized"]), self.products[item[0]]["normalized"]))
+        return [{**self.products[product_id], "score": score} for product_id, score in ranked[:limit]]
+
+_index: Optional[_SearchIndex] = None
+_lock = threading.Lock()
+
+def _refresh() -> _SearchIndex:
+    """Index brought up to the latest change log sequence; the first call (and a long
+    backlog of changes) builds it from scratch"""
+    global _index
+    latest = get_latest_sequence()
+    index = _index
+
+    if index is not None and index.seq < latest:
+        changed = db.session.execute(
+            select(ChangeLog.entity, ChangeLog.entity_id)
+            .where(ChangeLog.seq > index.seq, ChangeLog.seq <= latest, ChangeLog.entity.in_(("products", "categories", "warehouses")))
+            .limit(MAX_INCREMENTAL_CHANGES + 1)
+        ).all()
+        if len(changed) > MAX_INCREMENTAL_CHANGES:
+            index = None
+        else:
+            ids = {"products": set(), "categories": set(), "warehouses": set()}
+            for entity, entity_id in changed:
+                ids[entity].add(entity_id)
+            index.load_names(index.categories, Category, ids["categories"])
+            index.load_names(index.warehouses, Warehouse, ids["warehouses"])
+            index.load_products(ids["products"])
+            index.seq = latest
+
+    if index is None:
+        index = _SearchIndex(latest)
+        index.load_names(index.categories, Category)
+        index.load_names(index.warehouses, Warehouse)
+        index.load_products()
+        _index = index
+    return index
+
+def search_products(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict]:
+    """Active products best matching `query`, for pickers and autocomplete.
+
+    Matches an exact SKU or barcode, a prefix or fuzzy (trigram) match of the product
+    name, and products whose category or warehouse name matches, in that order of
+    weight. The index lives in the worker's memory and follows the change log, so a
+    search costs the sequence check plus one stock query for the returned products.
+    """
+    if query is None or not query.strip():
+        raise ValueError("Query must not be empty")
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f"Query must be at most {MAX_QUERY_LENGTH} characters")
+    if limit < 1 or limit > MAX_SEARCH_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+
+    with _lock:
+        index = _refresh()
+        matches = index.search(query, limit)
+        categories = index.categories.names
+        warehouses = index.warehouses.names
+
+    stocks = get_current_stocks([match["id"] for match in matches])
+    results = []
+    for match in matches:
+        current_stock = stocks.get(match["id"], 0.0)
+        results.append({
+            "id": match["id"],
+            "name": match["name"],
+            "sku": match["sku"],
+            "barcode": match["barcode"],
+            "category_id": match["category_id"],
+            "category_name": categories.get(match["category_id"]),
+            "warehouse_id": match["warehouse_id"],
+            "warehouse_name": warehouses.get(match["warehouse_id"]),
+            "min_quantity": match["min_quantity"],
+            "current_stock": current_stock,
+            "stock_status": get_stock_status(current_stock, match["min_quantity"]),
+            "score": round(match["score"], 4)
+        })
+    return results
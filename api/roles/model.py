@@ -1,14 +1,14 @@
 from utils.db.connection import db
+from utils.db.types import UUIDType, new_id
 from datetime import datetime
 import pytz
-import uuid
 from typing import Dict, Optional, List
 from flask import current_app
 
 class Role(db.Model):
     __tablename__ = "roles"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDType, primary_key=True, default=new_id)
     name = db.Column(db.String(50), nullable=False, unique=True)
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')))
@@ -0,0 +1,172 @@
+from utils.db.connection import db
+from utils.db.types import UUIDType, new_id
+from datetime import datetime
+import pytz
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, select, update, insert
+from sqlalchemy.orm import Session
+from sqlalchemy import inspect as inspect_state
+
+# Tables whose rows handhelds and offline clients mirror, in the order a client should
+# apply a batch (parents before children)
+SYNCED_TABLES = ("categories", "warehouses", "products", "entries", "exits")
+
+class SyncSequence(db.Model):
+    """Single-row counter handing out change sequence numbers.
+
+    Writers increment it inside their own transaction as the last step before COMMIT
+    (see write_pending_changes), so the row lock makes sequence numbers become visible
+    in commit order and a client reading `since=N` can never skip a change that commits
+    later with a smaller number, while only the commits themselves queue on the lock.
+    """
+    __tablename__ = "sync_sequence"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+class ChangeLog(db.Model):
+    __tablename__ = "change_log"
+
+    seq = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    entity = db.Column(db.String(32), nullable=False)
+    entity_id = db.Column(UUIDType, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)
+    # Product whose stock the change can affect (products, entries and exits)
+    product_id = db.Column(UUIDType, nullable=True)
+    changed_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(pytz.timezone('America/Sao_Paulo')))
+
+    def __repr__(self):
+        return f"<ChangeLog {self.seq}, {self.operation} {self.entity} {self.entity_id}>"
+
+def _allocate_sequence(session: Session, count: int) -> int:
+    """Reserve `count` sequence numbers and return the first one"""
+    connection = session.connection()
+    table = SyncSequence.__table__
+    updated = connection.execute(update(table).where(table.c.id == 1).values(value=table.c.value + count)).rowcount
+    if not updated:
+        connection.execute(insert(table).values(id=1, value=count))
+    return connection.execute(select(table.c.value).where(table.c.id == 1)).scalar() - count + 1
+
+def record_changes(session: Session, changes: List[Tuple[str, str, str, Optional[str]]]) -> None:
+    """Queue (entity, entity_id, operation, product_id) rows for the change log; they are
+    numbered and written when the current transaction commits"""
+    if changes:
+        session.info.setdefault("pending_changes", []).extend(changes)
+
+@event.listens_for(Session, "before_commit")
+def write_pending_changes(session):
+    """Number the queued changes and insert them right before COMMIT"""
+    # Whatever is still unflushed queues its own changes first
+    session.flush()
+    changes = session.info.pop("pending_changes", None)
+    if not changes:
+        return
+    first = _allocate_sequence(session, len(changes))
+    # Lets after_commit listeners (the stock event broker) know this transaction changed data
+    session.info["sync_changes"] = True
+    # One executemany on the session's connection instead of an ORM object per change
+    now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+    session.connection().execute(insert(ChangeLog.__table__), [
+        {"seq": first + offset, "entity": entity, "entity_id": entity_id, "operation": operation, "product_id": product_id, "changed_at": now}
+        for offset, (entity, entity_id, operation, product_id) in enumerate(changes)
+    ])
+
+@event.listens_for(Session, "after_transaction_end")
+def discard_pending_changes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("pending_changes", None)
+
+def _product_ids(obj) -> List[Optional[str]]:
+    """Products whose stock a change to obj affects; a movement moved to another
+    product affects both"""
+    if obj.__tablename__ == "products":
+        return [obj.id]
+    if obj.__tablename__ in ("entries", "exits"):
+        history = inspect_state(obj).attrs.product_id.history
+        return [obj.product_id] + [product_id for product_id in history.deleted if product_id and product_id != obj.product_id]
+    return [None]
+
+@event.listens_for(Session, "before_flush")
+def stamp_changes(session, flush_context, instances):
+    """Stamp every insert, update (soft deletes included) and delete of a synced model"""
+    changes = []
+    for obj in session.new:
+        if getattr(obj, "__tablename__", None) in SYNCED_TABLES:
+            if obj.id is None:
+                obj.id = new_id()
+            changes.append((obj.__tablename__, obj.id, "upsert", _product_ids(obj)[0]))
+    for obj in session.dirty:
+        if getattr(obj, "__tablename__", None) in SYNCED_TABLES and session.is_modified(obj, include_collections=False):
+            changes.extend((obj.__tablename__, obj.id, "upsert", product_id) for product_id in _product_ids(obj))
+    for obj in session.deleted:
+        if getattr(obj, "__tablename__", None) in SYNCED_TABLES:
+            changes.append((obj.__tablename__, obj.id, "delete", _product_ids(obj)[0]))
+    record_changes(session, changes)
+
+def _synced_models() -> Dict[str, tuple]:
+    from categories.model import Category
+    from warehouses.model import Warehouse
+    from products.model import Product
+    from entries.model import Entry, EntryArchive
+    from exits.model import Exit, ExitArchive
+    return {
+        "categories": (Category,),
+        "warehouses": (Warehouse,),
+        "products": (Product,),
+        "entries": (Entry, EntryArchive),
+        "exits": (Exit, ExitArchive),
+    }
+
+def get_latest_sequence() -> int:
+    return db.session.execute(select(SyncSequence.value).where(SyncSequence.id == 1)).scalar() or 0
+
+def get_changes_since(since: int, limit: int = 500) -> Dict:
+    """Changes with a sequence number greater than `since`, oldest first.
+
+    Only the newest change of each row in the batch is returned, with the row's current
+    data for upserts; rows that no longer exist are reported as deletes. Deleting a
+    product removes its movements without one change per movement: clients drop the
+    product's entries and exits when they apply its delete. Resume with `next_since`
+    while `has_more` is true.
+    """
+    if since < 0:
+        raise ValueError("since must be greater than or equal to 0")
+    if limit < 1 or limit > 5000:
+        raise ValueError("limit must be between 1 and 5000")
+
+    rows = ChangeLog.query.filter(ChangeLog.seq > since).order_by(ChangeLog.seq).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest: Dict[Tuple[str, str], ChangeLog] = {}
+    for row in rows:
+        latest.pop((row.entity, row.entity_id), None)
+        latest[(row.entity, row.entity_id)] = row
+
+    models = _synced_models()
+    current: Dict[Tuple[str, str], dict] = {}
+    for entity in SYNCED_TABLES:
+        ids = [entity_id for (name, entity_id), row in latest.items() if name == entity and row.operation == "upsert"]
+        for model in models[entity]:
+            if not ids:
+                break
+            for obj in model.query.filter(model.id.in_(ids)).all():
+                current[(entity, obj.id)] = obj.serialize()
+            ids = [entity_id for entity_id in ids if (entity, entity_id) not in current]
+
+    changes = []
+    for key, row in latest.items():
+        data = current.get(key)
+        changes.append({
+            "seq": row.seq,
+            "entity": row.entity,
+            "id": row.entity_id,
+            "operation": "upsert" if data is not None else "delete",
+            "data": data
+        })
+
+    return {
+        "changes": changes,
+        "next_since": rows[-1].seq if rows else since,
+        "has_more": has_more
+    }
@@ -0,0 +1,40 @@
+from flask import request, jsonify, Blueprint, current_app
+from sync.model import get_changes_since, get_latest_sequence
+import traceback
+
+blueprint = Blueprint('sync', __name__)
+
+@blueprint.route("/changes", methods=["GET"])
+def changes():
+    current_app.logger.info(f"Sync changes requested since {request.args.get('since')}")
+
+    try:
+        since = int(request.args.get("since", 0))
+        limit = int(request.args.get("limit", 500))
+    except ValueError:
+        return jsonify({"error": "since and limit must be integers"}), 400
+
+    try:
+        changes_data = get_changes_since(since, limit)
+        return jsonify({
+            "data": changes_data,
+            "message": "Changes retrieved successfully."
+        }), 200
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error retrieving changes: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving changes: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to retrieve changes due to an internal server error."}), 500
+
+@blueprint.route("/sequence", methods=["GET"])
+def sequence():
+    try:
+        return jsonify({
+            "data": {"seq": get_latest_sequence()},
+            "message": "Sequence retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving sync sequence: {str(e)}")
+        return jsonify({"error": "Failed to retrieve sync sequence due to an internal server error."}), 500
@@ -0,0 +1,207 @@
+from utils.db.connection import db
+from utils.db.types import UUIDType, new_id
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
+import pytz
+from typing import Dict, Optional, List, Tuple
+from flask import current_app
+from sqlalchemy import ForeignKey, CheckConstraint, Index, select, tuple_, or_
+from sqlalchemy.orm import relationship
+from products.model import Product
+from warehouses.model import Warehouse
+from entries.model import Entry
+from exits.model import Exit
+from balances.model import StockBalance
+from archive.model import get_archive_cutoff
+from outbox.model import add_outbox_event, add_movement_event
+
+MAX_TRANSFER_LINES = 1000
+
+class Transfer(db.Model):
+    """Goods moved between two warehouses: an exit from the source and an entry into
+    the destination, written in the same transaction.
+
+    exit_id/entry_id are plain columns rather than foreign keys because the movements
+    may later be moved to the archive tables.
+    """
+    __tablename__ = "transfers"
+
+    id = db.Column(UUIDType, primary_key=True, default=new_id)
+    product_id = db.Column(UUIDType, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    from_warehouse_id = db.Column(UUIDType, ForeignKey('warehouses.id'), nullable=False)
+    to_warehouse_id = db.Column(UUIDType, ForeignKey('warehouses.id'), nullable=False)
+    quantity = db.Column(db.Numeric(10, 2), nullable=False)
+    transfer_date = db.Column(db.Date, nullable=False)
+    observation = db.Column(db.Text, nullable=True)
+    exit_id = db.Column(UUIDType, nullable=False)
+    entry_id = db.Column(UUIDType, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(pytz.timezone('America/Sao_Paulo')))
+
+    product_rel = relationship('Product', viewonly=True)
+
+    __table_args__ = (
+        CheckConstraint('quantity > 0', name='ck_transfer_quantity_positive'),
+        Index('ix_transfers_product_id_transfer_date', 'product_id', 'transfer_date'),
+        Index('ix_transfers_from_warehouse_id', 'from_warehouse_id'),
+        Index('ix_transfers_to_warehouse_id', 'to_warehouse_id'),
+        Index('ix_transfers_exit_id', 'exit_id'),
+    )
+
+    def __repr__(self):
+        return f"<Transfer {self.id}, Product: {self.product_id}, {self.from_warehouse_id} -> {self.to_warehouse_id}>"
+
+    def serialize(self):
+        return {
+            "id": self.id,
+            "product_id": self.product_id,
+            "from_warehouse_id": self.from_warehouse_id,
+            "to_warehouse_id": self.to_warehouse_id,
+            "quantity": float(self.quantity) if self.quantity else 0,
+            "transfer_date": self.transfer_date.isoformat() if self.transfer_date else None,
+            "observation": self.observation,
+            "exit_id": self.exit_id,
+            "entry_id": self.entry_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "product_name": self.product_rel.name if self.product_rel else None
+        }
+
+def _parse_line(line: Dict, products: Dict[str, Product], warehouses: Dict[str, Warehouse], cutoff: Optional[date]) -> Tuple[Optional[str], Dict]:
+    """Validate one transfer line against preloaded products/warehouses; returns
+    (error, normalized line)"""
+    for field in ("product_id", "from_warehouse_id", "to_warehouse_id", "quantity"):
+        if not line.get(field):
+            return f"{field} is required", {}
+    for field in ("product_id", "from_warehouse_id", "to_warehouse_id"):
+        if not isinstance(line[field], str):
+            return f"{field} must be a string", {}
+
+    if line["product_id"] not in products:
+        return f"Invalid product ID: {line['product_id']}", {}
+    for field in ("from_warehouse_id", "to_warehouse_id"):
+        if line[field] not in warehouses:
+            return f"Invalid warehouse ID: {line[field]}", {}
+    if line["from_warehouse_id"] == line["to_warehouse_id"]:
+        return "Source and destination warehouses must be different", {}
+
+    try:
+        quantity = Decimal(str(line["quantity"]))
+        if quantity <= 0:
+            return "Quantity must be greater than 0", {}
+    except (InvalidOperation, ValueError, TypeError):
+        return "Quantity must be a valid number", {}
+
+    transfer_date = line.get("transfer_date") or datetime.now(pytz.timezone('America/Sao_Paulo')).date()
+    if isinstance(transfer_date, str):
+        try:
+            transfer_date = datetime.strptime(transfer_date, '%Y-%m-%d').date()
+        except ValueError:
+            return "Transfer date must be a valid date (YYYY-MM-DD format)", {}
+    if cutoff is not None and transfer_date <= cutoff:
+        return f"Transfer date {transfer_date.isoformat()} falls in an archived (closed) period", {}
+
+    return None, {**line, "quantity": quantity, "transfer_date": transfer_date}
+
+def _lock_balances(keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Decimal]:
+    """Read and lock the balances a batch touches, in key order so concurrent transfers
+    over the same rows queue instead of deadlocking"""
+    rows = db.session.execute(
+        select(StockBalance.product_id, StockBalance.warehouse_id, StockBalance.quantity)
+        .where(tuple_(StockBalance.product_id, StockBalance.warehouse_id).in_(keys))
+        .order_by(StockBalance.product_id, StockBalance.warehouse_id)
+        .with_for_update()
+    )
+    return {(product_id, warehouse_id): Decimal(quantity) for product_id, warehouse_id, quantity in rows}
+
+def create_transfers(lines: List[Dict]) -> List[Transfer]:
+    """Create every transfer line or none.
+
+    Lines are applied in order against the locked balances, so a line may move stock a
+    previous line of the same batch brought in. Each line writes an exit, an entry and
+    the transfer row; everything (balances and outbox events included) commits once.
+    """
+    current_app.logger.info(f"Starting creation of {len(lines)} transfers")
+    if not lines:
+        raise ValueError("At least one transfer is required")
+    if len(lines) > MAX_TRANSFER_LINES:
+        raise ValueError(f"At most {MAX_TRANSFER_LINES} transfers per request")
+
+    for index, line in enumerate(lines):
+        if not isinstance(line, dict):
+            raise ValueError("Transfer must be an object" if len(lines) == 1 else f"Transfer {index + 1} must be an object")
+
+    product_ids = {line.get("product_id") for line in lines if isinstance(line.get("product_id"), str)}
+    warehouse_ids = {line.get(field) for line in lines for field in ("from_warehouse_id", "to_warehouse_id") if isinstance(line.get(field), str)}
+    products = {product.id: product for product in Product.query.filter(Product.id.in_(product_ids), Product.active.is_(True))} if product_ids else {}
+    warehouses = {warehouse.id: warehouse for warehouse in Warehouse.query.filter(Warehouse.id.in_(warehouse_ids), Warehouse.active.is_(True))} if warehouse_ids else {}
+    cutoff = get_archive_cutoff()
+
+    parsed = []
+    for index, line in enumerate(lines):
+        error, normalized = _parse_line(line, products, warehouses, cutoff)
+        if error:
+            raise ValueError(error if len(lines) == 1 else f"Transfer {index + 1}: {error}")
+        parsed.append(normalized)
+
+    try:
+        keys = sorted({(line["product_id"], line[field]) for line in parsed for field in ("from_warehouse_id", "to_warehouse_id")})
+        available = _lock_balances(keys)
+
+        transfers = []
+        for index, line in enumerate(parsed):
+            source = (line["product_id"], line["from_warehouse_id"])
+            destination = (line["product_id"], line["to_warehouse_id"])
+            if available.get(source, Decimal(0)) < line["quantity"]:
+                error = f"Insufficient stock. Current: {float(available.get(source, 0))}, Requested: {float(line['quantity'])}"
+                raise ValueError(error if len(parsed) == 1 else f"Transfer {index + 1}: {error}")
+            available[source] = available.get(source, Decimal(0)) - line["quantity"]
+            available[destination] = available.get(destination, Decimal(0)) + line["quantity"]
+
+            transfer_id = new_id()
+            observation = line.get("observation") or f"Transferência {transfer_id}"
+            exit_record = Exit(id=new_id(), product_id=line["product_id"], warehouse_id=line["from_warehouse_id"],
+                               exit_date=line["transfer_date"], quantity=line["quantity"], observation=observation)
+            entry = Entry(id=new_id(), product_id=line["product_id"], warehouse_id=line["to_warehouse_id"],
+                          entry_date=line["transfer_date"], quantity=line["quantity"], observation=observation)
+            transfer = Transfer(id=transfer_id, product_id=line["product_id"], from_warehouse_id=line["from_warehouse_id"],
+                                to_warehouse_id=line["to_warehouse_id"], quantity=line["quantity"],
+                                transfer_date=line["transfer_date"], observation=line.get("observation"),
+                                exit_id=exit_record.id, entry_id=entry.id)
+            db.session.add_all([exit_record, entry, transfer])
+            add_movement_event("exit.created", exit_record)
+            add_movement_event("entry.created", entry)
+            add_outbox_event("transfer.created", transfer.id, {
+                "id": transfer.id,
+                "product_id": transfer.product_id,
+                "from_warehouse_id": transfer.from_warehouse_id,
+                "to_warehouse_id": transfer.to_warehouse_id,
+                "quantity": float(transfer.quantity),
+                "transfer_date": transfer.transfer_date.isoformat(),
+                "exit_id": transfer.exit_id,
+                "entry_id": transfer.entry_id
+            })
+            transfers.append(transfer)
+
+        db.session.commit()
+        current_app.logger.info(f"Created {len(transfers)} transfers")
+        return transfers
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error creating transfers: {str(e)}")
+        raise
+
+def create_transfer(transfer_data: Dict) -> Transfer:
+    return create_transfers([transfer_data])[0]
+
+def get_transfer(transfer_id: str) -> Optional[Transfer]:
+    return db.session.get(Transfer, transfer_id)
+
+def get_all_transfers() -> List[Transfer]:
+    return Transfer.query.order_by(Transfer.transfer_date.desc(), Transfer.created_at.desc()).all()
+
+def get_transfers_by_product(product_id: str) -> List[Transfer]:
+    return Transfer.query.filter(Transfer.product_id == product_id).order_by(Transfer.transfer_date.desc(), Transfer.created_at.desc()).all()
+
+def get_transfers_by_warehouse(warehouse_id: str) -> List[Transfer]:
+    return Transfer.query.filter(
+        or_(Transfer.from_warehouse_id == warehouse_id, Transfer.to_warehouse_id == warehouse_id)
+    ).order_by(Transfer.transfer_date.desc(), Transfer.created_at.desc()).all()
@@ -0,0 +1,113 @@
+from flask import request, jsonify, Blueprint, current_app
+from transfers.model import Transfer, create_transfer, create_transfers, get_transfer, get_all_transfers, get_transfers_by_product, get_transfers_by_warehouse
+import traceback
+
+blueprint = Blueprint('transfers', __name__)
+
+@blueprint.route("/create", methods=["POST"])
+def create():
+    current_app.logger.info(f"Transfer creation requested")
+    data = request.get_json()
+
+    if not data:
+        return jsonify({"error": "Request body must be JSON"}), 400
+
+    required_fields = ["product_id", "from_warehouse_id", "to_warehouse_id", "quantity"]
+    if not all(field in data for field in required_fields):
+        missing = [field for field in required_fields if field not in data]
+        return jsonify({"error": f"Missing required fields: {', '.join(missing)}"}), 400
+
+    try:
+        transfer = create_transfer(data)
+        return jsonify({
+            "data": transfer.serialize(),
+            "message": "Transfer created successfully."
+        }), 201
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error creating transfer: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error creating transfer: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to create transfer due to an internal server error."}), 500
+
+@blueprint.route("/batch", methods=["POST"])
+def create_batch():
+    current_app.logger.info(f"Transfer batch requested")
+    data = request.get_json()
+
+    if not data or not isinstance(data.get("transfers"), list):
+        return jsonify({"error": "Request body must be JSON with a 'transfers' list"}), 400
+
+    try:
+        transfers = create_transfers(data["transfers"])
+        return jsonify({
+            "data": [transfer.serialize() for transfer in transfers],
+            "message": f"{len(transfers)} transfers created successfully."
+        }), 201
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error creating transfer batch: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error creating transfer batch: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to create transfers due to an internal server error."}), 500
+
+@blueprint.route("/read/<string:transfer_id>", methods=["GET"])
+def read(transfer_id):
+    current_app.logger.info(f"Transfer read requested: {transfer_id}")
+
+    try:
+        transfer = get_transfer(transfer_id)
+        if transfer is None:
+            return jsonify({"error": "Transfer not found"}), 404
+
+        return jsonify({
+            "data": transfer.serialize(),
+            "message": "Transfer retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving transfer {transfer_id}: {str(e)}")
+        return jsonify({"error": "Failed to retrieve transfer due to an internal server error."}), 500
+
+@blueprint.route("/read/all", methods=["GET"])
+def read_all():
+    current_app.logger.info(f"All transfers requested")
+
+    try:
+        transfers = get_all_transfers()
+        return jsonify({
+            "data": [transfer.serialize() for transfer in transfers],
+            "message": "Transfers retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving all transfers: {str(e)}")
+        return jsonify({"error": "Failed to retrieve transfers due to an internal server error."}), 500
+
+@blueprint.route("/read/product/<string:product_id>", methods=["GET"])
+def read_by_product(product_id):
+    current_app.logger.info(f"Transfers by product requested: {product_id}")
+
+    try:
+        transfers = get_transfers_by_product(product_id)
+        return jsonify({
+            "data": [transfer.serialize() for transfer in transfers],
+            "message": "Transfers by product retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving transfers by product {product_id}: {str(e)}")
+        return jsonify({"error": "Failed to retrieve transfers by product due to an internal server error."}), 500
+
+@blueprint.route("/read/warehouse/<string:warehouse_id>", methods=["GET"])
+def read_by_warehouse(warehouse_id):
+    current_app.logger.info(f"Transfers by warehouse requested: {warehouse_id}")
+
+    try:
+        transfers = get_transfers_by_warehouse(warehouse_id)
+        return jsonify({
+            "data": [transfer.serialize() for transfer in transfers],
+            "message": "Transfers by warehouse retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving transfers by warehouse {warehouse_id}: {str(e)}")
+        return jsonify({"error": "Failed to retrieve transfers by warehouse due to an internal server error."}), 500
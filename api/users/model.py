@@ -1,23 +1,40 @@
 from utils.db.connection import db
+from utils.db.types import UUIDType, new_id
 from datetime import datetime
 import pytz
-import uuid
-import bcrypt
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from flask import current_app
-from sqlalchemy import ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import ForeignKey, select
+from sqlalchemy.orm import relationship, joinedload
+from utils.security import PasswordHasherBusy, get_password_hasher, revoke_user_tokens
+import re
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+MAX_BULK_USERS = 200
+MAX_REPORTED_ERRORS = 500
+
+class UserImportError(ValueError):
+    """Raised when rows of a bulk user creation fail validation; nothing is written.
+
+    `errors` holds one {"row", "error"} item per rejected row.
+    """
+
+    def __init__(self, message: str, errors: List[Dict]):
+        super().__init__(message)
+        self.errors = errors
 
 class User(db.Model):
     __tablename__ = "users"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDType, primary_key=True, default=new_id)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False, unique=True)
     password_hash = db.Column(db.String(255), nullable=False)
-    gender_id = db.Column(db.String(36), ForeignKey('genders.id'), nullable=True)
-    role_id = db.Column(db.String(36), ForeignKey('roles.id'), nullable=False)
+    gender_id = db.Column(UUIDType, ForeignKey('genders.id'), nullable=True)
+    role_id = db.Column(UUIDType, ForeignKey('roles.id'), nullable=False)
     active = db.Column(db.Boolean, nullable=False, default=True)
+    # Epoch seconds; access tokens issued at or before it are rejected (logout, password or role change)
+    tokens_valid_after = db.Column(db.Double, nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')))
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')), onupdate=datetime.now(pytz.timezone('America/Sao_Paulo')))
 
@@ -56,15 +73,13 @@ class User(db.Model):
         }
 
     def check_password(self, password: str) -> bool:
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
-        except:
-            return False
+        return get_password_hasher().verify(password, self.password_hash)
 
 def hash_password(password: str) -> str:
     try:
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        return get_password_hasher().hash(password)
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         current_app.logger.error(f"Error hashing password: {str(e)}")
         raise ValueError("Error processing password")
@@ -76,9 +91,7 @@ def validate_user_data(user_data: Dict, require_password: bool = True) -> Option
     if 'email' not in user_data or not user_data['email']:
         return "Email is required"
 
-    import re
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, user_data['email']):
+    if not re.match(EMAIL_PATTERN, user_data['email']):
         return "Invalid email format"
 
     if 'role_id' not in user_data or not user_data['role_id']:
@@ -138,6 +151,106 @@ def create_user(user_data: Dict) -> Optional[User]:
         current_app.logger.error(f"Error creating user: {str(e)}")
         raise
 
+def _lookup(model) -> Tuple[set, Dict[str, str]]:
+    """Ids and lowercase name -> id of a small reference table (roles, genders)"""
+    rows = db.session.execute(select(model.id, model.name)).all()
+    return {item_id for item_id, _ in rows}, {name.strip().lower(): item_id for item_id, name in rows}
+
+def _reference(user_data: Dict, field: str, ids: set, names: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    """(id, error) of the role/gender a row gives by `<field>_id` or by name in `<field>`"""
+    item_id = user_data.get(f"{field}_id")
+    if item_id:
+        return (item_id, None) if item_id in ids else (None, f"Invalid {field} ID: {item_id}")
+    name = user_data.get(field)
+    if name:
+        if str(name).strip().lower() not in names:
+            return None, f"Unknown {field}: {name}"
+        return names[str(name).strip().lower()], None
+    return None, None
+
+def create_users(users_data: List[Dict]) -> Tuple[List[User], float]:
+    """Create many users in one transaction, all or none.
+
+    Roles and genders (by id or name) are read once for the whole batch, registered
+    emails are checked with a single IN query, passwords are hashed in parallel on the
+    password hashing pool and every user is inserted in the same commit. Rejected rows
+    are reported together in UserImportError.
+
+    Also returns the seconds the batch waited for the hashing pool because logins or
+    other batches were using it.
+    """
+    current_app.logger.info(f"Starting bulk creation of {len(users_data) if isinstance(users_data, list) else 0} users")
+    if not isinstance(users_data, list) or not users_data:
+        raise ValueError("users must be a non-empty list")
+    if len(users_data) > MAX_BULK_USERS:
+        raise ValueError(f"At most {MAX_BULK_USERS} users per request")
+
+    from roles.model import Role
+    from gender.model import Gender
+    roles = _lookup(Role)
+    genders = _lookup(Gender)
+    emails = [item["email"].strip() for item in users_data if isinstance(item, dict) and isinstance(item.get("email"), str)]
+    registered = {email.lower() for email in db.session.execute(select(User.email).where(User.email.in_(emails))).scalars()} if emails else set()
+
+    errors: List[Dict] = []
+    rows: List[Dict] = []
+    seen: Dict[str, int] = {}
+    for index, item in enumerate(users_data, start=1):
+        if not isinstance(item, dict):
+            errors.append({"row": index, "error": "Each user must be an object"})
+            continue
+
+        email = item.get("email").strip() if isinstance(item.get("email"), str) else None
+        error = None
+        if not item.get("name"):
+            error = "Name is required"
+        elif not email:
+            error = "Email is required"
+        elif not re.match(EMAIL_PATTERN, email):
+            error = "Invalid email format"
+        elif email.lower() in registered:
+            error = "Email already registered"
+        elif email.lower() in seen:
+            error = f"Email is repeated (first used on row {seen[email.lower()]})"
+        elif not isinstance(item.get("password"), str) or not item["password"]:
+            error = "Password is required"
+        elif len(item["password"]) < 6:
+            error = "Password must be at least 6 characters long"
+        if error is None:
+            role_id, error = _reference(item, "role", *roles)
+            if error is None and role_id is None:
+                error = "Role is required"
+        if error is None:
+            gender_id, error = _reference(item, "gender", *genders)
+        if error:
+            errors.append({"row": index, "error": error})
+            continue
+
+        seen[email.lower()] = index
+        rows.append({"name": item["name"], "email": email, "password": item["password"], "role_id": role_id,
+                     "gender_id": gender_id, "active": item.get("active", True)})
+
+    if errors:
+        raise UserImportError(f"{len(errors)} users with errors; no user was created", errors[:MAX_REPORTED_ERRORS])
+
+    try:
+        password_hashes, hash_wait = get_password_hasher().hash_many([row.pop("password") for row in rows])
+        now = datetime.now(pytz.timezone('America/Sao_Paulo'))
+        users = [User(id=new_id(), password_hash=password_hash, created_at=now, updated_at=now, **row)
+                 for row, password_hash in zip(rows, password_hashes)]
+        db.session.add_all(users)
+        db.session.commit()
+
+        # Reloaded with their role and gender in one query for the response
+        ids = [user.id for user in users]
+        loaded = {user.id: user for user in User.query.options(joinedload(User.role_rel), joinedload(User.gender_rel)).filter(User.id.in_(ids))}
+        current_app.logger.info(f"Created {len(ids)} users")
+        return [loaded[user_id] for user_id in ids], hash_wait
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error creating users: {str(e)}")
+        raise
+
 def get_user(user_id: str) -> Optional[User]:
     return User.query.get(user_id)
 
@@ -156,6 +269,9 @@ def update_user(user_id: str, user_data: Dict) -> Optional[User]:
         return None
 
     current_email = user.email
+    current_role_id = user.role_id
+    current_active = user.active
+    password_changed = False
 
     try:
         if "name" in user_data:
@@ -181,9 +297,15 @@ def update_user(user_id: str, user_data: Dict) -> Optional[User]:
                 raise ValueError("Password must be at least 6 characters long")
 
             user.password_hash = hash_password(user_data["password"])
+            password_changed = True
         if "active" in user_data:
             user.active = user_data["active"]
 
+        if password_changed or user.active != current_active:
+            revoke_user_tokens(user)
+        elif user.role_id != current_role_id:
+            revoke_user_tokens(user, sessions=False)
+
         user.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
         db.session.commit()
         current_app.logger.info(f"User updated: {user.name}")
@@ -198,6 +320,7 @@ def delete_user(user_id: str) -> Optional[User]:
     if user:
         user.active = False
         user.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
+        revoke_user_tokens(user)
         db.session.commit()
         current_app.logger.info(f"User deleted: {user.name}")
         return user
@@ -206,6 +329,7 @@ def delete_user(user_id: str) -> Optional[User]:
 def hard_delete_user(user_id: str) -> Optional[User]:
     user = get_user(user_id)
     if user:
+        revoke_user_tokens(user)
         db.session.delete(user)
         db.session.commit()
         current_app.logger.info(f"User hard deleted: {user.name}")
@@ -216,8 +340,21 @@ def authenticate_user(email: str, password: str) -> Optional[User]:
     user = find_user_by_email(email)
     if user and user.active and user.check_password(password):
         current_app.logger.info(f"User authenticated successfully: {user.email}")
+        rehash_password_if_needed(user, password)
         return user
     else:
         current_app.logger.warning(f"Authentication failed for email: {email}")
         return None
 
+def rehash_password_if_needed(user: User, password: str) -> None:
+    """Upgrade the stored hash to the configured bcrypt cost after a successful login"""
+    if not get_password_hasher().needs_rehash(user.password_hash):
+        return
+
+    try:
+        user.password_hash = hash_password(password)
+        db.session.commit()
+        current_app.logger.info(f"Password hash upgraded for user: {user.email}")
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f"Could not upgrade password hash for user {user.email}: {str(e)}")
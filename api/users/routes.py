@@ -1,6 +1,8 @@
-from flask import request, jsonify, Blueprint, current_app
-from users.model import User, create_user, get_user, update_user, delete_user, get_all_users, find_user_by_email, authenticate_user
+from flask import request, jsonify, Blueprint, current_app, g
+from users.model import User, UserImportError, create_user, create_users, get_user, update_user, delete_user, get_all_users, find_user_by_email, authenticate_user
+from utils.security import PasswordHasherBusy, get_login_throttle, get_ip_login_throttle, client_ip, issue_tokens, decode_token, revoke_user_tokens, token_required, InvalidToken, REFRESH_TOKEN
 import traceback
+import math
 
 blueprint = Blueprint('users', __name__)
 
@@ -26,11 +28,47 @@ def create():
     except ValueError as ve:
         current_app.logger.error(f"Validation error creating user: {str(ve)}")
         return jsonify({"error": str(ve)}), 400
+    except PasswordHasherBusy:
+        current_app.logger.warning("Password hashing queue full, rejecting user creation")
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503, {"Retry-After": "1"}
     except Exception as e:
         current_app.logger.error(f"Error creating user: {str(e)}")
         current_app.logger.error(traceback.format_exc())
         return jsonify({"error": "Failed to create user due to an internal server error."}), 500
 
+@blueprint.route("/bulk-create", methods=["POST"])
+@token_required("Administrator")
+def bulk_create():
+    current_app.logger.info(f"Bulk user creation requested")
+    data = request.get_json(silent=True)
+
+    if not data or "users" not in data:
+        return jsonify({"error": "Request body must be JSON with a 'users' list"}), 400
+
+    try:
+        users, hash_wait = create_users(data["users"])
+        if hash_wait:
+            current_app.logger.warning(f"Bulk user creation waited {hash_wait:.2f}s for the password hashing pool")
+        return jsonify({
+            "data": [user.serialize_safe() for user in users],
+            "throttled": hash_wait > 0,
+            "hash_wait_seconds": round(hash_wait, 3),
+            "message": f"{len(users)} users created successfully."
+        }), 201
+    except UserImportError as ie:
+        current_app.logger.error(f"Validation error in bulk user creation: {str(ie)}")
+        return jsonify({"error": str(ie), "errors": ie.errors}), 400
+    except ValueError as ve:
+        current_app.logger.error(f"Validation error in bulk user creation: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except PasswordHasherBusy:
+        current_app.logger.warning("Password hashing pool busy, rejecting bulk user creation")
+        return jsonify({"error": "Server is busy, please try again shortly; no user was created."}), 503, {"Retry-After": "5"}
+    except Exception as e:
+        current_app.logger.error(f"Error in bulk user creation: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to create users due to an internal server error."}), 500
+
 @blueprint.route("/read/<string:user_id>", methods=["GET"])
 def read(user_id):
     current_app.logger.info(f"User read requested: {user_id}")
@@ -84,6 +122,9 @@ def update(user_id):
     except ValueError as ve:
         current_app.logger.error(f"Validation error updating user {user_id}: {str(ve)}")
         return jsonify({"error": str(ve)}), 400
+    except PasswordHasherBusy:
+        current_app.logger.warning("Password hashing queue full, rejecting user update")
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503, {"Retry-After": "1"}
     except Exception as e:
         current_app.logger.error(f"Error updating user {user_id}: {str(e)}")
         current_app.logger.error(traceback.format_exc())
@@ -119,28 +160,70 @@ def login():
         missing = [field for field in required_fields if field not in data]
         return jsonify({"error": f"Missing required fields: {', '.join(missing)}"}), 400
 
+    throttle = get_login_throttle()
+    ip_throttle = get_ip_login_throttle()
+    ip = client_ip()
+    throttle_key = (ip, str(data["email"]).strip().lower())
+    retry_after = max(filter(None, (throttle.check(throttle_key), ip_throttle.check(ip))), default=None)
+    if retry_after is not None:
+        current_app.logger.warning(f"Login throttled for {throttle_key[1]} from {ip}")
+        return jsonify({"error": "Too many login attempts, please try again later."}), 429, {"Retry-After": str(math.ceil(retry_after))}
+
     try:
         user = authenticate_user(data["email"], data["password"])
         if user:
+            throttle.reset(throttle_key)
             return jsonify({
-                "data": user.serialize_safe(),
+                "data": {**user.serialize_safe(), **issue_tokens(user)},
                 "message": "User authenticated successfully."
             }), 200
         else:
+            throttle.fail(throttle_key)
+            ip_throttle.fail(ip)
             return jsonify({
                 "error": "Invalid email or password"
             }), 401
+    except PasswordHasherBusy:
+        current_app.logger.warning("Password hashing queue full, rejecting login")
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503, {"Retry-After": "1"}
     except Exception as e:
         current_app.logger.error(f"Error during login: {str(e)}")
         current_app.logger.error(traceback.format_exc())
         return jsonify({"error": "Authentication failed due to an internal server error."}), 500
 
+@blueprint.route("/refresh", methods=["POST"])
+def refresh():
+    current_app.logger.info("Token refresh requested")
+    data = request.get_json()
+
+    if not data or not data.get("refresh_token"):
+        return jsonify({"error": "refresh_token is required"}), 400
+
+    try:
+        claims = decode_token(data["refresh_token"], REFRESH_TOKEN)
+    except InvalidToken as e:
+        return jsonify({"error": str(e)}), 401
+
+    try:
+        user = get_user(claims["sub"])
+        if user is None or not user.active:
+            return jsonify({"error": "User not found"}), 401
+
+        return jsonify({
+            "data": issue_tokens(user),
+            "message": "Token refreshed successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error refreshing token: {str(e)}")
+        return jsonify({"error": "Failed to refresh token due to an internal server error."}), 500
+
 @blueprint.route("/me", methods=["GET"])
+@token_required()
 def get_current_user():
     current_app.logger.info("Current user profile requested")
 
     try:
-        user = get_user()
+        user = get_user(g.current_user_id)
         if user is None:
             return jsonify({"error": "User not found"}), 404
 
@@ -153,6 +236,7 @@ def get_current_user():
         return jsonify({"error": "Failed to retrieve user profile due to an internal server error."}), 500
 
 @blueprint.route("/change-password", methods=["POST"])
+@token_required()
 def change_password():
     current_app.logger.info(f"Password change requested")
     data = request.get_json()
@@ -166,7 +250,7 @@ def change_password():
         return jsonify({"error": f"Missing required fields: {', '.join(missing)}"}), 400
 
     try:
-        user = get_user()
+        user = get_user(g.current_user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
 
@@ -178,6 +262,7 @@ def change_password():
         from datetime import datetime
         import pytz
         user.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
+        revoke_user_tokens(user)
 
         from utils.db.connection import db
         db.session.commit()
@@ -186,6 +271,9 @@ def change_password():
         return jsonify({
             "message": "Password changed successfully."
         }), 200
+    except PasswordHasherBusy:
+        current_app.logger.warning("Password hashing queue full, rejecting password change")
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503, {"Retry-After": "1"}
     except Exception as e:
         from utils.db.connection import db
         db.session.rollback()
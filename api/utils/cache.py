@@ -0,0 +1,46 @@
+from typing import Any, Dict, Hashable, Optional, Tuple
+import threading
+import time
+
+class TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ttl seconds"""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                self._evict(now)
+            self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self, now: float) -> None:
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        if len(self._data) >= self.maxsize:
+            oldest = min(self._data, key=lambda key: self._data[key][0])
+            del self._data[oldest]
@@ -1,5 +1,5 @@
 from .connection import db, init_db, connect_to_db
-from .config import database_uri
+from .config import database_uri, engine_options, DRIVERS
 from .create_tables import create_tables, insert_default_data
 
-__all__ = ['db', 'init_db', 'connect_to_db', 'database_uri', 'create_tables', 'insert_default_data']
\ No newline at end of file
+__all__ = ['db', 'init_db', 'connect_to_db', 'database_uri', 'engine_options', 'DRIVERS', 'create_tables', 'insert_default_data']
\ No newline at end of file
@@ -1,10 +1,24 @@
 from flask import abort
 from dotenv import load_dotenv
+from typing import Dict, Optional
 import os
 
 load_dotenv()
 
-def database_uri():
+# DB_DRIVER -> SQLAlchemy dialect+driver
+DRIVERS = {
+    "mysqlconnector": "mysql+mysqlconnector",   # mysql-connector-python, C extension when installed
+    "mysqlclient": "mysql+mysqldb",             # libmysqlclient bindings, fastest result decoding
+    "pymysql": "mysql+pymysql",                 # pure Python, no system libraries needed
+}
+
+def database_driver() -> str:
+    driver = os.getenv("DB_DRIVER", "mysqlconnector").lower()
+    if driver not in DRIVERS:
+        raise ValueError(f"Unsupported DB_DRIVER '{driver}', expected one of: {', '.join(DRIVERS)}")
+    return driver
+
+def database_uri(driver: Optional[str] = None):
     required_vars = ["DB_HOST", "DB_PORT", "DB_DATABASE",
                      "DB_USER", "DB_PASSWORD"]
 
@@ -17,5 +31,23 @@ def database_uri():
     db_database = os.getenv("DB_DATABASE")
     db_username = os.getenv("DB_USER")
     db_password = os.getenv("DB_PASSWORD")
+    scheme = DRIVERS[driver or database_driver()]
+
+    return f'{scheme}://{db_username}:{db_password}@{db_host}:{db_port}/{db_database}'
+
+def engine_options(driver: Optional[str] = None) -> Dict:
+    driver = driver or database_driver()
+    options = {
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    }
+
+    if driver == "mysqlconnector":
+        # Force the C extension; the pure-Python protocol is several times slower at decoding rows
+        options["connect_args"] = {"use_pure": os.getenv("DB_USE_PURE", "false").lower() == "true"}
+    elif driver in ("mysqlclient", "pymysql"):
+        options["connect_args"] = {"charset": "utf8mb4"}
 
-    return f'mysql+mysqlconnector://{db_username}:{db_password}@{db_host}:{db_port}/{db_database}'
\ No newline at end of file
+    return options
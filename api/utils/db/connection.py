@@ -7,6 +7,9 @@ db = SQLAlchemy()
 
 def init_db(app):
     db.init_app(app)
+    # Registers the flush hooks that stamp the sync change log and keep stock balances
+    import sync.model
+    import balances.model
 
 def connect_to_db(app, max_retries=5, delay=5):
     for attempt in range(max_retries):
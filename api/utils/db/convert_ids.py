@@ -0,0 +1,70 @@
+from typing import Dict, List
+from flask import current_app
+from sqlalchemy import text
+from utils.db.connection import db
+from utils.db.types import UUIDType
+
+def uuid_columns() -> Dict[str, List]:
+    """Every UUIDType column in the mapped tables, keyed by table name"""
+    columns = {}
+    for table in db.metadata.sorted_tables:
+        matches = [column for column in table.columns if isinstance(column.type, UUIDType)]
+        if matches:
+            columns[table.name] = matches
+    return columns
+
+def _foreign_keys(connection, tables: List[str]) -> List[Dict]:
+    rows = connection.execute(text("""
+        SELECT k.CONSTRAINT_NAME AS name, k.TABLE_NAME AS table_name, k.COLUMN_NAME AS column_name,
+               k.REFERENCED_TABLE_NAME AS referred_table, k.REFERENCED_COLUMN_NAME AS referred_column,
+               r.DELETE_RULE AS delete_rule
+        FROM information_schema.KEY_COLUMN_USAGE k
+        JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+          ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+        WHERE k.TABLE_SCHEMA = DATABASE() AND k.REFERENCED_TABLE_NAME IS NOT NULL
+    """)).mappings().all()
+    return [dict(row) for row in rows if row["table_name"] in tables]
+
+def _data_type(connection, table: str, column: str) -> str:
+    return connection.execute(text("""
+        SELECT DATA_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column
+    """), {"table": table, "column": column}).scalar()
+
+def convert_ids_to_binary() -> int:
+    """Rewrite every VARCHAR(36) UUID column as BINARY(16) in place (MySQL only).
+
+    Foreign keys are dropped, each column is converted through VARBINARY so its primary
+    key and indexes are kept, then the foreign keys are recreated with their original
+    delete rules. Columns that are already binary are skipped, so the command can be
+    re-run after a failure. MySQL DDL is not transactional: take a backup first.
+    Returns the number of converted columns.
+    """
+    columns = uuid_columns()
+    converted = 0
+
+    with db.engine.begin() as connection:
+        foreign_keys = _foreign_keys(connection, list(columns))
+        for fk in foreign_keys:
+            connection.execute(text(f"ALTER TABLE `{fk['table_name']}` DROP FOREIGN KEY `{fk['name']}`"))
+
+        for table, table_columns in columns.items():
+            for column in table_columns:
+                if _data_type(connection, table, column.name) == "binary":
+                    continue
+
+                nullable = "NULL" if column.nullable else "NOT NULL"
+                current_app.logger.info(f"Converting {table}.{column.name} to BINARY(16)")
+                connection.execute(text(f"ALTER TABLE `{table}` MODIFY `{column.name}` VARBINARY(36) {nullable}"))
+                connection.execute(text(f"UPDATE `{table}` SET `{column.name}` = UNHEX(REPLACE(`{column.name}`, '-', ''))"))
+                connection.execute(text(f"ALTER TABLE `{table}` MODIFY `{column.name}` BINARY(16) {nullable}"))
+                converted += 1
+
+        for fk in foreign_keys:
+            connection.execute(text(
+                f"ALTER TABLE `{fk['table_name']}` ADD CONSTRAINT `{fk['name']}` FOREIGN KEY (`{fk['column_name']}`) "
+                f"REFERENCES `{fk['referred_table']}` (`{fk['referred_column']}`) ON DELETE {fk['delete_rule']}"
+            ))
+
+    current_app.logger.info(f"Converted {converted} id columns to BINARY(16)")
+    return converted
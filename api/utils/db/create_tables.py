@@ -1,5 +1,5 @@
 from utils.db.connection import db
-from categories.model import Category
+from categories.model import Category, CategoryClosure
 from warehouses.model import Warehouse
 from products.model import Product
 from entries.model import Entry
@@ -7,6 +7,11 @@ from exits.model import Exit
 from users.model import User
 from gender.model import Gender
 from roles.model import Role
+from archive.model import MovementArchive, ArchivedBalance
+from sync.model import SyncSequence, ChangeLog
+from outbox.model import OutboxEvent
+from balances.model import StockBalance
+from transfers.model import Transfer
 from flask import current_app
 from sqlalchemy import inspect
 
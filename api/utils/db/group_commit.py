@@ -0,0 +1,138 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional, Tuple
+from flask import Flask, current_app
+from utils.db.connection import db
+import threading
+import queue
+import time
+import os
+
+def group_commit_enabled() -> bool:
+    return os.getenv("GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+
+class GroupCommitTimeout(Exception):
+    """Raised when a write waited longer than the timeout for the writer thread and was withdrawn"""
+
+class GroupCommitter:
+    """Coalesces concurrent single writes into one transaction per batch.
+
+    Request threads hand a stage function to submit() and block; one writer thread per
+    worker takes the first queued write, collects whatever else arrives within max_wait
+    (up to max_batch), runs their stage functions in one session and commits them
+    together, so N scanner posts cost one commit (one fsync) instead of N. A stage
+    function validates, adds its rows, flushes and returns what the caller needs with
+    everything it will read already loaded: the writer's session does not expire
+    objects on commit, and is closed once the batch is done.
+
+    A ValueError from a stage function rejects only that write: validation runs before
+    anything is added. Any other failure, during a stage or the commit, rolls the
+    batch back and replays its writes one commit each, so every caller still gets its
+    own result or error.
+    """
+
+    def __init__(self, app: Flask, max_wait: float, max_batch: int, timeout: float):
+        self.app = app
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.commits = 0
+        self.writes = 0
+        self._queue: "queue.Queue[Tuple[Future, Callable, tuple]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, stage: Callable, *args):
+        """Run stage(*args) in the next batch and return its value once committed"""
+        future: Future = Future()
+        self._queue.put((future, stage, args))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise GroupCommitTimeout(f"Write not started within {self.timeout}s")
+            # Already being written: its outcome is only a commit away
+            return future.result()
+
+    def _collect(self) -> List[Tuple[Future, Callable, tuple]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        # Writes whose caller gave up are dropped here, before anything is staged
+        return [item for item in batch if item[0].set_running_or_notify_cancel()]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                continue
+            with self.app.app_context():
+                db.session().expire_on_commit = False
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    self.app.logger.error(f"Group commit writer failed: {str(e)}")
+                    for future, _, _ in batch:
+                        if not future.done():
+                            future.set_exception(e)
+
+    def _write_batch(self, batch: List[Tuple[Future, Callable, tuple]]) -> None:
+        staged = []
+        for future, stage, args in batch:
+            try:
+                staged.append((future, stage(*args)))
+            except ValueError as ve:
+                future.set_exception(ve)
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.warning(f"Group commit batch of {len(batch)} failed while staging, writing one by one: {str(e)}")
+                self._write_each([item for item in batch if not item[0].done()])
+                return
+
+        if not staged:
+            return
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.app.logger.warning(f"Group commit of {len(staged)} writes failed, writing one by one: {str(e)}")
+            self._write_each([item for item in batch if not item[0].done()])
+            return
+
+        self.commits += 1
+        self.writes += len(staged)
+        for future, value in staged:
+            future.set_result(value)
+
+    def _write_each(self, batch: List[Tuple[Future, Callable, tuple]]) -> None:
+        for future, stage, args in batch:
+            try:
+                value = stage(*args)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                future.set_exception(e)
+                continue
+            self.commits += 1
+            self.writes += 1
+            future.set_result(value)
+
+_committer_lock = threading.Lock()
+
+def get_group_committer() -> Optional[GroupCommitter]:
+    """The worker's committer when GROUP_COMMIT is on, None to commit inline"""
+    app = current_app._get_current_object()
+    if "group_commit" not in app.extensions:
+        with _committer_lock:
+            if "group_commit" not in app.extensions:
+                app.extensions["group_commit"] = GroupCommitter(
+                    app,
+                    max_wait=float(os.getenv("GROUP_COMMIT_MAX_WAIT_MS", "5")) / 1000,
+                    max_batch=int(os.getenv("GROUP_COMMIT_MAX_BATCH", "100")),
+                    timeout=float(os.getenv("GROUP_COMMIT_TIMEOUT", "10"))
+                ) if group_commit_enabled() else None
+    return app.extensions["group_commit"]
@@ -0,0 +1,68 @@
+from typing import Optional
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError, OperationalError
+from utils.db.connection import db
+import ast
+import re
+import os
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'migrations')
+
+_verified = False
+
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\s*=\s*(.+)$", re.MULTILINE)
+
+@lru_cache(maxsize=1)
+def expected_schema_revision() -> str:
+    """Head revision of the migration scripts shipped with this code.
+
+    Parsed straight from the version files so serving processes never import alembic.
+    """
+    revisions, parents = set(), set()
+    versions_dir = os.path.join(MIGRATIONS_DIR, 'versions')
+
+    for filename in os.listdir(versions_dir):
+        if not filename.endswith('.py'):
+            continue
+        with open(os.path.join(versions_dir, filename)) as f:
+            values = dict(_REVISION_LINE.findall(f.read()))
+
+        revisions.add(ast.literal_eval(values['revision']))
+        down_revision = ast.literal_eval(values.get('down_revision', 'None'))
+        if isinstance(down_revision, (tuple, list)):
+            parents.update(down_revision)
+        elif down_revision:
+            parents.add(down_revision)
+
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise RuntimeError(f"Expected a single migration head, found: {sorted(heads)}")
+    return heads.pop()
+
+def current_schema_revision() -> Optional[str]:
+    try:
+        return db.session.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except (ProgrammingError, OperationalError):
+        db.session.rollback()
+        return None
+
+def verify_schema_version() -> Optional[str]:
+    """Compare the database revision with the code's head using a single query.
+
+    Returns an error message when they differ. A successful check is remembered for
+    the lifetime of the process so later requests skip it entirely.
+    """
+    global _verified
+    if _verified:
+        return None
+
+    expected = expected_schema_revision()
+    current = current_schema_revision()
+    if current != expected:
+        return f"Database schema is at revision {current or 'none'}, expected {expected}; run 'flask --app app db upgrade'"
+
+    _verified = True
+    current_app.logger.info(f"Database schema verified at revision {current}")
+    return None
@@ -0,0 +1,11 @@
+from typing import Dict
+from flask import request
+
+def etag_headers(version: int) -> Dict[str, str]:
+    """ETag of a versioned row (products, categories, warehouses), to be sent back in If-Match"""
+    return {"ETag": f'"{version}"'}
+
+def if_match_failed(version: int) -> bool:
+    """True when the request carries If-Match and none of its tags is this version; '*'
+    matches any version and a request without If-Match is not conditional"""
+    return bool(request.if_match) and not request.if_match.contains(str(version))
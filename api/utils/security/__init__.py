@@ -0,0 +1,6 @@
+from .hashing import PasswordHasherBusy, get_password_hasher, bcrypt_rounds
+from .throttle import LoginThrottle, get_login_throttle, get_ip_login_throttle, client_ip
+from .tokens import InvalidToken, issue_tokens, decode_token, revoke_user_tokens, token_required, REFRESH_TOKEN
+
+__all__ = ['PasswordHasherBusy', 'get_password_hasher', 'bcrypt_rounds', 'LoginThrottle', 'get_login_throttle', 'get_ip_login_throttle', 'client_ip',
+           'InvalidToken', 'issue_tokens', 'decode_token', 'revoke_user_tokens', 'token_required', 'REFRESH_TOKEN']
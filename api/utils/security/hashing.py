@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Optional, Tuple
+import threading
+import time
+import os
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full and the caller should retry later"""
+
+def bcrypt_rounds() -> int:
+    return int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+def hash_rounds(password_hash: str) -> Optional[int]:
+    """Extract the cost factor from a '$2b$12$...' bcrypt hash"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated pool so logins cannot pin every request worker.
+
+    bcrypt releases the GIL while hashing, so a thread pool gives real parallelism
+    without the pickling cost of a process pool. At most max_workers hashes run at
+    once and at most queue_limit more wait; anything beyond that is rejected with
+    PasswordHasherBusy instead of piling up behind the CPU.
+    """
+
+    def __init__(self, max_workers: int, queue_limit: int, timeout: float, rounds: int):
+        self.rounds = rounds
+        self._timeout = timeout
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_workers + queue_limit)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password operations in progress")
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self._timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy(f"Password operation not finished within {self._timeout}s")
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password, self.rounds)
+
+    def hash_many(self, passwords: List[str]) -> Tuple[List[str], float]:
+        """Hash a batch (bulk provisioning) on the same pool, in order; returns the hashes
+        and the seconds spent waiting for free slots.
+
+        Every hash takes one of the slots logins are admitted against, but waits for it
+        instead of being rejected, and at most max_workers of the batch are in flight at
+        once: a login arriving meanwhile still finds room in the queue and waits behind one
+        round of hashes instead of the whole batch.
+        """
+        gate = threading.BoundedSemaphore(self._max_workers)
+        futures = []
+        waited = 0.0
+        for password in passwords:
+            gate.acquire()
+            if not self._slots.acquire(blocking=False):
+                started = time.monotonic()
+                acquired = self._slots.acquire(timeout=self._timeout)
+                waited += time.monotonic() - started
+                if not acquired:
+                    gate.release()
+                    raise PasswordHasherBusy("Too many password operations in progress")
+            try:
+                future = self._executor.submit(_hash, password, self.rounds)
+            except Exception:
+                self._slots.release()
+                gate.release()
+                raise
+            future.add_done_callback(lambda _: (self._slots.release(), gate.release()))
+            futures.append(future)
+
+        try:
+            return [future.result(timeout=self._timeout) for future in futures], waited
+        except FutureTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise PasswordHasherBusy(f"Password operation not finished within {self._timeout}s")
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(_verify, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return hash_rounds(password_hash) != self.rounds
+
+def _hash(password: str, rounds: int) -> str:
+    import bcrypt
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+def _verify(password: str, password_hash: str) -> bool:
+    import bcrypt
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except (ValueError, TypeError):
+        return False
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+                    queue_limit=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32")),
+                    timeout=float(os.getenv("PASSWORD_HASH_TIMEOUT", "10")),
+                    rounds=bcrypt_rounds()
+                )
+    return _hasher
@@ -0,0 +1,100 @@
+from collections import deque
+from typing import Dict, Deque, Hashable, Optional
+from flask import request
+import threading
+import time
+import os
+
+class LoginThrottle:
+    """Sliding-window limit of failed login attempts per key, kept in process memory.
+
+    Only failures count, so a crowd of handhelds logging in from one IP at shift change
+    is never throttled; a key that keeps failing is locked out until its oldest failure
+    leaves the window, and a successful login clears it.
+    """
+
+    def __init__(self, max_attempts: int, window_seconds: float):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self._attempts: Dict[Hashable, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def check(self, key: Hashable) -> Optional[float]:
+        """Seconds to wait when the key is over its limit, None when it may try"""
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._current(key, now)
+            if attempts is not None and len(attempts) >= self.max_attempts:
+                return attempts[0] + self.window_seconds - now
+            return None
+
+    def fail(self, key: Hashable) -> None:
+        """Record a failed attempt"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > self.window_seconds:
+                self._sweep(now - self.window_seconds)
+                self._last_sweep = now
+
+            attempts = self._current(key, now)
+            if attempts is None:
+                attempts = self._attempts[key] = deque()
+            attempts.append(now)
+
+    def reset(self, key: Hashable) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def _current(self, key: Hashable, now: float) -> Optional[Deque[float]]:
+        attempts = self._attempts.get(key)
+        cutoff = now - self.window_seconds
+        while attempts and attempts[0] <= cutoff:
+            attempts.popleft()
+        return attempts
+
+    def _sweep(self, cutoff: float):
+        stale = [key for key, attempts in self._attempts.items() if not attempts or attempts[-1] <= cutoff]
+        for key in stale:
+            del self._attempts[key]
+
+def client_ip() -> str:
+    """Address of the client, read from TRUSTED_PROXY_HEADER when the API sits behind a proxy.
+
+    For a list header such as X-Forwarded-For the last entry is used: it is the one the
+    trusted proxy appended, the ones before it come from the client and can be forged.
+    """
+    header = os.getenv("TRUSTED_PROXY_HEADER")
+    if header:
+        forwarded = request.headers.get(header)
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    return request.remote_addr or "unknown"
+
+_throttle: Optional[LoginThrottle] = None
+_ip_throttle: Optional[LoginThrottle] = None
+_throttle_lock = threading.Lock()
+
+def get_login_throttle() -> LoginThrottle:
+    global _throttle
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                _throttle = LoginThrottle(
+                    max_attempts=int(os.getenv("LOGIN_RATE_LIMIT", "10")),
+                    window_seconds=float(os.getenv("LOGIN_RATE_WINDOW", "60"))
+                )
+    return _throttle
+
+def get_ip_login_throttle() -> LoginThrottle:
+    """Failures per client address across all accounts, so one address
+    cannot spray guesses over many e-mails under the per-account limit."""
+    global _ip_throttle
+    if _ip_throttle is None:
+        with _throttle_lock:
+            if _ip_throttle is None:
+                _ip_throttle = LoginThrottle(
+                    max_attempts=int(os.getenv("LOGIN_IP_RATE_LIMIT", "50")),
+                    window_seconds=float(os.getenv("LOGIN_RATE_WINDOW", "60"))
+                )
+    return _ip_throttle
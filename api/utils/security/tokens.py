@@ -0,0 +1,119 @@
+from functools import wraps
+from typing import Dict, Optional, Tuple
+from flask import current_app, g, jsonify, request
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from sqlalchemy import select
+from utils.cache import TTLCache
+import time
+import os
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+def access_token_ttl() -> int:
+    return int(os.getenv("ACCESS_TOKEN_TTL", "900"))
+
+def refresh_token_ttl() -> int:
+    return int(os.getenv("REFRESH_TOKEN_TTL", str(7 * 24 * 3600)))
+
+# user_id -> (users.tokens_valid_after, users.role_id). The revocation itself lives in
+# the database so every worker sees it; this only spares a lookup per request, at the
+# cost of other workers honouring a revocation up to TOKEN_REVOCATION_TTL seconds late.
+_token_state = TTLCache(ttl=float(os.getenv("TOKEN_REVOCATION_TTL", "5")), maxsize=10000)
+
+class InvalidToken(Exception):
+    pass
+
+def _serializer(token_type: str) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt=f"users.{token_type}")
+
+def issue_tokens(user) -> Dict:
+    issued_at = time.time()
+    claims = {
+        "sub": user.id,
+        "iat": issued_at,
+        "role_id": user.role_id,
+        "role": user.role_rel.name if user.role_rel else None
+    }
+    return {
+        "access_token": _serializer(ACCESS_TOKEN).dumps(claims),
+        "refresh_token": _serializer(REFRESH_TOKEN).dumps({"sub": user.id, "iat": issued_at}),
+        "token_type": "Bearer",
+        "expires_in": access_token_ttl()
+    }
+
+def decode_token(token: str, token_type: str = ACCESS_TOKEN) -> Dict:
+    max_age = access_token_ttl() if token_type == ACCESS_TOKEN else refresh_token_ttl()
+    try:
+        claims = _serializer(token_type).loads(token, max_age=max_age)
+    except SignatureExpired:
+        raise InvalidToken("Token expired")
+    except BadSignature:
+        raise InvalidToken("Invalid token")
+
+    valid_after, role_id = _user_token_state(claims.get("sub"))
+    if claims.get("iat", 0) <= valid_after:
+        raise InvalidToken("Token revoked")
+    if token_type == ACCESS_TOKEN and claims.get("role_id") != role_id:
+        raise InvalidToken("Token revoked")
+
+    return claims
+
+def _user_token_state(user_id: str) -> Tuple[float, Optional[str]]:
+    """Epoch seconds before which this user's tokens are revoked (infinite for a user
+    that no longer exists) and the role access tokens must carry"""
+    state = _token_state.get(user_id)
+    if state is None:
+        from utils.db.connection import db
+        from users.model import User
+        row = db.session.execute(select(User.tokens_valid_after, User.role_id).where(User.id == user_id)).first()
+        state = (float("inf"), None) if row is None else (row[0] or 0.0, row[1])
+        _token_state.set(user_id, state)
+    return state
+
+def revoke_user_tokens(user, sessions: bool = True) -> None:
+    """Reject tokens already issued to this user.
+
+    Access tokens carrying a role the user no longer has are rejected anyway, so a role
+    change only needs sessions=False: refresh tokens keep working and hand out tokens
+    with the new role. Otherwise the user row is stamped in the caller's session and
+    every token, refresh ones included, dies for every worker once the caller commits.
+    """
+    if sessions:
+        user.tokens_valid_after = time.time()
+    _token_state.set(user.id, (user.tokens_valid_after or 0.0, user.role_id))
+
+def bearer_token() -> Optional[str]:
+    header = request.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+def token_required(*roles: str):
+    """Validate the bearer access token without a database lookup.
+
+    Sets g.current_user_id, g.current_role_id and g.current_role. When role names
+    are given, only tokens carrying one of them are accepted.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            token = bearer_token()
+            if not token:
+                return jsonify({"error": "Authentication required"}), 401
+
+            try:
+                claims = decode_token(token, ACCESS_TOKEN)
+            except InvalidToken as e:
+                return jsonify({"error": str(e)}), 401
+
+            if roles and claims.get("role") not in roles:
+                return jsonify({"error": "Insufficient permissions"}), 403
+
+            g.current_user_id = claims["sub"]
+            g.current_role_id = claims.get("role_id")
+            g.current_role = claims.get("role")
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
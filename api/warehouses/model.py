@@ -1,22 +1,31 @@
 from utils.db.connection import db
+from utils.db.types import UUIDType, new_id
 from datetime import datetime
 import pytz
-import uuid
 from typing import Dict, Optional, List
 from flask import current_app
+from sqlalchemy import select, func, case, and_, literal, union_all
+import os
+from utils.cache import TTLCache
+from products.model import Product
+from balances.model import StockBalance, warehouse_has_movements
+from sync.model import get_latest_sequence
 
 class Warehouse(db.Model):
     __tablename__ = "warehouses"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDType, primary_key=True, default=new_id)
     name = db.Column(db.String(100), nullable=False, unique=True)
     description = db.Column(db.Text, nullable=True)
     active = db.Column(db.Boolean, nullable=False, default=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')))
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now(pytz.timezone('America/Sao_Paulo')), onupdate=datetime.now(pytz.timezone('America/Sao_Paulo')))
+    version = db.Column(db.Integer, nullable=False, default=1, server_default=db.text('1'))
 
     products = db.relationship('Product', back_populates='warehouse_rel', lazy='dynamic')
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<Warehouse {self.id}, Name: {self.name}>"
 
@@ -27,7 +36,8 @@ class Warehouse(db.Model):
             "description": self.description,
             "active": self.active,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "version": self.version
         }
 
 def create_warehouse(warehouse_data: Dict) -> Optional[Warehouse]:
@@ -57,27 +67,105 @@ def get_warehouse_by_name(name: str) -> Optional[Warehouse]:
 def get_all_warehouses() -> List[Warehouse]:
     return Warehouse.query.filter_by(active=True).all()
 
+# Summaries are keyed by the change-log sequence: any product, entry or exit write moves
+# the sequence, so a cached summary is only served while nothing has changed
+_summary_cache = TTLCache(ttl=float(os.getenv("WAREHOUSE_SUMMARY_TTL", "300")), maxsize=4)
+
+def get_warehouse_summary() -> List[Dict]:
+    """Product count, units on hand, stock value and low/out-of-stock counts of every
+    active warehouse, aggregated by the database in one grouped statement over the
+    stock balances. A warehouse lists the products it holds plus the ones assigned to
+    it, which count as out of stock while it holds none of them."""
+    sequence = get_latest_sequence()
+    cached = _summary_cache.get(sequence)
+    if cached is not None:
+        return cached
+
+    locations = union_all(
+        select(StockBalance.product_id.label("product_id"), StockBalance.warehouse_id.label("warehouse_id"), StockBalance.quantity.label("quantity"))
+            .where(StockBalance.quantity != 0),
+        select(Product.id, Product.warehouse_id, literal(0))
+    ).subquery("locations")
+    stocks = (
+        select(
+            locations.c.warehouse_id,
+            locations.c.product_id,
+            func.sum(locations.c.quantity).label("stock"),
+            Product.min_quantity,
+            Product.unit_cost
+        )
+        .join(Product, Product.id == locations.c.product_id)
+        .where(Product.active.is_(True))
+        .group_by(locations.c.warehouse_id, locations.c.product_id, Product.min_quantity, Product.unit_cost)
+        .subquery("stocks")
+    )
+    on_hand = case((stocks.c.stock > 0, stocks.c.stock), else_=0)
+    statement = (
+        select(
+            Warehouse.id,
+            Warehouse.name,
+            func.count(stocks.c.product_id),
+            func.coalesce(func.sum(on_hand), 0),
+            func.coalesce(func.sum(on_hand * stocks.c.unit_cost), 0),
+            func.coalesce(func.sum(case((and_(stocks.c.stock > 0, stocks.c.stock <= stocks.c.min_quantity), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((stocks.c.stock <= 0, 1), else_=0)), 0)
+        )
+        .select_from(Warehouse)
+        .outerjoin(stocks, stocks.c.warehouse_id == Warehouse.id)
+        .where(Warehouse.active.is_(True))
+        .group_by(Warehouse.id, Warehouse.name)
+        .order_by(Warehouse.name)
+    )
+
+    summary = [{
+        "warehouse_id": warehouse_id,
+        "name": name,
+        "product_count": int(product_count),
+        "total_units": float(total_units),
+        "stock_value": round(float(stock_value), 2),
+        "low_stock_count": int(low_stock),
+        "out_of_stock_count": int(out_of_stock)
+    } for warehouse_id, name, product_count, total_units, stock_value, low_stock, out_of_stock in db.session.execute(statement)]
+
+    _summary_cache.set(sequence, summary)
+    return summary
+
+def has_products(warehouse: Warehouse) -> bool:
+    return db.session.query(warehouse.products.exists()).scalar()
+
+def has_stock(warehouse: Warehouse) -> bool:
+    return db.session.query(
+        select(StockBalance.product_id).where(StockBalance.warehouse_id == warehouse.id, StockBalance.quantity != 0).exists()
+    ).scalar()
+
 def update_warehouse(warehouse_id: str, warehouse_data: Dict) -> Optional[Warehouse]:
     warehouse = get_warehouse(warehouse_id)
     if warehouse:
-        if "name" in warehouse_data:
-            warehouse.name = warehouse_data["name"]
-        if "description" in warehouse_data:
-            warehouse.description = warehouse_data["description"]
-        if "active" in warehouse_data:
-            warehouse.active = warehouse_data["active"]
-
-        warehouse.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
-        db.session.commit()
-        current_app.logger.info(f"Warehouse updated: {warehouse.name}")
-        return warehouse
+        try:
+            if "name" in warehouse_data:
+                warehouse.name = warehouse_data["name"]
+            if "description" in warehouse_data:
+                warehouse.description = warehouse_data["description"]
+            if "active" in warehouse_data:
+                warehouse.active = warehouse_data["active"]
+
+            warehouse.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
+            db.session.commit()
+            current_app.logger.info(f"Warehouse updated: {warehouse.name}")
+            return warehouse
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error updating warehouse {warehouse_id}: {str(e)}")
+            raise
     return None
 
 def delete_warehouse(warehouse_id: str) -> Optional[Warehouse]:
     warehouse = get_warehouse(warehouse_id)
     if warehouse:
-        if warehouse.products.count() > 0:
+        if has_products(warehouse):
             raise ValueError(f"Cannot delete warehouse '{warehouse.name}' because it has associated products")
+        if has_stock(warehouse):
+            raise ValueError(f"Cannot delete warehouse '{warehouse.name}' because it still holds stock")
 
         warehouse.active = False
         warehouse.updated_at = datetime.now(pytz.timezone('America/Sao_Paulo'))
@@ -89,8 +177,10 @@ def delete_warehouse(warehouse_id: str) -> Optional[Warehouse]:
 def hard_delete_warehouse(warehouse_id: str) -> Optional[Warehouse]:
     warehouse = get_warehouse(warehouse_id)
     if warehouse:
-        if warehouse.products.count() > 0:
+        if has_products(warehouse):
             raise ValueError(f"Cannot delete warehouse '{warehouse.name}' because it has associated products")
+        if warehouse_has_movements(warehouse.id):
+            raise ValueError(f"Cannot delete warehouse '{warehouse.name}' because it has stock movements")
 
         db.session.delete(warehouse)
         db.session.commit()
@@ -1,5 +1,8 @@
 from flask import request, jsonify, Blueprint, current_app
-from warehouses.model import Warehouse, create_warehouse, get_warehouse, update_warehouse, delete_warehouse, get_all_warehouses
+from warehouses.model import Warehouse, create_warehouse, get_warehouse, update_warehouse, delete_warehouse, get_all_warehouses, get_warehouse_summary
+from utils.db.versioning import etag_headers, if_match_failed
+from sqlalchemy.orm.exc import StaleDataError
+from balances.model import get_warehouse_balances
 import traceback
 
 blueprint = Blueprint('warehouses', __name__)
@@ -44,7 +47,7 @@ def read(warehouse_id):
         return jsonify({
             "data": warehouse.serialize(),
             "message": "Warehouse retrieved successfully."
-        }), 200
+        }), 200, etag_headers(warehouse.version)
     except Exception as e:
         current_app.logger.error(f"Error retrieving warehouse {warehouse_id}: {str(e)}")
         return jsonify({"error": "Failed to retrieve warehouse due to an internal server error."}), 500
@@ -65,6 +68,37 @@ def read_all():
         current_app.logger.error(f"Error retrieving all warehouses: {str(e)}")
         return jsonify({"error": "Failed to retrieve warehouses due to an internal server error."}), 500
 
+@blueprint.route("/summary", methods=["GET"])
+def summary():
+    current_app.logger.info(f"Warehouse summary requested")
+
+    try:
+        return jsonify({
+            "data": get_warehouse_summary(),
+            "message": "Warehouse summary retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving warehouse summary: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({"error": "Failed to retrieve warehouse summary due to an internal server error."}), 500
+
+@blueprint.route("/<string:warehouse_id>/stock", methods=["GET"])
+def stock(warehouse_id):
+    current_app.logger.info(f"Warehouse stock requested: {warehouse_id}")
+
+    try:
+        warehouse = get_warehouse(warehouse_id)
+        if warehouse is None:
+            return jsonify({"error": "Warehouse not found"}), 404
+
+        return jsonify({
+            "data": [balance.serialize() for balance in get_warehouse_balances(warehouse.id)],
+            "message": "Warehouse stock retrieved successfully."
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f"Error retrieving stock of warehouse {warehouse_id}: {str(e)}")
+        return jsonify({"error": "Failed to retrieve warehouse stock due to an internal server error."}), 500
+
 @blueprint.route("/update/<string:warehouse_id>", methods=["PUT"])
 def update(warehouse_id):
     current_app.logger.info(f"Warehouse update requested: {warehouse_id}")
@@ -74,17 +108,27 @@ def update(warehouse_id):
         return jsonify({"error": "Request body must be JSON"}), 400
 
     try:
-        warehouse = update_warehouse(warehouse_id, data)
-        if warehouse is None:
+        current = get_warehouse(warehouse_id)
+        if current is None:
             return jsonify({"error": "Warehouse not found"}), 404
+        if if_match_failed(current.version):
+            current_app.logger.warning(f"Stale If-Match updating warehouse {warehouse_id}")
+            return jsonify({
+                "error": "Warehouse was changed since it was read; reload it and try again.",
+                "version": current.version
+            }), 412, etag_headers(current.version)
 
+        warehouse = update_warehouse(warehouse_id, data)
         return jsonify({
             "data": warehouse.serialize(),
             "message": "Warehouse updated successfully."
-        }), 200
+        }), 200, etag_headers(warehouse.version)
     except ValueError as ve:
         current_app.logger.error(f"Validation error updating warehouse {warehouse_id}: {str(ve)}")
         return jsonify({"error": str(ve)}), 400
+    except StaleDataError:
+        current_app.logger.warning(f"Concurrent update conflict on warehouse {warehouse_id}")
+        return jsonify({"error": "Warehouse was changed by another request; reload it and try again."}), 409
     except Exception as e:
         current_app.logger.error(f"Error updating warehouse {warehouse_id}: {str(e)}")
         current_app.logger.error(traceback.format_exc())
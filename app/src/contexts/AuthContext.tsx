@@ -3,6 +3,7 @@ import { toast } from '@/hooks/use-toast';
 import { createUser, RegisterFormData as ApiRegisterData } from '@/services/userRegistration';
 import { usersApi } from '@/services/api/endpoints';
 import { UserProfileService } from '@/services/userProfile';
+import { SESSION_EXPIRED_EVENT } from '@/services/api';
 
 export interface User {
   id: string;
@@ -66,6 +67,25 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
     setIsLoading(false);
   }, []);
 
+  // Sessão expirada ou revogada (refresh token recusado): encerrar a sessão local
+  useEffect(() => {
+    const handleSessionExpired = () => {
+      localStorage.removeItem('auth_token');
+      localStorage.removeItem('auth_refresh_token');
+      localStorage.removeItem('auth_user');
+      setUser(null);
+
+      toast({
+        variant: "destructive",
+        title: "Sessão expirada",
+        description: "Faça login novamente",
+      });
+    };
+
+    window.addEventListener(SESSION_EXPIRED_EVENT, handleSessionExpired);
+    return () => window.removeEventListener(SESSION_EXPIRED_EVENT, handleSessionExpired);
+  }, []);
+
   const login = async (email: string, senha: string): Promise<boolean> => {
     try {
       setIsLoading(true);
@@ -108,7 +128,8 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
       console.log('AuthContext - Login - User mapeado:', user);
 
       // Salvar sessão no localStorage
-      localStorage.setItem('auth_token', 'simple_session');
+      localStorage.setItem('auth_token', userData.access_token);
+      localStorage.setItem('auth_refresh_token', userData.refresh_token);
       localStorage.setItem('auth_user', JSON.stringify(user));
 
       setUser(user);
@@ -162,6 +183,7 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
 
   const logout = () => {
     localStorage.removeItem('auth_token');
+    localStorage.removeItem('auth_refresh_token');
     localStorage.removeItem('auth_user');
     setUser(null);
 
@@ -1,4 +1,6 @@
+import { useEffect } from 'react';
 import { useQuery, useMutation, useQueryClient, QueryClient } from '@tanstack/react-query';
+import { API_BASE_URL } from '@/services/api';
 import { productsApi, warehousesApi, categoriesApi, entriesApi, exitsApi } from '@/services/api/endpoints';
 import {
   ApiProduct,
@@ -32,7 +34,9 @@ export const queryKeys = {
   exits: ['exits'] as const,
   dashboard: ['dashboard'] as const,
   product: (id: string) => ['products', id] as const,
+  productSearch: (query: string, limit: number) => ['products', 'search', query, limit] as const,
   warehouse: (id: string) => ['warehouses', id] as const,
+  warehouseSummary: ['warehouses', 'summary'] as const,
   category: (id: string) => ['categories', id] as const,
   warehouseProducts: (id: string) => ['products', 'warehouse', id] as const,
   categoryProducts: (id: string) => ['products', 'category', id] as const,
@@ -52,6 +56,16 @@ export const useProducts = () => {
   });
 };
 
+export const useProductSearch = (query: string, limit: number = 10) => {
+  return useQuery({
+    queryKey: queryKeys.productSearch(query.trim(), limit),
+    queryFn: () => productsApi.search(query.trim(), limit),
+    select: (response) => response.data || [],
+    enabled: query.trim().length > 0,
+    staleTime: 0, // Always fetch fresh data
+  });
+};
+
 export const useLowStockProducts = () => {
   return useQuery({
     queryKey: ['products', 'low-stock'],
@@ -120,6 +134,15 @@ export const useWarehouses = () => {
   });
 };
 
+export const useWarehouseSummary = () => {
+  return useQuery({
+    queryKey: queryKeys.warehouseSummary,
+    queryFn: () => warehousesApi.getSummary(),
+    select: (response) => response.data || [],
+    staleTime: 0, // Always fetch fresh data
+  });
+};
+
 export const useWarehouse = (id: string, enabled: boolean = true) => {
   return useQuery({
     queryKey: queryKeys.warehouse(id),
@@ -204,6 +227,57 @@ export const useDashboardStats = () => {
   });
 };
 
+// Live stock updates (GET /events/stock, Server-Sent Events): patch the cached
+// product lists in place and refetch only the queries affected by the change
+export const useStockEvents = () => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const source = new EventSource(`${API_BASE_URL}/events/stock`);
+
+    const refetchMovements = () => {
+      queryClient.invalidateQueries({ queryKey: queryKeys.entries });
+      queryClient.invalidateQueries({ queryKey: queryKeys.exits });
+      queryClient.invalidateQueries({ queryKey: queryKeys.warehouseSummary });
+      queryClient.invalidateQueries({ queryKey: queryKeys.dashboard });
+    };
+
+    source.addEventListener('stock', (event) => {
+      const { product_id, balance, status, status_changed } = JSON.parse((event as MessageEvent).data);
+      queryClient.setQueriesData<{ data?: ApiProduct[] }>({ queryKey: queryKeys.products }, (old) => {
+        if (!old || !Array.isArray(old.data)) return old;
+        return {
+          ...old,
+          data: old.data.map((product) =>
+            product.id === product_id ? { ...product, current_stock: balance, stock_status: status } : product
+          ),
+        };
+      });
+      queryClient.invalidateQueries({ queryKey: queryKeys.product(product_id), exact: true });
+      if (status_changed) {
+        queryClient.invalidateQueries({ queryKey: ['products', 'low-stock'] });
+      }
+      refetchMovements();
+    });
+
+    source.addEventListener('product_deleted', () => {
+      queryClient.invalidateQueries({ queryKey: queryKeys.products });
+      refetchMovements();
+    });
+
+    source.addEventListener('changed', (event) => {
+      const { entity } = JSON.parse((event as MessageEvent).data);
+      queryClient.invalidateQueries({ queryKey: [entity] });
+    });
+
+    source.addEventListener('resync', () => {
+      queryClient.invalidateQueries();
+    });
+
+    return () => source.close();
+  }, [queryClient]);
+};
+
 // Mutations
 export const useCreateProduct = () => {
   const queryClient = useQueryClient();
@@ -225,9 +299,9 @@ export const useUpdateProduct = () => {
   const queryClient = useQueryClient();
 
   return useMutation({
-    mutationFn: ({ id, data }: { id: string; data: any }) => {
+    mutationFn: ({ id, data, version }: { id: string; data: any; version?: number }) => {
       const apiData = transformProdutoFormToApi(data);
-      return productsApi.update(id, apiData);
+      return productsApi.update(id, apiData, version);
     },
     onSuccess: (_, { id }) => {
       // Invalidate specific product and products list
@@ -269,9 +343,9 @@ export const useUpdateWarehouse = () => {
   const queryClient = useQueryClient();
 
   return useMutation({
-    mutationFn: ({ id, data }: { id: string; data: any }) => {
+    mutationFn: ({ id, data, version }: { id: string; data: any; version?: number }) => {
       const apiData = transformArmazemFormToApi(data);
-      return warehousesApi.update(id, apiData);
+      return warehousesApi.update(id, apiData, version);
     },
     onSuccess: (_, { id }) => {
       queryClient.invalidateQueries({ queryKey: queryKeys.warehouses });
@@ -304,6 +378,7 @@ export const useCreateEntry = () => {
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: queryKeys.entries });
       queryClient.invalidateQueries({ queryKey: queryKeys.products }); // Product stock might change
+      queryClient.invalidateQueries({ queryKey: queryKeys.warehouseSummary });
       queryClient.invalidateQueries({ queryKey: queryKeys.dashboard });
     },
   });
@@ -320,6 +395,7 @@ export const useCreateExit = () => {
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: queryKeys.exits });
       queryClient.invalidateQueries({ queryKey: queryKeys.products }); // Product stock might change
+      queryClient.invalidateQueries({ queryKey: queryKeys.warehouseSummary });
       queryClient.invalidateQueries({ queryKey: queryKeys.dashboard });
     },
   });
@@ -348,12 +424,12 @@ export const useUpdateCategory = () => {
   const queryClient = useQueryClient();
 
   return useMutation({
-    mutationFn: ({ id, data }: { id: string; data: any }) => {
+    mutationFn: ({ id, data, version }: { id: string; data: any; version?: number }) => {
       const apiData = {
         name: data.nome,
         description: data.descricao,
       };
-      return categoriesApi.update(id, apiData);
+      return categoriesApi.update(id, apiData, version);
     },
     onSuccess: (_, { id }) => {
       queryClient.invalidateQueries({ queryKey: queryKeys.categories });
@@ -55,6 +55,7 @@ export const transformApiProduct = (apiProduct: ApiProduct): Produto => {
     categoriaId: apiProduct.category_id,
     categoriaNome: apiProduct.category_name,
     criadoEm: apiProduct.created_at,
+    versao: apiProduct.version,
   };
 };
 
@@ -90,6 +91,7 @@ export const transformApiWarehouse = (apiWarehouse: ApiWarehouse): Armazem => {
     nome: apiWarehouse.name,
     descricao: apiWarehouse.description || '',
     criadoEm: apiWarehouse.created_at,
+    versao: apiWarehouse.version,
   };
 };
 
@@ -107,6 +109,7 @@ export const transformApiCategory = (apiCategory: ApiCategory): Categoria => {
     nome: apiCategory.name,
     descricao: apiCategory.description || '',
     criadoEm: apiCategory.created_at,
+    versao: apiCategory.version,
   };
 };
 
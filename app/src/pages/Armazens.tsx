@@ -23,7 +23,7 @@ import {
   AlertDialogHeader,
   AlertDialogTitle,
 } from '@/components/ui/alert-dialog';
-import { useWarehouses, useProducts, useCreateWarehouse, useDeleteWarehouse, useUpdateWarehouse } from '@/hooks/useApi';
+import { useWarehouses, useWarehouseSummary, useCreateWarehouse, useDeleteWarehouse, useUpdateWarehouse } from '@/hooks/useApi';
 import { transformApiWarehouse } from '@/lib/transform';
 import { toast } from '@/hooks/use-toast';
 
@@ -40,7 +40,7 @@ const Armazens = () => {
   console.log('🏢 Armazens page loaded');
   // API data fetching
   const { data: warehouses = [], isLoading, error } = useWarehouses();
-  const { data: products = [] } = useProducts();
+  const { data: summary = [] } = useWarehouseSummary();
   const createWarehouseMutation = useCreateWarehouse();
   const deleteWarehouseMutation = useDeleteWarehouse();
   const updateWarehouseMutation = useUpdateWarehouse();
@@ -48,6 +48,7 @@ const Armazens = () => {
   const [showForm, setShowForm] = useState(false);
   const [deleteId, setDeleteId] = useState<string | null>(null);
   const [editId, setEditId] = useState<string | null>(null);
+  const [editVersion, setEditVersion] = useState<number | undefined>(undefined);
   const [isEditMode, setIsEditMode] = useState(false);
   const [nome, setNome] = useState('');
   const [descricao, setDescricao] = useState('');
@@ -57,6 +58,7 @@ const Armazens = () => {
     setDescricao('');
     setIsEditMode(false);
     setEditId(null);
+    setEditVersion(undefined);
   };
 
   const loadWarehouseForEdit = (armazem: any) => {
@@ -64,6 +66,7 @@ const Armazens = () => {
     setDescricao(armazem.descricao);
     setIsEditMode(true);
     setEditId(armazem.id);
+    setEditVersion(armazem.versao);
     setShowForm(true);
   };
 
@@ -88,7 +91,8 @@ const Armazens = () => {
       // Update existing warehouse
       updateWarehouseMutation.mutate({
         id: editId,
-        data: warehouseData
+        data: warehouseData,
+        version: editVersion
       }, {
         onSuccess: () => {
           toast({
@@ -151,12 +155,10 @@ const Armazens = () => {
   // Transform API warehouses to frontend format
   const armazens = warehouses.map(transformApiWarehouse);
 
-  // Calculate warehouse stats based on products
+  // Warehouse stats aggregated by the API
   const getArmazemStats = (armazemId: string) => {
-    const produtosArmazem = products.filter(p => p.warehouse_id === armazemId);
-    const quantidade = produtosArmazem.length;
-    const valorTotal = produtosArmazem.reduce((sum, p) => sum + (p.current_stock * p.unit_cost), 0);
-    return { quantidade, valorTotal };
+    const stats = summary.find(s => s.warehouse_id === armazemId);
+    return { quantidade: stats?.product_count ?? 0, valorTotal: stats?.stock_value ?? 0 };
   };
 
   // Loading state
@@ -38,6 +38,7 @@ const Categorias = () => {
   const [showForm, setShowForm] = useState(false);
   const [deleteId, setDeleteId] = useState<string | null>(null);
   const [editId, setEditId] = useState<string | null>(null);
+  const [editVersion, setEditVersion] = useState<number | undefined>(undefined);
   const [isEditMode, setIsEditMode] = useState(false);
   const [nome, setNome] = useState('');
   const [descricao, setDescricao] = useState('');
@@ -47,6 +48,7 @@ const Categorias = () => {
     setDescricao('');
     setIsEditMode(false);
     setEditId(null);
+    setEditVersion(undefined);
   };
 
   const loadCategoryForEdit = (categoria: any) => {
@@ -54,6 +56,7 @@ const Categorias = () => {
     setDescricao(categoria.descricao);
     setIsEditMode(true);
     setEditId(categoria.id);
+    setEditVersion(categoria.versao);
     setShowForm(true);
   };
 
@@ -78,7 +81,8 @@ const Categorias = () => {
       // Update existing category
       updateCategoryMutation.mutate({
         id: editId,
-        data: categoryData
+        data: categoryData,
+        version: editVersion
       }, {
         onSuccess: () => {
           toast({
@@ -1,7 +1,7 @@
 import { Package, AlertTriangle, TrendingUp, TrendingDown } from 'lucide-react';
 import { StatCard } from '@/components/ui/stat-card';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
-import { useDashboardStats, useProductsNeedingAttention, useEntries, useExits } from '@/hooks/useApi';
+import { useDashboardStats, useProductsNeedingAttention, useEntries, useExits, useStockEvents } from '@/hooks/useApi';
 import { StatusBadge } from '@/components/ui/status-badge';
 import { transformApiEntryToMovimentacao, transformApiExitToMovimentacao } from '@/lib/transform';
 import { Link } from 'react-router-dom';
@@ -13,6 +13,7 @@ const Dashboard = () => {
   const { data: productsNeedingAttention = [], isLoading: attentionLoading } = useProductsNeedingAttention();
   const { data: entries = [] } = useEntries();
   const { data: exits = [] } = useExits();
+  useStockEvents();
 
   // Transform and merge movements for recent movements display
   const entryMovements = entries.map(transformApiEntryToMovimentacao);
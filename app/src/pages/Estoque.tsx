@@ -3,7 +3,7 @@ import { Plus, Minus, Search, Eye } from 'lucide-react';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Input } from '@/components/ui/input';
 import { Button } from '@/components/ui/button';
-import { useProducts, useCreateEntry, useCreateExit } from '@/hooks/useApi';
+import { useProducts, useCreateEntry, useCreateExit, useStockEvents } from '@/hooks/useApi';
 import { StatusBadge } from '@/components/ui/status-badge';
 import {
   Table,
@@ -30,6 +30,7 @@ import { ProdutoComEstoque } from '@/types';
 const Estoque = () => {
   // API data fetching
   const { data: products = [], isLoading, error } = useProducts();
+  useStockEvents();
   const createEntryMutation = useCreateEntry();
   const createExitMutation = useCreateExit();
 
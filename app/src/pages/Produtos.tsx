@@ -60,6 +60,8 @@ const Produtos = () => {
   const [showForm, setShowForm] = useState(false);
   const [deleteId, setDeleteId] = useState<string | null>(null);
   const [editId, setEditId] = useState<string | null>(null);
+  // Version the form was loaded from, sent as If-Match so a concurrent edit is not overwritten
+  const [editVersion, setEditVersion] = useState<number | undefined>(undefined);
   const [isEditMode, setIsEditMode] = useState(false);
 
   // Form state (remove codigo and quantidadeInicial as they don't exist in backend)
@@ -79,6 +81,7 @@ const Produtos = () => {
     setCategoriaId('');
     setIsEditMode(false);
     setEditId(null);
+    setEditVersion(undefined);
   };
 
   const loadProductForEdit = (produto: any) => {
@@ -90,6 +93,7 @@ const Produtos = () => {
     setCategoriaId(produto.categoriaId || '');
     setIsEditMode(true);
     setEditId(produto.id);
+    setEditVersion(produto.versao);
     setShowForm(true);
   };
 
@@ -118,7 +122,8 @@ const Produtos = () => {
       // Update existing product
       updateProductMutation.mutate({
         id: editId,
-        data: productData
+        data: productData,
+        version: editVersion
       }, {
         onSuccess: () => {
           toast({
@@ -2,9 +2,49 @@
 import { ApiResponse } from '@/types';
 
 // Use localhost for both local and Docker environments (Docker port mapping)
-const API_BASE_URL = 'http://localhost:5001';
+export const API_BASE_URL = 'http://localhost:5001';
 const API_TIMEOUT = 30000; // 30 seconds
 
+// Bearer token issued by /users/login
+const authHeaders = (): Record<string, string> => {
+  const token = localStorage.getItem('auth_token');
+  return token ? { Authorization: `Bearer ${token}` } : {};
+};
+
+// Fired when the session can no longer be renewed; AuthContext logs the user out
+export const SESSION_EXPIRED_EVENT = 'auth:session-expired';
+
+const NO_REFRESH_ENDPOINTS = ['/users/login', '/users/refresh'];
+
+// One /users/refresh call shared by every request that got a 401 meanwhile
+let refreshing: Promise<boolean> | null = null;
+
+const refreshSession = (baseUrl: string): Promise<boolean> => {
+  if (!refreshing) {
+    refreshing = (async () => {
+      const refreshToken = localStorage.getItem('auth_refresh_token');
+      if (!refreshToken) return false;
+      try {
+        const response = await fetch(`${baseUrl}/users/refresh`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ refresh_token: refreshToken }),
+        });
+        if (!response.ok) return false;
+        const { data } = await response.json();
+        localStorage.setItem('auth_token', data.access_token);
+        localStorage.setItem('auth_refresh_token', data.refresh_token);
+        return true;
+      } catch {
+        return false;
+      }
+    })().finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
 // Simple fetch-based API client
 class ApiClient {
   private baseUrl: string;
@@ -17,7 +57,8 @@ class ApiClient {
 
   private async request<T>(
     endpoint: string,
-    options: RequestInit = {}
+    options: RequestInit = {},
+    retried: boolean = false
   ): Promise<ApiResponse<T>> {
     const url = `${this.baseUrl}${endpoint}`;
     console.log('🌐 API Request URL:', url);
@@ -32,6 +73,7 @@ class ApiClient {
         signal: controller.signal,
         headers: {
           'Content-Type': 'application/json',
+          ...authHeaders(),
           ...options.headers,
         },
       };
@@ -43,6 +85,14 @@ class ApiClient {
 
       console.log('📡 API Response Status:', response.status, response.statusText);
 
+      // Expired or revoked access token: renew it once and repeat the request
+      if (response.status === 401 && !retried && !NO_REFRESH_ENDPOINTS.includes(endpoint)) {
+        if (await refreshSession(this.baseUrl)) {
+          return this.request<T>(endpoint, options, true);
+        }
+        window.dispatchEvent(new Event(SESSION_EXPIRED_EVENT));
+      }
+
       if (!response.ok) {
         const errorText = await response.text();
         console.log('❌ API Error Response:', errorText);
@@ -84,10 +134,11 @@ class ApiClient {
     });
   }
 
-  async put<T>(endpoint: string, data?: any): Promise<ApiResponse<T>> {
+  async put<T>(endpoint: string, data?: any, headers?: Record<string, string>): Promise<ApiResponse<T>> {
     return this.request<T>(endpoint, {
       method: 'PUT',
       body: data ? JSON.stringify(data) : undefined,
+      headers,
     });
   }
 
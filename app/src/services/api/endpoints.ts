@@ -2,7 +2,11 @@ import { api } from '@/services/api';
 import {
   ApiResponse,
   ApiProduct,
+  ApiProductSearchResult,
+  ApiBatchRequest,
+  ApiBatchResult,
   ApiWarehouse,
+  ApiWarehouseSummary,
   ApiCategory,
   ApiEntry,
   ApiExit,
@@ -16,6 +20,10 @@ import {
   CreateCategoryRequest
 } from '@/types';
 
+// If-Match for an update made from the given version; the API answers 412 if the record changed since
+const ifMatch = (version?: number): Record<string, string> | undefined =>
+  version === undefined ? undefined : { 'If-Match': `"${version}"` };
+
 // Products API
 export const productsApi = {
   // Get all products
@@ -28,6 +36,16 @@ export const productsApi = {
     return await api.get(`/products/read/${id}`);
   },
 
+  // Get several products (with stock) in one request; unknown ids come back in `missing`
+  getMany: async (ids: string[]): Promise<ApiResponse<ApiProduct[]> & { missing?: string[] }> => {
+    return await api.post('/products/read/many', { ids });
+  },
+
+  // Search products by name, category or warehouse name, SKU or barcode
+  search: async (query: string, limit: number = 10): Promise<ApiResponse<ApiProductSearchResult[]>> => {
+    return await api.get(`/products/search?q=${encodeURIComponent(query)}&limit=${limit}`);
+  },
+
   // Get products with low stock
   getLowStock: async (): Promise<ApiResponse<ApiProduct[]>> => {
     return await api.get('/products/read/low-stock');
@@ -43,14 +61,19 @@ export const productsApi = {
     return await api.get(`/products/read/category/${categoryId}`);
   },
 
+  // Set unit_cost and/or min_quantity of many products (by id, sku or barcode) at once
+  bulkUpdate: async (updates: Array<{ id?: string; sku?: string; barcode?: string; unit_cost?: number; min_quantity?: number }>): Promise<ApiResponse<{ updated: number }>> => {
+    return await api.put('/products/bulk-update', { updates });
+  },
+
   // Create new product
   create: async (data: CreateProductRequest): Promise<ApiResponse<ApiProduct>> => {
     return await api.post('/products/create', data);
   },
 
   // Update product
-  update: async (id: string, data: UpdateProductRequest): Promise<ApiResponse<ApiProduct>> => {
-    return await api.put(`/products/update/${id}`, data);
+  update: async (id: string, data: UpdateProductRequest, version?: number): Promise<ApiResponse<ApiProduct>> => {
+    return await api.put(`/products/update/${id}`, data, ifMatch(version));
   },
 
   // Delete product (soft delete)
@@ -66,6 +89,11 @@ export const warehousesApi = {
     return await api.get('/warehouses/read/all');
   },
 
+  // Get per-warehouse product count, units and stock value
+  getSummary: async (): Promise<ApiResponse<ApiWarehouseSummary[]>> => {
+    return await api.get('/warehouses/summary');
+  },
+
   // Get warehouse by ID
   getById: async (id: string): Promise<ApiResponse<ApiWarehouse>> => {
     return await api.get(`/warehouses/read/${id}`);
@@ -77,8 +105,8 @@ export const warehousesApi = {
   },
 
   // Update warehouse
-  update: async (id: string, data: Partial<CreateWarehouseRequest>): Promise<ApiResponse<ApiWarehouse>> => {
-    return await api.put(`/warehouses/update/${id}`, data);
+  update: async (id: string, data: Partial<CreateWarehouseRequest>, version?: number): Promise<ApiResponse<ApiWarehouse>> => {
+    return await api.put(`/warehouses/update/${id}`, data, ifMatch(version));
   },
 
   // Delete warehouse
@@ -105,8 +133,8 @@ export const categoriesApi = {
   },
 
   // Update category
-  update: async (id: string, data: Partial<CreateCategoryRequest>): Promise<ApiResponse<ApiCategory>> => {
-    return await api.put(`/categories/update/${id}`, data);
+  update: async (id: string, data: Partial<CreateCategoryRequest>, version?: number): Promise<ApiResponse<ApiCategory>> => {
+    return await api.put(`/categories/update/${id}`, data, ifMatch(version));
   },
 
   // Delete category
@@ -122,6 +150,11 @@ export const entriesApi = {
     return await api.get('/entries/read/all');
   },
 
+  // Get several entries in one request; unknown ids come back in `missing`
+  getMany: async (ids: string[]): Promise<ApiResponse<ApiEntry[]> & { missing?: string[] }> => {
+    return await api.post('/entries/read/many', { ids });
+  },
+
   // Get entries by product
   getByProduct: async (productId: string): Promise<ApiResponse<ApiEntry[]>> => {
     return await api.get(`/entries/read/product/${productId}`);
@@ -155,6 +188,11 @@ export const exitsApi = {
     return await api.get('/exits/read/all');
   },
 
+  // Get several exits in one request; unknown ids come back in `missing`
+  getMany: async (ids: string[]): Promise<ApiResponse<ApiExit[]> & { missing?: string[] }> => {
+    return await api.post('/exits/read/many', { ids });
+  },
+
   // Get exits by product
   getByProduct: async (productId: string): Promise<ApiResponse<ApiExit[]>> => {
     return await api.get(`/exits/read/product/${productId}`);
@@ -203,6 +241,11 @@ export const usersApi = {
     return await api.post('/users/create', data);
   },
 
+  // Create many users at once (Administrator token required); all or none
+  bulkCreate: async (users: Array<{ name: string; email: string; password: string; role?: string; role_id?: string; gender?: string; gender_id?: string }>): Promise<ApiResponse> => {
+    return await api.post('/users/bulk-create', { users });
+  },
+
   // Change password
   changePassword: async (currentPassword: string, newPassword: string): Promise<ApiResponse> => {
     return await api.post('/users/change-password', {
@@ -233,20 +276,34 @@ export const genderApi = {
   },
 };
 
+// Batch API (several read requests in one round trip)
+export const batchApi = {
+  // Run read requests together; results come back in the same order
+  run: async (requests: ApiBatchRequest[]): Promise<ApiResponse<ApiBatchResult[]>> => {
+    return await api.post('/batch', { requests });
+  },
+};
+
+// Data of a batch result, or an empty fallback when that request failed
+const batchData = <T>(results: ApiBatchResult[] | undefined, id: string, fallback: T): T => {
+  const result = results?.find(r => r.id === id);
+  return result && result.status < 400 && result.body?.data !== undefined ? result.body.data : fallback;
+};
+
 // Dashboard API (composed from other endpoints)
 export const dashboardApi = {
   // Get dashboard statistics
   getStats: async (): Promise<DashboardStats> => {
-    // Since there's no dedicated dashboard endpoint, we'll compose it
-    const [productsRes, warehousesRes, lowStockRes] = await Promise.all([
-      productsApi.getAll(),
-      warehousesApi.getAll(),
-      productsApi.getLowStock(),
+    // Since there's no dedicated dashboard endpoint, we'll compose it in one batch
+    const response = await batchApi.run([
+      { id: 'products', path: '/products/read/all' },
+      { id: 'warehouses', path: '/warehouses/read/all' },
+      { id: 'lowStock', path: '/products/read/low-stock' },
     ]);
 
-    const products = productsRes.data || [];
-    const warehouses = warehousesRes.data || [];
-    const lowStockProducts = lowStockRes.data || [];
+    const products = batchData<ApiProduct[]>(response.data, 'products', []);
+    const warehouses = batchData<ApiWarehouse[]>(response.data, 'warehouses', []);
+    const lowStockProducts = batchData<ApiProduct[]>(response.data, 'lowStock', []);
 
     return {
       totalProducts: products.length,
@@ -12,7 +12,37 @@ export interface ApiProduct {
   active: boolean;
   created_at: string;
   updated_at: string;
+  version: number;
   current_stock: number;
+  stock_status?: string;
+}
+
+export interface ApiProductSearchResult {
+  id: string;
+  name: string;
+  sku?: string | null;
+  barcode?: string | null;
+  category_id?: string | null;
+  category_name?: string | null;
+  warehouse_id: string;
+  warehouse_name?: string | null;
+  min_quantity: number;
+  current_stock: number;
+  stock_status: string;
+  score: number;
+}
+
+export interface ApiBatchRequest {
+  id: string;
+  method?: 'GET' | 'POST';
+  path: string;
+  body?: unknown;
+}
+
+export interface ApiBatchResult<T = any> {
+  id: string;
+  status: number;
+  body: { data?: T; message?: string; error?: string } | null;
 }
 
 export interface ApiWarehouse {
@@ -22,20 +52,34 @@ export interface ApiWarehouse {
   active: boolean;
   created_at: string;
   updated_at: string;
+  version: number;
+}
+
+export interface ApiWarehouseSummary {
+  warehouse_id: string;
+  name: string;
+  product_count: number;
+  total_units: number;
+  stock_value: number;
+  low_stock_count: number;
+  out_of_stock_count: number;
 }
 
 export interface ApiCategory {
   id: string;
   name: string;
   description?: string;
+  parent_id?: string | null;
   active: boolean;
   created_at: string;
   updated_at: string;
+  version: number;
 }
 
 export interface ApiEntry {
   id: string;
   product_id: string;
+  warehouse_id: string;
   product_name?: string;
   quantity: number;
   entry_date: string;
@@ -47,6 +91,7 @@ export interface ApiEntry {
 export interface ApiExit {
   id: string;
   product_id: string;
+  warehouse_id: string;
   product_name?: string;
   quantity: number;
   exit_date: string;
@@ -92,6 +137,7 @@ export interface Armazem {
   nome: string;
   descricao: string;
   criadoEm: string;
+  versao?: number;
 }
 
 export interface Produto {
@@ -105,6 +151,7 @@ export interface Produto {
   categoriaId?: string;
   categoriaNome?: string;
   criadoEm: string;
+  versao?: number;
 }
 
 export interface Movimentacao {
@@ -123,6 +170,7 @@ export interface Categoria {
   nome: string;
   descricao?: string;
   criadoEm: string;
+  versao?: number;
 }
 
 export type StatusProduto = 'critical' | 'warning' | 'success';
@@ -188,6 +236,7 @@ export interface CreateWarehouseRequest {
 
 export interface CreateEntryRequest {
   product_id: string;
+  warehouse_id?: string;
   quantity: number;
   entry_date: string;
   observation?: string;
@@ -195,6 +244,7 @@ export interface CreateEntryRequest {
 
 export interface CreateExitRequest {
   product_id: string;
+  warehouse_id?: string;
   quantity: number;
   exit_date: string;
   observation?: string;
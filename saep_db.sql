@@ -1,3 +1,7 @@
+-- Dados de exemplo. Carregar após `flask --app app db upgrade` e, em seguida, executar
+-- `flask --app app rebuild-balances`: as inserções diretas não passam pela API, então os
+-- saldos por armazém (stock_balances) precisam ser recalculados a partir das movimentações.
+
 -- ========================================
 -- 1. TABELA GENDERS
 -- ========================================
@@ -29,6 +33,17 @@ INSERT INTO categories (id, name, description, active, created_at, updated_at) V
 ('770e8400-e29b-41d4-a716-446655440007', 'Ferramentas Pneumáticas', 'Ferramentas a ar comprimido', TRUE, '2024-01-01 10:00:00', '2024-01-01 10:00:00'),
 ('770e8400-e29b-41d4-a716-446655440008', 'Acessórios e Consumíveis', 'Brocas, discos, lixas e materiais de consumo', TRUE, '2024-01-01 10:00:00', '2024-01-01 10:00:00');
 
+-- Árvore de categorias (category_closure): toda categoria é ancestral de si mesma
+INSERT INTO category_closure (ancestor_id, descendant_id, depth) VALUES
+('770e8400-e29b-41d4-a716-446655440001', '770e8400-e29b-41d4-a716-446655440001', 0),
+('770e8400-e29b-41d4-a716-446655440002', '770e8400-e29b-41d4-a716-446655440002', 0),
+('770e8400-e29b-41d4-a716-446655440003', '770e8400-e29b-41d4-a716-446655440003', 0),
+('770e8400-e29b-41d4-a716-446655440004', '770e8400-e29b-41d4-a716-446655440004', 0),
+('770e8400-e29b-41d4-a716-446655440005', '770e8400-e29b-41d4-a716-446655440005', 0),
+('770e8400-e29b-41d4-a716-446655440006', '770e8400-e29b-41d4-a716-446655440006', 0),
+('770e8400-e29b-41d4-a716-446655440007', '770e8400-e29b-41d4-a716-446655440007', 0),
+('770e8400-e29b-41d4-a716-446655440008', '770e8400-e29b-41d4-a716-446655440008', 0);
+
 -- ========================================
 -- 4. TABELA WAREHOUSES
 -- ========================================
@@ -101,22 +116,21 @@ INSERT INTO products (id, name, category_id, warehouse_id, min_quantity, unit_co
 -- ========================================
 -- 7. TABELA ENTRIES (Entradas de Estoque)
 -- ========================================
-INSERT INTO entries (id, product_id, entry_date, quantity, observation, created_at, updated_at) VALUES
+INSERT INTO entries (id, product_id, warehouse_id, entry_date, quantity, observation, created_at, updated_at) VALUES
 -- Entradas de Ferramentas Manuais
-('bb0e8400-e29b-41d4-a716-446655440001', 'aa0e8400-e29b-41d4-a716-446655440001', '2024-01-15', 50.00, 'Compra fornecedor nacional', '2024-01-15 09:00:00', '2024-01-15 09:00:00'),
-('bb0e8400-e29b-41d4-a716-446655440002', 'aa0e8400-e29b-41d4-a716-446655440002', '2024-01-16', 40.00, 'Reposição de estoque', '2024-01-16 10:30:00', '2024-01-16 10:30:00'),
-('bb0e8400-e29b-41d4-a716-446655440003', 'aa0e8400-e29b-41d4-a716-446655440003', '2024-01-17', 80.00, 'Compra em lote - promoção', '2024-01-17 14:20:00', '2024-01-17 14:20:00'),
-('bb0e8400-e29b-41d4-a716-446655440004', 'aa0e8400-e29b-41d4-a716-446655440004', '2024-01-18', 70.00, 'Estoque inicial filial', '2024-01-18 11:45:00', '2024-01-18 11:45:00'),
-('bb0e8400-e29b-41d4-a716-446655440005', 'aa0e8400-e29b-41d4-a716-446655440005', '2024-01-20', 100.00, 'Pedido mensal', '2024-01-20 08:00:00', '2024-01-20 08:00:00'),
-('bb0e8400-e29b-41d4-a716-446655440006', 'aa0e8400-e29b-41d4-a716-446655440006', '2024-01-21', 100.00, 'Pedido mensal', '2024-01-21 15:30:00', '2024-01-21 15:30:00'),
-('bb0e8400-e29b-41d4-a716-446655440007', 'aa0e8400-e29b-41d4-a716-446655440007', '2024-01-22', 40.00, 'Kit profissional', '2024-01-22 12:15:00', '2024-01-22 12:15:00'),
-('bb0e8400-e29b-41d4-a716-446655440008', 'aa0e8400-e29b-41d4-a716-446655440008', '2024-01-23', 30.00, 'Compra especial', '2024-01-23 16:00:00', '2024-01-23 16:00:00');
+('bb0e8400-e29b-41d4-a716-446655440001', 'aa0e8400-e29b-41d4-a716-446655440001', '880e8400-e29b-41d4-a716-446655440001', '2024-01-15', 50.00, 'Compra fornecedor nacional', '2024-01-15 09:00:00', '2024-01-15 09:00:00'),
+('bb0e8400-e29b-41d4-a716-446655440002', 'aa0e8400-e29b-41d4-a716-446655440002', '880e8400-e29b-41d4-a716-446655440002', '2024-01-16', 40.00, 'Reposição de estoque', '2024-01-16 10:30:00', '2024-01-16 10:30:00'),
+('bb0e8400-e29b-41d4-a716-446655440003', 'aa0e8400-e29b-41d4-a716-446655440003', '880e8400-e29b-41d4-a716-446655440001', '2024-01-17', 80.00, 'Compra em lote - promoção', '2024-01-17 14:20:00', '2024-01-17 14:20:00'),
+('bb0e8400-e29b-41d4-a716-446655440004', 'aa0e8400-e29b-41d4-a716-446655440004', '880e8400-e29b-41d4-a716-446655440003', '2024-01-18', 70.00, 'Estoque inicial filial', '2024-01-18 11:45:00', '2024-01-18 11:45:00'),
+('bb0e8400-e29b-41d4-a716-446655440005', 'aa0e8400-e29b-41d4-a716-446655440005', '880e8400-e29b-41d4-a716-446655440001', '2024-01-20', 100.00, 'Pedido mensal', '2024-01-20 08:00:00', '2024-01-20 08:00:00'),
+('bb0e8400-e29b-41d4-a716-446655440006', 'aa0e8400-e29b-41d4-a716-446655440006', '880e8400-e29b-41d4-a716-446655440002', '2024-01-21', 100.00, 'Pedido mensal', '2024-01-21 15:30:00', '2024-01-21 15:30:00'),
+('bb0e8400-e29b-41d4-a716-446655440007', 'aa0e8400-e29b-41d4-a716-446655440007', '880e8400-e29b-41d4-a716-446655440003', '2024-01-22', 40.00, 'Kit profissional', '2024-01-22 12:15:00', '2024-01-22 12:15:00'),
+('bb0e8400-e29b-41d4-a716-446655440008', 'aa0e8400-e29b-41d4-a716-446655440008', '880e8400-e29b-41d4-a716-446655440004', '2024-01-23', 30.00, 'Compra especial', '2024-01-23 16:00:00', '2024-01-23 16:00:00');
 
 -- ========================================
 -- 8. EXITS TABLE (Stock Exit Movements)
 -- ========================================
-INSERT INTO exits (id, product_id, exit_date, quantity, observation, created_at, updated_at) VALUES
-('cc0e8400-e29b-41d4-a716-446655440001', 'aa0e8400-e29b-41d4-a716-446655440001', '2024-02-01', 2.00, 'Uso administrativo', '2024-02-01 10:00:00', '2024-02-01 10:00:00'),
-('cc0e8400-e29b-41d4-a716-446655440002', 'aa0e8400-e29b-41d4-a716-446655440002', '2024-02-02', 15.00, 'Distribuição para equipes', '2024-02-02 14:30:00', '2024-02-02 14:30:00'),
-('cc0e8400-e29b-41d4-a716-446655440003', 'aa0e8400-e29b-41d4-a716-446655440003', '2024-02-03', 8.00, 'Setup de workstations', '2024-02-03 09:15:00', '2024-02-03 09:15:00'),
--- Exits for Materiais de Escritório
+INSERT INTO exits (id, product_id, warehouse_id, exit_date, quantity, observation, created_at, updated_at) VALUES
+('cc0e8400-e29b-41d4-a716-446655440001', 'aa0e8400-e29b-41d4-a716-446655440001', '880e8400-e29b-41d4-a716-446655440001', '2024-02-01', 2.00, 'Uso administrativo', '2024-02-01 10:00:00', '2024-02-01 10:00:00'),
+('cc0e8400-e29b-41d4-a716-446655440002', 'aa0e8400-e29b-41d4-a716-446655440002', '880e8400-e29b-41d4-a716-446655440002', '2024-02-02', 15.00, 'Distribuição para equipes', '2024-02-02 14:30:00', '2024-02-02 14:30:00'),
+('cc0e8400-e29b-41d4-a716-446655440003', 'aa0e8400-e29b-41d4-a716-446655440003', '880e8400-e29b-41d4-a716-446655440001', '2024-02-03', 8.00, 'Setup de workstations', '2024-02-03 09:15:00', '2024-02-03 09:15:00');